@@ -1,68 +1,657 @@
 import os
+import time
+import hashlib
+import threading
+from io import BytesIO
 import numpy as np
-import tensorflow as tf
-from tensorflow.keras.preprocessing import image
-from tensorflow.keras.applications.resnet50 import preprocess_input
+from PIL import Image
+import config
+from backbones import read_model_meta, preprocess_batch  # 🧱 BACKBONE
+from embedding_cache import get_cache, pixel_key  # 🧊 EMBEDDING CACHE
+
+# 🆕 TensorFlow LAZY import edilir: smart_bot import'u ve semantik olarak
+# çözülen taramalar TensorFlow yüklemeden çalışır. İlk görsel analizde yüklenir.
+
+# 🆕 Giriş boyutu ve ön işleme model başına <model>.meta.json'dan okunur
+# (backbones.py; meta yoksa ResNet50 @ 224x224 'caffe')
 
 # --- CUSTOM OBJECTS (MODEL YÜKLEMEK İÇİN GEREKLİ) ---
 # Modeli kaydederken kullandığımız özel fonksiyonu burada da tanımlamalıyız
 def euclidean_distance(vectors):
+    import tensorflow as tf
     x, y = vectors
     return tf.abs(x - y)
 
-class VisualBrain:
-    def __init__(self, model_path="my_best_model.keras"):
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+# score(): |a - b| ara tensörünün (N, M, blok) en fazla eleman sayısı (~16 MB float32)
+_SCORE_BLOCK_ELEMENTS = 1 << 22
+
+def _model_version(model_path):
+    """
+    🆕 Model dosyasının kimliği (ad + boyut + değişim zamanı).
+    Embedding önbellekleri bu değer değişince geçersiz sayılır.
+    """
+    try:
+        st = os.stat(model_path)
+        stamp = f"{os.path.basename(model_path)}:{st.st_size}:{st.st_mtime_ns}"
+    except OSError:
+        stamp = f"{os.path.basename(model_path)}:missing"
+    return hashlib.sha1(stamp.encode("utf-8")).hexdigest()[:12]
+
+
+class LoadedModel:
+    """
+    🆕 Belleğe yüklenmiş tek bir model artefaktı (Keras backend).
+
+    Siyam modelin ortak ResNet50 kulesi (encoder) ve Dense(1)+sigmoid
+    karar katmanının ağırlıkları ayrı tutulur. Böylece her görsel tek
+    bir encoder geçişiyle vektöre çevrilir, karşılaştırma NumPy'da yapılır.
+
+    Nesne oluşturmak ucuzdur; TensorFlow import'u ve model yüklemesi
+    ilk ensure_loaded() çağrısında (ilk görsel analizde) yapılır.
+    """
+
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self.version = _model_version(model_path)
+        self.meta = read_model_meta(model_path)  # backbone, input_size, preprocess
+        self.model = None
+        self.encoder = None
+        self.head_weights = None  # (D,) float32
+        self.head_bias = 0.0
+        self.loaded = False
+        self._load_lock = threading.Lock()
+        self._features = None     # feature_extractor() önbelleği (False: desteklenmiyor)
+
+    @property
+    def available(self):
+        """Model kullanılabilir mi? (Yüklemeyi tetiklemez)"""
+        if self.loaded:
+            return self.model is not None
+        return os.path.exists(self.model_path)
+
+    def ensure_loaded(self):
+        """Modeli (gerekirse) yükler. Aynı anda çağıran thread'ler tek yüklemeyi bekler."""
+        if self.loaded:
+            return self
+        with self._load_lock:
+            if not self.loaded:
+                self._load()
+                self.loaded = True
+        return self
+
+    def _load(self):
+        model_path = self.model_path
         print(f"🧠 Eğitilmiş Yapay Zeka Modeli Yükleniyor: {model_path}")
-        
         if os.path.exists(model_path):
             try:
+                import tensorflow as tf
+
                 # --- KRİTİK DÜZELTME BURADA ---
                 # Modeli yüklerken 'euclidean_distance' fonksiyonunu tanıtıyoruz.
                 # safe_mode=False da gerekli olabilir.
                 self.model = tf.keras.models.load_model(
-                    model_path, 
+                    model_path,
                     custom_objects={'euclidean_distance': euclidean_distance},
                     safe_mode=False
                 )
                 print("✅ Özel eğitilmiş model başarıyla yüklendi!")
+                self._split_siamese()
             except Exception as e:
                 print(f"❌ Model yüklenirken hata oluştu: {e}")
                 self.model = None
         else:
-            print("⚠️ HATA: 'my_best_model.keras' dosyası bulunamadı!")
+            print(f"⚠️ HATA: '{model_path}' dosyası bulunamadı!")
+
+    def _split_siamese(self):
+        """
+        Siyam modeli encoder (paylaşılan CNN) ve karar katmanı ağırlıklarına ayırır.
+
+        train_ai.build_siamese_model yapısı: [input_1, input_2] -> base_cnn ->
+        Lambda(|x-y|) -> Dense(1, sigmoid). base_cnn iç içe bir Model olarak durur.
+        """
+        import tensorflow as tf
+
+        encoder = None
+        dense = None
+        for layer in self.model.layers:
+            if isinstance(layer, tf.keras.Model):
+                encoder = layer
+            elif isinstance(layer, tf.keras.layers.Dense):
+                dense = layer
+
+        if encoder is None or dense is None:
+            print("⚠️ Model encoder/head olarak ayrılamadı, klasik karşılaştırma kullanılacak.")
+            return
+
+        kernel, bias = dense.get_weights()
+        self.encoder = encoder
+        self.head_weights = np.asarray(kernel[:, 0], dtype=np.float32)
+        self.head_bias = float(bias[0])
+
+    def feature_extractor(self):
+        """
+        🆕 Encoder'ın global pooling öncesi evrişim çıktısını veren model
+        (sayfa ısı haritası için). Pooling katmanı bulunamazsa None.
+        """
+        if self._features is False or self.encoder is None:
+            return None
+        if self._features is not None:
+            return self._features
+        import tensorflow as tf
+
+        pool = self.encoder.layers[-1]
+        if not isinstance(pool, tf.keras.layers.GlobalAveragePooling2D):
+            self._features = False
+            return None
+        self._features = tf.keras.Model(self.encoder.inputs, pool.input)
+        return self._features
+
+
+class _TFLiteEncoder:
+    """
+    🆕 TFLite interpreter'ını Keras encoder gibi çağrılabilir yapar:
+    encoder(batch, training=False) -> (N, D) float32.
+    Interpreter thread-safe değildir; çağrılar kilitle sıralanır.
+    """
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        self._input = interpreter.get_input_details()[0]
+        self._output = interpreter.get_output_details()[0]
+        self._batch_size = None
+        self._lock = threading.Lock()
+
+    def _resize(self, n):
+        if n != self._batch_size:
+            self.interpreter.resize_tensor_input(self._input["index"], [n] + list(self._input["shape"][1:]))
+            self.interpreter.allocate_tensors()
+            self._input = self.interpreter.get_input_details()[0]
+            self._output = self.interpreter.get_output_details()[0]
+            self._batch_size = n
+
+    def __call__(self, batch, training=False):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            self._resize(len(batch))
+            scale, zero_point = self._input["quantization"]
+            if self._input["dtype"] != np.float32 and scale:
+                # Tam int8 giriş: float -> quantized
+                batch = np.round(batch / scale + zero_point)
+            self.interpreter.set_tensor(self._input["index"], batch.astype(self._input["dtype"]))
+            self.interpreter.invoke()
+            features = self.interpreter.get_tensor(self._output["index"])
+
+        scale, zero_point = self._output["quantization"]
+        if self._output["dtype"] != np.float32 and scale:
+            return (features.astype(np.float32) - zero_point) * scale
+        return features.astype(np.float32)
+
+
+class TFLiteModel(LoadedModel):
+    """
+    🆕 TFLite BACKEND (CPU, float16 / int8 quantize edilmiş encoder)
+    quantize_model.py ile dışa aktarılan encoder (.tflite) ve karar katmanı
+    ağırlıkları (<model>.head.npz) yüklenir. LoadedModel ile aynı arayüz:
+    encoder(batch) + head_weights/head_bias; Siyam model (predict) yoktur.
+
+    tflite_runtime kuruluysa TensorFlow hiç import edilmez.
+    """
+
+    @staticmethod
+    def head_path(model_path):
+        return os.path.splitext(model_path)[0] + ".head.npz"
+
+    @property
+    def available(self):
+        if self.loaded:
+            return self.model is not None
+        return os.path.exists(self.model_path) and os.path.exists(self.head_path(self.model_path))
+
+    def feature_extractor(self):
+        return None  # TFLite'ta sadece pooled çıktı dışa aktarılır
+
+    def _load(self):
+        model_path = self.model_path
+        head_path = self.head_path(model_path)
+        print(f"🧠 TFLite encoder yükleniyor: {model_path}")
+        if not (os.path.exists(model_path) and os.path.exists(head_path)):
+            print(f"⚠️ HATA: '{model_path}' veya '{head_path}' bulunamadı!")
+            return
+        try:
+            try:
+                from tflite_runtime.interpreter import Interpreter
+            except ImportError:
+                import tensorflow as tf
+                Interpreter = tf.lite.Interpreter
+
+            interpreter = Interpreter(model_path=model_path, num_threads=os.cpu_count())
+            interpreter.allocate_tensors()
+            with np.load(head_path) as head:
+                self.head_weights = np.asarray(head["weights"], dtype=np.float32)
+                self.head_bias = float(head["bias"])
+            self.encoder = _TFLiteEncoder(interpreter)
+            self.model = self.encoder  # Ayrı Siyam model yok; tutamaç encoder'dır
+            print("✅ TFLite encoder başarıyla yüklendi!")
+        except Exception as e:
+            print(f"❌ TFLite encoder yüklenirken hata oluştu: {e}")
             self.model = None
+            self.encoder = None
+
+
+def _open_model(model_path):
+    """🆕 Dosya uzantısına göre backend seçer (.tflite -> TFLite, diğerleri -> Keras)."""
+    if model_path.lower().endswith(".tflite"):
+        return TFLiteModel(model_path)
+    return LoadedModel(model_path)
+
+
+class ModelRegistry:
+    """
+    🆕 SÜREÇ GENELİ MODEL KAYDI
+    Her model dosyası süreç başına bir kez yüklenir; SmartBot, Healer ve
+    AutoReferenceCapture aynı LoadedModel nesnesini paylaşır. Thread-safe.
+    Yükleme LoadedModel.ensure_loaded() içinde, ilk kullanımda yapılır.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {}  # abs path -> LoadedModel
+
+    def get(self, model_path):
+        """Modelin paylaşımlı tutamacını döner. Dosya değiştiyse yenisini oluşturur."""
+        key = os.path.abspath(model_path)
+        version = _model_version(model_path)
+        with self._lock:
+            loaded = self._models.get(key)
+            if loaded is None or loaded.version != version:
+                loaded = _open_model(model_path)
+                self._models[key] = loaded
+            return loaded
+
+
+# Süreç başına tek kayıt
+MODEL_REGISTRY = ModelRegistry()
+
+
+class VisualBrain:
+    def __init__(self, model_path="my_best_model.keras", use_server=None, use_cache=None):
+        # 🆕 Model kayıttan paylaşımlı alınır; VisualBrain sadece hafif bir tutamaçtır
+        # Model ilk kullanımda (model/encoder/head erişimi) yüklenir
+        self._loaded = MODEL_REGISTRY.get(model_path)
+        self.model_version = self._loaded.version
+
+        # 🆕 UZAK BACKEND: inference_server çalışıyorsa encoder oradan kullanılır
+        # (model bu süreçte hiç yüklenmez; bağlantı koparsa yerel modele dönülür)
+        self._remote = None
+        if use_server is None:
+            use_server = config.USE_INFERENCE_SERVER
+        if use_server:
+            from inference_server import InferenceClient
+            self._remote = InferenceClient.connect()
+            if self._remote is not None:
+                self.model_version = self._remote.model_version
+                print(f"🛰️ Inference sunucusu kullanılıyor: {self._remote.socket_path}")
+
+        # 🆕 EMBEDDING ÖNBELLEĞİ: piksel hash'i -> embedding (bellek LRU + SQLite)
+        # Değişmeyen UI elementleri tekrar taramalarda encoder'a gitmez
+        self._cache = None
+        if use_cache is None:
+            use_cache = config.EMBEDDING_CACHE_ENABLED
+        if use_cache:
+            self._cache = get_cache()
+
+        # 🆕 ÖNCEDEN AYRILMIŞ BATCH TAMPONU (N, H, W, 3)
+        # Görseller diske yazılmadan doğrudan buraya decode edilir
+        self._batch_buffer = np.empty((0, 0, 0, 3), dtype=np.float32)
+        self._buffer_lock = threading.Lock()
+
+    # --- LAZY MODEL ERİŞİMİ ---
+
+    # Uzak backend kullanılırken model/encoder tutamacı istemcinin kendisidir
+
+    @property
+    def model(self):
+        if self._remote is not None: return self._remote
+        return self._loaded.ensure_loaded().model
 
-    def _preprocess_image(self, img_path):
-        """Görseli modelin anlayacağı formata (224x224) getirir."""
+    @property
+    def encoder(self):
+        if self._remote is not None: return self._remote
+        return self._loaded.ensure_loaded().encoder
+
+    @property
+    def head_weights(self):
+        if self._remote is not None: return self._remote.head_weights
+        return self._loaded.ensure_loaded().head_weights
+
+    @property
+    def head_bias(self):
+        if self._remote is not None: return self._remote.head_bias
+        return self._loaded.ensure_loaded().head_bias
+
+    @property
+    def available(self):
+        """Görsel analiz yapılabilir mi? Modeli YÜKLEMEZ (dosya kontrolü)."""
+        return self._remote is not None or self._loaded.available
+
+    @property
+    def is_loaded(self):
+        return self._remote is not None or self._loaded.loaded
+
+    @property
+    def is_remote(self):
+        return self._remote is not None
+
+    @property
+    def meta(self):
+        """🆕 Backbone bilgisi: {"backbone", "input_size", "preprocess"}"""
+        if self._remote is not None: return self._remote.meta
+        return self._loaded.meta
+
+    @property
+    def image_size(self):
+        """Model giriş boyutu (genişlik, yükseklik)."""
+        size = self.meta["input_size"]
+        return (size, size)
+
+    def warmup(self):
+        """
+        🆕 Modeli yükler ve boş bir görselle ilk inference'ı çalıştırır
+        (TensorFlow graph/kernel hazırlığı ilk gerçek taramaya kalmaz).
+
+        Returns:
+            float: Geçen süre (saniye)
+        """
+        start = time.time()
+        if self.model is not None:
+            blank = np.zeros(self.image_size[::-1] + (3,), dtype=np.uint8)
+            try:
+                self.compare_many([blank], [blank])
+            except Exception as e:
+                print(f"⚠️ Warmup inference başarısız: {e}")
+        elapsed = time.time() - start
+        print(f"🔥 Model warmup tamamlandı ({elapsed:.2f}s)")
+        return elapsed
+
+    def warmup_async(self, on_ready=None):
+        """
+        🆕 warmup()'ı arka plan thread'inde başlatır (tarayıcı ilk sayfayı yüklerken).
+
+        Args:
+            on_ready: Warmup bitince çağrılacak fonksiyon (opsiyonel)
+
+        Returns:
+            threading.Thread
+        """
+        def _run():
+            self.warmup()
+            if on_ready:
+                try:
+                    on_ready()
+                except Exception as e:
+                    print(f"⚠️ Warmup sonrası işlem başarısız: {e}")
+
+        thread = threading.Thread(target=_run, name="visualbrain-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def _decode_image(img, size):
+        """
+        🆕 Görseli bellekte model boyutunda RGB uint8 diziye çevirir.
+
+        Args:
+            img: Dosya yolu, PNG byte'ları (element.screenshot_as_png),
+                 NumPy dizisi (H, W, 3/4 RGB) veya PIL Image
+            size: Hedef boyut (genişlik, yükseklik)
+
+        Returns:
+            np.ndarray (H, W, 3) uint8 veya okunamazsa None
+        """
         try:
-            if not os.path.exists(img_path): return None
-            
-            img = image.load_img(img_path, target_size=(224, 224))
-            img_array = image.img_to_array(img)
-            img_array = np.expand_dims(img_array, axis=0)
-            return preprocess_input(img_array)
+            if isinstance(img, np.ndarray):
+                arr = img[..., :3] if img.ndim == 3 else np.stack([img] * 3, axis=-1)
+                if arr.shape[:2] == (size[1], size[0]):
+                    return arr
+                pil = Image.fromarray(np.ascontiguousarray(arr, dtype=np.uint8))
+            elif isinstance(img, (bytes, bytearray, memoryview)):
+                pil = Image.open(BytesIO(img))
+            elif isinstance(img, Image.Image):
+                pil = img
+            else:
+                if not os.path.exists(img): return None
+                pil = Image.open(img)
+
+            # Keras image.load_img ile aynı: RGB'ye çevir, 'nearest' ile boyutlandır
+            if pil.mode != "RGB":
+                pil = pil.convert("RGB")
+            if pil.size != size:
+                pil = pil.resize(size, Image.Resampling.NEAREST)
+            return np.asarray(pil)
         except:
             return None
 
+    def _prepare_batch(self, images):
+        """
+        🆕 Görselleri önceden ayrılmış tampona decode edip ön işler.
+        Çağıran _buffer_lock'u tutmalıdır; dönen dizi bir sonraki çağrıda ezilir.
+
+        Returns:
+            tuple: (batch (K, H, W, 3) float32 view, geçerli indeksler)
+        """
+        n = len(images)
+        size = self.image_size
+        shape = size[::-1] + (3,)
+        if self._batch_buffer.shape[0] < n or self._batch_buffer.shape[1:] != shape:
+            capacity = max(n, 2 * self._batch_buffer.shape[0], 8)
+            self._batch_buffer = np.empty((capacity,) + shape, dtype=np.float32)
+
+        valid = []
+        for i, img in enumerate(images):
+            arr = self._decode_image(img, size)
+            if arr is None: continue
+            self._batch_buffer[len(valid)] = arr
+            valid.append(i)
+
+        batch = self._batch_buffer[:len(valid)]
+        preprocess_batch(batch, self.meta["preprocess"])
+        return batch, valid
+
+    def _preprocess_image(self, img):
+        """Görseli modelin anlayacağı formata (1, H, W, 3) getirir."""
+        with self._buffer_lock:
+            batch, valid = self._prepare_batch([img])
+            return batch.copy() if valid else None
+
+    def embed(self, images):
+        """
+        🆕 Görselleri SADECE encoder'dan geçirip embedding matrisine çevirir.
+        Önbellekte (piksel hash'i) bulunan görseller encoder'a hiç verilmez.
+
+        Args:
+            images: Görsel listesi (yol, PNG byte'ları veya NumPy dizisi)
+
+        Returns:
+            np.ndarray: (N, D) float32 embedding matrisi. Okunamayan görsellerin
+            satırı NaN olur (score() bunları 0.0 benzerlik sayar).
+            Model yoksa None.
+        """
+        if not self.available: return None
+
+        size = self.image_size
+        decoded = [self._decode_image(img, size) for img in images]
+        valid = [i for i, arr in enumerate(decoded) if arr is not None]
+
+        vectors = {}  # görsel indeksi -> embedding
+        keys = {}
+        if self._cache is not None and valid:
+            keys = {i: pixel_key(decoded[i]) for i in valid}
+            hits = self._cache.get_many(self.model_version, list(keys.values()))
+            vectors = {i: hits[key] for i, key in keys.items() if key in hits}
+
+        misses = [i for i in valid if i not in vectors]
+        if misses:
+            remote = self._remote
+            encoded = self._encode([decoded[i] for i in misses])
+            if self._remote is not remote:
+                # Sunucu bağlantısı koptu, yerel modele geçildi: yeni versiyonla baştan
+                return self.embed(images)
+            if encoded is None: return None
+            vectors.update(zip(misses, encoded))
+            if self._cache is not None:
+                self._cache.put_many(self.model_version, [keys[i] for i in misses], encoded)
+
+        if vectors:
+            dim = next(iter(vectors.values())).shape[0]
+        elif self.encoder is not None:
+            dim = self.head_weights.shape[0]
+        else:
+            return None
+        embeddings = np.full((len(images), dim), np.nan, dtype=np.float32)
+        for i, vector in vectors.items():
+            embeddings[i] = vector
+        return embeddings
+
+    def _encode(self, arrays):
+        """
+        Decode edilmiş görselleri encoder'dan geçirir (uzak sunucu veya yerel model).
+
+        Returns:
+            np.ndarray (K, D) float32 veya encoder yoksa None
+        """
+        if self._remote is not None:
+            try:
+                return self._remote.embed(np.stack(arrays))
+            except (OSError, RuntimeError, ValueError) as e:
+                print(f"⚠️ Inference sunucusu kullanılamıyor ({e}), yerel modele geçiliyor.")
+                self._remote.close()
+                self._remote = None
+                self.model_version = self._loaded.version
+                return None
+
+        if self.encoder is None: return None
+        with self._buffer_lock:
+            batch, _ = self._prepare_batch(arrays)
+            features = self.encoder(batch, training=False)
+            return np.asarray(features, dtype=np.float32)
+
+    def feature_maps(self, tiles):
+        """
+        🆕 Giriş boyutundaki karoları (N, H, W, 3 uint8 RGB) pooling öncesi
+        evrişim haritalarına çevirir: (N, h, w, D). Tek encoder geçişi.
+
+        Returns:
+            np.ndarray veya desteklenmiyorsa (uzak/TFLite backend, pooling yok) None
+        """
+        if self._remote is not None or not self.available:
+            return None
+        extractor = self._loaded.ensure_loaded().feature_extractor()
+        if extractor is None:
+            return None
+        with self._buffer_lock:
+            batch, _ = self._prepare_batch(list(tiles))
+            return np.asarray(extractor(batch, training=False), dtype=np.float32)
+
+    def score(self, emb_a, emb_b):
+        """
+        🆕 Dense(1)+sigmoid karar katmanını NumPy'da uygular.
+
+        Args:
+            emb_a: (D,) veya (N, D) embedding
+            emb_b: (D,) veya (M, D) embedding
+
+        Returns:
+            İkisi de tek vektörse float, aksi halde (N, M) benzerlik matrisi
+        """
+        a = np.asarray(emb_a, dtype=np.float32)
+        b = np.asarray(emb_b, dtype=np.float32)
+        single = a.ndim == 1 and b.ndim == 1
+        a = np.atleast_2d(a)
+        b = np.atleast_2d(b)
+
+        # |a - b| @ w + bias  ->  (N, M)
+        # (N, M, D) fark tensörü yerine boyut blokları halinde toplanır: ara bellek O(N·M·blok)
+        weights = np.asarray(self.head_weights, dtype=np.float32)
+        dims = a.shape[1]
+        block = max(1, min(dims, _SCORE_BLOCK_ELEMENTS // max(1, a.shape[0] * b.shape[0])))
+        logits = np.full((a.shape[0], b.shape[0]), self.head_bias, dtype=np.float32)
+        for start in range(0, dims, block):
+            end = start + block
+            logits += np.abs(a[:, None, start:end] - b[None, :, start:end]) @ weights[start:end]
+        scores = np.nan_to_num(_sigmoid(logits), nan=0.0)
+
+        if single:
+            return float(scores[0, 0])
+        return scores
+
+    def compare_many(self, crops, refs):
+        """
+        🆕 Tüm adayları tüm referanslarla TEK inference çağrısında karşılaştırır.
+
+        Args:
+            crops: Aday görsel listesi
+            refs: Referans görsel listesi veya hazır (M, D) embedding matrisi
+
+        Returns:
+            np.ndarray: (len(crops), M) benzerlik matrisi (model yoksa sıfırlar)
+        """
+        n_refs = len(refs)
+        if self.model is None or not crops or n_refs == 0:
+            return np.zeros((len(crops), n_refs), dtype=np.float32)
+
+        if self.encoder is not None:
+            if isinstance(refs, np.ndarray):
+                # Referans embedding'leri hazır (prototip indeksi): sadece adaylar encode edilir
+                return self.score(self.embed(crops), refs)
+            # Adaylar + referanslar tek batch halinde encoder'dan geçer
+            embeddings = self.embed(list(crops) + list(refs))
+            return self.score(embeddings[:len(crops)], embeddings[len(crops):])
+
+        # Encoder ayrılamadıysa: tüm (aday, referans) çiftleri tek predict çağrısında
+        crop_arrays = [self._preprocess_image(p) for p in crops]
+        ref_arrays = [self._preprocess_image(p) for p in refs]
+        pairs = [
+            (i, j) for i, a in enumerate(crop_arrays) for j, b in enumerate(ref_arrays)
+            if a is not None and b is not None
+        ]
+        scores = np.zeros((len(crops), n_refs), dtype=np.float32)
+        if not pairs:
+            return scores
+
+        left = np.concatenate([crop_arrays[i] for i, _ in pairs], axis=0)
+        right = np.concatenate([ref_arrays[j] for _, j in pairs], axis=0)
+        prediction = self.model.predict([left, right], verbose=0)
+        rows, cols = zip(*pairs)
+        scores[list(rows), list(cols)] = prediction[:, 0]
+        return scores
+
     def compare_images(self, img_path1, img_path2):
-        """İki görseli EĞİTİLMİŞ modele sorar."""
+        """İki görseli EĞİTİLMİŞ modele sorar (yol, PNG byte'ları veya NumPy dizisi)."""
         if self.model is None: return 0.0
 
+        # 🆕 Encoder ayrıldıysa tek batch'te iki embedding + NumPy head
+        if self.encoder is not None:
+            embeddings = self.embed([img_path1, img_path2])
+            return self.score(embeddings[0], embeddings[1])
+
         img1 = self._preprocess_image(img_path1)
         img2 = self._preprocess_image(img_path2)
-        
+
         if img1 is None or img2 is None: return 0.0
 
         # Eğittiğimiz model iki giriş bekler: [img1, img2]
         prediction = self.model.predict([img1, img2], verbose=0)
-        
+
         similarity_score = float(prediction[0][0])
         return similarity_score
 
 # --- TEST ALANI ---
 if __name__ == "__main__":
     brain = VisualBrain()
-    
+
     base_path = r"C:\Users\cagap\Desktop\pton\Ytma\dataset_ready"
     if os.path.exists(base_path):
         print("\n--- MODEL TESTİ BAŞLIYOR ---")
@@ -70,4 +659,4 @@ if __name__ == "__main__":
         # img1 = ...
         # img2 = ...
         # print(brain.compare_images(img1, img2))
-        print("Model hafızaya alındı. Entegrasyon için hazır.")
\ No newline at end of file
+        print("Model hafızaya alındı. Entegrasyon için hazır.")
@@ -87,6 +87,7 @@ def main():
     
     finally:
         print("\n🛑 Test bitti.")
+        bot.close()
         driver.quit()
         
         # Rapor
@@ -6,6 +6,7 @@ Bu referanslar gelecekte model eğitimi için kullanılabilir.
 
 import os
 import time
+import numpy as np
 from PIL import Image
 from io import BytesIO
 from datetime import datetime
@@ -142,40 +143,28 @@ class AutoReferenceCapture:
             if not existing_refs:
                 return False
             
-            # Yeni image'i geçici kaydet (karşılaştırma için)
-            import tempfile
-            with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-                tmp_path = tmp.name
-                new_img.save(tmp_path, "PNG")
+            # AI model ile karşılaştır
+            from ai_model import VisualBrain
+            import config
             
-            try:
-                # AI model ile karşılaştır
-                from ai_model import VisualBrain
-                import config
-                
-                # Brain instance (cache varsa kullan)
-                if not hasattr(self, '_brain'):
-                    self._brain = VisualBrain(config.MODEL_PATH)
-                
-                # Mevcut referanslarla karşılaştır
-                DUPLICATE_THRESHOLD = 0.95  # %95+ benzerlik = duplicate
-                
-                for ref_file in existing_refs[:5]:  # Son 5 referansı kontrol et (performans)
-                    ref_path = os.path.join(self.output_dir, ref_file)
-                    similarity = self._brain.compare_images(tmp_path, ref_path)
-                    
-                    if similarity > DUPLICATE_THRESHOLD:
-                        print(f"   🔄 Duplicate atlandı: {ref_file} ile %{int(similarity*100)} benzer")
-                        return True
-                
-                return False
-                
-            finally:
-                # Geçici dosyayı temizle
-                try:
-                    os.remove(tmp_path)
-                except:
-                    pass
+            # Brain instance (model süreç genelinde paylaşılır, tekrar yüklenmez)
+            if not hasattr(self, '_brain'):
+                self._brain = VisualBrain(config.MODEL_PATH)
+            
+            # Mevcut referanslarla karşılaştır
+            DUPLICATE_THRESHOLD = 0.95  # %95+ benzerlik = duplicate
+            
+            # 🆕 Yeni image bellekten (NumPy) verilir, geçici dosya yazılmaz
+            ref_files = existing_refs[:5]  # Son 5 referansı kontrol et (performans)
+            ref_paths = [os.path.join(self.output_dir, f) for f in ref_files]
+            similarities = self._brain.compare_many([np.asarray(new_img)], ref_paths)[0]
+            
+            for ref_file, similarity in zip(ref_files, similarities):
+                if similarity > DUPLICATE_THRESHOLD:
+                    print(f"   🔄 Duplicate atlandı: {ref_file} ile %{int(similarity*100)} benzer")
+                    return True
+            
+            return False
                 
         except Exception as e:
             # Hata durumunda duplicate değil say (kaydetmeye devam et)
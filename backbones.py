@@ -0,0 +1,112 @@
+"""
+🧱 VISUAL BACKBONE REGISTRY
+Görsel eşleştiricinin encoder'ı (backbone) ve giriş çözünürlüğü buradan seçilir.
+train_ai.py modeli bu tanımlarla kurar ve yanına <model>.meta.json yazar;
+ai_model.py aynı dosyayı okuyup aynı boyut ve ön işlemeyi uygular.
+
+Ön işleme modları (float32 RGB 0-255 batch üzerinde, yerinde):
+- "caffe": RGB -> BGR, ImageNet ortalaması çıkarılır (ResNet50)
+- "tf":    [-1, 1] aralığına ölçeklenir (MobileNetV2)
+- "none":  Ham piksel; model kendi Rescaling katmanını içerir (MobileNetV3, EfficientNet)
+"""
+
+import json
+import os
+
+import numpy as np
+
+# name -> Keras applications sınıfı, varsayılan giriş boyutu, ön işleme
+BACKBONES = {
+    "resnet50": {"keras_class": "ResNet50", "input_size": 224, "preprocess": "caffe"},
+    "mobilenet_v2": {"keras_class": "MobileNetV2", "input_size": 128, "preprocess": "tf"},
+    "mobilenet_v3_small": {"keras_class": "MobileNetV3Small", "input_size": 128, "preprocess": "none"},
+    "mobilenet_v3_large": {"keras_class": "MobileNetV3Large", "input_size": 128, "preprocess": "none"},
+    "efficientnet_b0": {"keras_class": "EfficientNetB0", "input_size": 128, "preprocess": "none"},
+}
+
+# Meta dosyası olmayan (eski) modeller ResNet50 @ 224 kabul edilir
+DEFAULT_BACKBONE = "resnet50"
+
+_CAFFE_MEAN = np.array([103.939, 116.779, 123.68], dtype=np.float32)
+
+
+def get_backbone(name):
+    """Backbone tanımını döner; bilinmeyen ad için ValueError."""
+    try:
+        return BACKBONES[name]
+    except KeyError:
+        raise ValueError(f"Bilinmeyen backbone: {name} (seçenekler: {', '.join(BACKBONES)})")
+
+
+def default_model_path(name):
+    """Backbone için train_ai.py'nin kaydettiği varsayılan model dosyası."""
+    return "my_best_model.keras" if name == DEFAULT_BACKBONE else f"my_best_model_{name}.keras"
+
+
+def resolve(name, input_size=None):
+    """
+    Returns:
+        dict: {"backbone", "input_size", "preprocess"}
+    """
+    spec = get_backbone(name)
+    return {
+        "backbone": name,
+        "input_size": int(input_size or spec["input_size"]),
+        "preprocess": spec["preprocess"],
+    }
+
+
+def build_backbone(name, input_size=None, weights="imagenet"):
+    """
+    ImageNet ağırlıklı, global average pooling'li encoder'ı kurar (TensorFlow gerekir).
+    """
+    import tensorflow as tf
+
+    meta = resolve(name, input_size)
+    size = meta["input_size"]
+    builder = getattr(tf.keras.applications, get_backbone(name)["keras_class"])
+    return builder(weights=weights, include_top=False, input_shape=(size, size, 3), pooling="avg")
+
+
+def preprocess_batch(batch, mode):
+    """
+    (N, H, W, 3) float32 RGB 0-255 batch'i yerinde ön işler.
+
+    Returns:
+        Aynı dizi (zincirleme kullanım için)
+    """
+    if mode == "caffe":
+        batch[...] = batch[..., ::-1]  # RGB -> BGR
+        batch -= _CAFFE_MEAN
+    elif mode == "tf":
+        batch /= 127.5
+        batch -= 1.0
+    elif mode != "none":
+        raise ValueError(f"Bilinmeyen ön işleme modu: {mode}")
+    return batch
+
+
+# --- MODEL META DOSYASI ---
+
+def meta_path(model_path):
+    return os.path.splitext(model_path)[0] + ".meta.json"
+
+
+def read_model_meta(model_path):
+    """
+    Modelin yanındaki .meta.json'ı okur; yoksa varsayılan backbone döner.
+    TensorFlow gerektirmez (model yüklenmeden giriş boyutu bilinir).
+    """
+    meta = resolve(DEFAULT_BACKBONE)
+    try:
+        with open(meta_path(model_path), "r", encoding="utf-8") as f:
+            meta.update(json.load(f))
+    except (OSError, ValueError):
+        pass
+    meta["input_size"] = int(meta["input_size"])
+    return meta
+
+
+def write_model_meta(model_path, meta):
+    with open(meta_path(model_path), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
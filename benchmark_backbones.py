@@ -0,0 +1,109 @@
+"""
+🏁 BACKBONE BENCHMARK
+Her backbone için prototypes/ üzerinde saniyedeki crop sayısını ve
+eşleştirme doğruluğunu ölçer.
+
+- Eğitilmiş model varsa (train_ai.py, VISUAL_BACKBONE=<ad>) Siyam skoru kullanılır
+- Yoksa ImageNet ağırlıklı encoder + kosinüs benzerliği (eğitimsiz taban çizgisi)
+- Doğruluk: leave-one-out en yakın komşu, dosya adındaki kategoriye göre
+
+Kullanım:
+    python benchmark_backbones.py
+"""
+
+import os
+from collections import Counter
+
+import numpy as np
+
+from ai_model import VisualBrain
+from backbones import BACKBONES, resolve, build_backbone, preprocess_batch, default_model_path
+from prototype_index import category_of
+from quantize_model import list_prototypes, measure, BENCH_BATCH
+
+
+class _PretrainedEncoder:
+    """Eğitilmiş model olmadan backbone'u ImageNet ağırlıklarıyla ölçer."""
+
+    def __init__(self, name):
+        self.meta = resolve(name)
+        self.encoder = build_backbone(name, self.meta["input_size"])
+        self.size = (self.meta["input_size"], self.meta["input_size"])
+
+    def embed(self, images):
+        arrays = [VisualBrain._decode_image(img, self.size) for img in images]
+        batch = np.stack([a if a is not None else np.zeros(self.size + (3,), np.uint8) for a in arrays])
+        batch = preprocess_batch(batch.astype(np.float32), self.meta["preprocess"])
+        return np.asarray(self.encoder(batch, training=False), dtype=np.float32)
+
+    @staticmethod
+    def score(emb_a, emb_b):
+        a = emb_a / (np.linalg.norm(emb_a, axis=1, keepdims=True) + 1e-8)
+        b = emb_b / (np.linalg.norm(emb_b, axis=1, keepdims=True) + 1e-8)
+        return a @ b.T
+
+
+def leave_one_out_accuracy(scores, labels):
+    """
+    Her görsel için kendisi hariç en benzer görselin kategorisi tutuyor mu?
+    Sadece en az iki örneği olan kategoriler sayılır.
+    """
+    counts = Counter(labels)
+    scores = np.array(scores, dtype=np.float32)
+    np.fill_diagonal(scores, -np.inf)
+    nearest = scores.argmax(axis=1)
+    hits = [labels[nearest[i]] == labels[i] for i in range(len(labels)) if counts[labels[i]] > 1]
+    return float(np.mean(hits)) if hits else 0.0
+
+
+def benchmark(name, images, labels):
+    model_path = default_model_path(name)
+    if os.path.exists(model_path):
+        brain = VisualBrain(model_path, use_server=False, use_cache=False)
+        if brain.encoder is None:
+            return None
+        mode, encoder, size = "siamese", brain.encoder, brain.meta["input_size"]
+    else:
+        brain = _PretrainedEncoder(name)
+        mode, encoder, size = "imagenet", brain.encoder, brain.meta["input_size"]
+
+    embeddings, ms = measure(brain, images)
+    return {
+        "mode": mode,
+        "input_size": size,
+        "params_m": encoder.count_params() / 1e6,
+        "crops_per_sec": 1000.0 / ms,
+        "accuracy": leave_one_out_accuracy(brain.score(embeddings, embeddings), labels),
+    }
+
+
+def main():
+    images = list_prototypes()
+    labels = [category_of(path) for path in images]
+    if len(images) < 2:
+        print("❌ HATA: Benchmark için yeterli prototip görseli yok.")
+        return
+
+    print(f"🏁 {len(images)} görsel, {len(set(labels))} kategori, batch={BENCH_BATCH}")
+    results = {}
+    for name in BACKBONES:
+        print(f"⏱️ {name} ölçülüyor...")
+        try:
+            result = benchmark(name, images, labels)
+        except Exception as e:
+            print(f"⚠️ {name} atlandı: {e}")
+            continue
+        if result:
+            results[name] = result
+
+    print("\n" + "=" * 78)
+    print(f"{'Backbone':<22}{'Mod':<10}{'Boyut':>6}{'Param (M)':>11}{'Crop/sn':>11}{'LOO doğruluk':>15}")
+    print("-" * 78)
+    for name, r in results.items():
+        print(f"{name:<22}{r['mode']:<10}{r['input_size']:>6}{r['params_m']:>11.1f}"
+              f"{r['crops_per_sec']:>11.1f}{r['accuracy']:>15.1%}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+📋 COLUMNAR CANDIDATE TABLE
+Taramadaki adayların skorları aday başına dict yerine tek bir NumPy structured
+array'de tutulur; görsel skor ataması, ağırlıklandırma, güven seviyesi ve eşik
+kontrolleri tüm adaylara dizi işlemleriyle uygulanır.
+
+Element / snapshot / attrs gibi Python nesneleri satır sırasıyla paralel listelerde
+durur. Aday dict'i ve "details" debug metni sadece ilk k satır için üretilir.
+
+🌳 Dal-sınır: görsel skoru henüz bilinmeyen ("açık") satırların final skoru görsel
+skorda monoton artandır; görsel skor 1.0 alınarak üst sınır hesaplanır. Görsel analiz
+en yüksek üst sınırdan başlar; üst sınırı mevcut kazananı geçemeyen satırlar budanır.
+"""
+
+import numpy as np
+
+import config
+
+DTYPE = np.dtype([
+    ("index", np.int32),      # Snapshot'taki sıra (debug çıktısı için)
+    ("crop", np.int32),       # Görsel analize girdiyse satırın kendi indeksi, yoksa -1
+    ("resolved", np.bool_),   # Görsel skor kapı / semantik / ısı haritası ile verildi
+    ("y", np.float64),
+    ("vis", np.float64),
+    ("auto_vis", np.float64), # Aynı batch'ten auto_captured skoru (yoksa NaN)
+    ("visual_ref", np.int32), # 📌 Görsel skoru veren referans (refs indeksi, yoksa -1)
+    ("sem", np.float64),
+    ("loc", np.float64),
+    ("tag", np.float64),
+    ("prox", np.float64),
+    ("score", np.float64),
+])
+
+CONFIDENCE_EMOJI = {"HIGH": "🟢", "MEDIUM": "🟡", "LOW": "🟠", "REJECT": "🔴"}
+
+
+class CandidateTable:
+    """
+    Bir taramanın adayları: sütunlar self.rows[alan], nesneler paralel listelerde.
+    """
+
+    def __init__(self, items):
+        """
+        Args:
+            items: scan_and_decide ilk geçişinin aday dict'leri
+                   (index, element, node, attrs, y, loc, tag, sem, vis, resolved)
+                   vis None: görsel skoru dal-sınır turlarında belirlenecek açık aday
+                   (🧾 günlükten gelen adaylarda auto_vis, visual_ref da bulunur)
+        """
+        self.elements = [item["element"] for item in items]
+        self.nodes = [item["node"] for item in items]
+        self.attrs = [item["attrs"] for item in items]
+        self.tags = np.array([(attrs.get("tag") or "").lower() for attrs in self.attrs], dtype=object)
+        self.confidence = np.full(len(items), "REJECT", dtype=object)
+
+        rows = np.zeros(len(items), dtype=DTYPE)
+        rows["index"] = [item["index"] for item in items]
+        rows["crop"] = -1
+        rows["resolved"] = [item["resolved"] for item in items]
+        rows["y"] = [item["y"] for item in items]
+        rows["vis"] = [np.nan if item["vis"] is None else item["vis"] for item in items]
+        rows["auto_vis"] = [item.get("auto_vis", np.nan) for item in items]  # 🧾 Günlükten gelebilir
+        rows["visual_ref"] = [item.get("visual_ref", -1) for item in items]
+        rows["sem"] = [item["sem"] for item in items]
+        rows["loc"] = [item["loc"] for item in items]
+        rows["tag"] = [item["tag"] for item in items]
+        self.rows = rows
+        # 🌳 Görsel analize aday ama skoru henüz bilinmeyen satırlar
+        self.open = np.isnan(rows["vis"])
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _final(self, rules, category, vis):
+        """Verilen görsel skorlarla final skor (+ yakınlık) ve güven seviyesi."""
+        rows = self.rows
+        final, levels = rules.calculate_final_scores(vis, rows["sem"], rows["loc"], rows["tag"], category=category)
+        return final + rows["prox"], levels.astype(object)
+
+    def prepare(self, rules, category, last_input_y=None):
+        """Görselden bağımsız yakınlık skoru (üst sınırlar da bunu içerir)."""
+        if category == "button" and last_input_y:
+            self.rows["prox"] = rules.score_proximities(self.rows["y"], last_input_y)
+
+    def next_visual_batch(self, rules, category, size):
+        """
+        🌳 Görsel analize girecek sıradaki açık satırlar: üst sınırı azalan.
+
+        Üst sınırı (görsel skor = 1.0) kabul edilen mevcut en iyi skoru geçemeyen
+        veya hiç eşiği geçemeyecek satırlar döndürülmez (budanır).
+
+        Returns:
+            np.ndarray: En fazla size satır indeksi (boşsa analiz biter)
+        """
+        if not self.open.any():
+            return np.empty(0, dtype=np.intp)
+        known = ~self.open
+        score, levels = self._final(rules, category, np.where(known, self.rows["vis"], 0.0))
+        accepted = known & self._accepts(category, score, levels)
+        incumbent = score[accepted].max() if accepted.any() else -np.inf
+
+        bound, bound_levels = self._final(rules, category, np.where(self.open, 1.0, self.rows["vis"]))
+        rows = np.flatnonzero(self.open & (bound > incumbent) & self._accepts(category, bound, bound_levels))
+        return rows[np.argsort(-bound[rows], kind="stable")][:size]
+
+    def record_visual(self, rows, primary_scores, auto_scores, best_refs):
+        """
+        Görsel analize giren satırlara sonuçları yazar (diziler satır indeksli).
+
+        Returns:
+            int: Görsel skoru hesaplanamayıp 0.25 fallback alan satır sayısı
+        """
+        primary = np.asarray(primary_scores, dtype=np.float64)[rows]
+        ok = ~np.isnan(primary)
+        self.rows["crop"][rows] = rows
+        self.rows["vis"][rows] = np.where(ok, primary, 0.25)  # Görsel analiz başarısız, fallback
+        self.rows["visual_ref"][rows] = np.where(ok, np.asarray(best_refs)[rows], -1)
+        if auto_scores is not None:
+            self.rows["auto_vis"][rows] = np.where(ok, np.asarray(auto_scores, dtype=np.float64)[rows], np.nan)
+        self.open[rows] = False
+        return int((~ok).sum())
+
+    def close_open(self):
+        """
+        🌳 Budanan / bütçe dışı kalan açık satırlara 0.25 fallback verir.
+
+        Returns:
+            int: Kapatılan satır sayısı
+        """
+        count = int(self.open.sum())
+        self.rows["vis"][self.open] = 0.25
+        self.open[:] = False
+        return count
+
+    def skipped(self):
+        """Görsel skoru ne ölçülen ne de kapı / semantik / ısı haritasıyla verilen satır sayısı."""
+        return int(((self.rows["crop"] < 0) & ~self.rows["resolved"]).sum())
+
+    def score(self, rules, category, last_input_y=None):
+        """Kategori ağırlıkları, semantik bonus/ceza, yakınlık ve güven seviyesi (vektörel)."""
+        self.prepare(rules, category, last_input_y)
+        self.rows["score"], self.confidence = self._final(rules, category, self.rows["vis"])
+
+    def accepted(self, category):
+        """Eşik kontrolünü geçen satırların maskesi."""
+        return self._accepts(category, self.rows["score"], self.confidence)
+
+    def _accepts(self, category, score, confidence):
+        mask = (score > config.get_min_threshold_for_category(category)) | (confidence != "REJECT")
+
+        # 🆕 SEARCH İÇİN DAHA TOLERANSLI EŞİK
+        # Search input'ları kritik olduğu için düşük skorlu bile kabul et
+        if category == "search":
+            mask |= (self.tags == "input") & (score > 0.0)
+
+        # 🆕 EVRENSEL: ADD_TO_CART VE CHECKOUT İÇİN DE TOLERANSLI EŞİK
+        # Bu butonlar farklı sitelerde çok farklı yapıda olabilir
+        if category in ["add_to_cart", "checkout"]:
+            mask |= np.isin(self.tags, ["button", "a", "div", "span"]) & (score > 0.05)
+        return mask
+
+    def ranked(self, category):
+        """Kabul edilen satırlar, skora göre azalan (eşitlikte DOM sırası)."""
+        accepted = np.flatnonzero(self.accepted(category))
+        return accepted[np.argsort(-self.rows["score"][accepted], kind="stable")]
+
+    def details(self, r):
+        row = self.rows[r]
+        return (f"V:{row['vis']:.2f} S:{row['sem']:.1f} L:{row['loc']:.1f} T:{row['tag']:.1f} "
+                f"P:{row['prox']:.2f} [{self.confidence[r]}]")
+
+    def candidate(self, r):
+        """Satırın aday dict'i (sadece ilk k satır için üretilir)."""
+        row = self.rows[r]
+        return {
+            "element": self.elements[r],
+            "score": float(row["score"]),
+            "confidence": self.confidence[r],
+            "attrs": self.attrs[r],
+            "visual_score": float(row["vis"]),  # 📸 Auto-capture için
+            "auto_visual_score": None if np.isnan(row["auto_vis"]) else float(row["auto_vis"]),
+            "visual_ref": int(row["visual_ref"]),
+            "node": self.nodes[r],  # 📸 Snapshot (konum / boyut)
+            "details": self.details(r),
+        }
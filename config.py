@@ -1,6 +1,7 @@
 # config.py
 import os
 from pathlib import Path
+from backbones import default_model_path
 
 # --- .env DOSYASINDAN YÜKLEME ---
 # python-dotenv kurulu değilse manuel yükleme yap
@@ -28,9 +29,129 @@ if not GEMINI_API_KEY:
     print("   Örnek: .env.example dosyasını .env olarak kopyalayın.")
 
 # --- MODEL VE DOSYA YOLLARI ---
-MODEL_PATH = "my_best_model.keras"
+# 🆕 GÖRSEL BACKBONE (backbones.py): resnet50, mobilenet_v2, mobilenet_v3_small,
+# mobilenet_v3_large, efficientnet_b0. Giriş boyutu None ise backbone varsayılanı.
+# train_ai.py bu ayarlarla eğitir; çıkarımda modelin .meta.json dosyası okunur.
+VISUAL_BACKBONE = os.getenv("VISUAL_BACKBONE", "resnet50")
+VISUAL_INPUT_SIZE = int(os.getenv("VISUAL_INPUT_SIZE", "0")) or None
+
+KERAS_MODEL_PATH = default_model_path(VISUAL_BACKBONE)
+MODEL_PATH = os.getenv("VISUAL_MODEL_PATH", KERAS_MODEL_PATH)
 PROTOTYPES_DIR = "prototypes"
-TEMP_SCAN_IMAGE = "temp_scan.png"
+
+# 🆕 QUANTIZE EDİLMİŞ CPU BACKEND'LERİ (quantize_model.py ile üretilir)
+# Kullanmak için MODEL_PATH'i (veya VISUAL_MODEL_PATH env) .tflite dosyasına çevirin
+TFLITE_FP16_PATH = KERAS_MODEL_PATH.replace(".keras", "_fp16.tflite")
+TFLITE_INT8_PATH = KERAS_MODEL_PATH.replace(".keras", "_int8.tflite")
+
+# 🆕 TensorFlow ve model ilk görsel analizde yüklenir (lazy).
+# True ise SmartBot oluşturulurken arka planda yükleme + warmup inference başlar.
+MODEL_BACKGROUND_WARMUP = True
+
+# 🆕 LOCAL INFERENCE SERVER (inference_server.py)
+# USE_INFERENCE_SERVER=1 ise VisualBrain encoder'ı yüklemek yerine sunucuya bağlanır
+# (varsayılan kapalı: sunucusuz koşularda her bot başarısız bağlantı denemesi yapmasın)
+USE_INFERENCE_SERVER = os.getenv("USE_INFERENCE_SERVER", "0") == "1"
+INFERENCE_SOCKET = os.getenv("INFERENCE_SOCKET", "knowledge/inference.sock")
+INFERENCE_MAX_BATCH = 64           # Bir batch'teki maksimum görsel
+INFERENCE_BATCH_DEADLINE_MS = 5    # İlk istekten sonra diğer istekler için bekleme
+INFERENCE_TIMEOUT = 30.0           # İstemci socket zaman aşımı (saniye)
+
+# 🆕 EMBEDDING ÖNBELLEĞİ (embedding_cache.py)
+# (model versiyonu, crop piksel hash'i) -> embedding; bellek LRU + SQLite
+EMBEDDING_CACHE_ENABLED = True
+EMBEDDING_CACHE_PATH = "knowledge/embedding_cache.sqlite"
+EMBEDDING_CACHE_MEMORY_ITEMS = 2048   # Süreç içi LRU kapasitesi
+EMBEDDING_CACHE_DISK_ITEMS = 20000    # SQLite kapasitesi (float16, ResNet50'de ~80 MB)
+EMBEDDING_CACHE_VERSION_MAX_AGE = 7   # Bu kadar gün kullanılmayan model versiyonu silinir
+
+# 🆕 PROTOTYPE EMBEDDING INDEX (float16, memory-mapped)
+# prototypes/ ve prototypes/auto_captured/ embedding'leri burada tutulur
+EMBEDDING_INDEX_DIR = "knowledge/embedding_index"
+PROTOTYPE_RETRY_INTERVAL = 60.0    # Encode başarısız olunca refresh_if_stale bu kadar saniye beklemez
+
+# 🆕 NEAREST-PROTOTYPE ARAMASI (knn_index.py)
+KNN_TOP_K = 5                    # Crop başına döndürülen en yakın prototip
+KNN_SHORTLIST = 32               # PCA/IVF aramasında gerçek karar katmanıyla yeniden skorlanan en az aday
+KNN_SHORTLIST_RATIO = 0.02       # ... veya aranan satırların bu oranı (hangisi büyükse)
+KNN_COMPRESS_THRESHOLD = 2000    # Bu sayının üstünde PCA + IVF (alt-doğrusal arama)
+KNN_PCA_DIMS = 128               # Sıkıştırılmış kod boyutu
+KNN_NPROBE = 8                   # Sorgu başına taranan IVF kümesi
+
+# 🆕 PERCEPTUAL CASCADE (perceptual_cascade.py)
+# Ucuz özellik skoru (phash + renk + kenar) bu eşiklerin dışındaysa CNN çalışmaz
+PERCEPTUAL_CASCADE_ENABLED = True
+PERCEPTUAL_ACCEPT = 0.90    # Bu ve üstü: referansla neredeyse aynı -> kabul
+PERCEPTUAL_REJECT = 0.35    # Bu ve altı: hiç benzemiyor -> ret
+PERCEPTUAL_WEIGHTS = {"hash": 0.5, "color": 0.25, "edges": 0.25}
+PERCEPTUAL_CALIBRATION_MIN = 20      # Kabul/ret kararı için gereken CNN örneği (öncesinde bant da CNN'e gider)
+PERCEPTUAL_REJECT_CNN_MAX = 0.5      # Ret bandının CNN skorları bunun altında kalmalı (Siyam karar eşiği)
+PERCEPTUAL_CALIBRATION_WINDOW = 200  # Kabul skorunun hesaplandığı son CNN örnekleri
+
+# --- 🔥 SAYFA ISI HARİTASI (FEATURE-MAP LOCALIZATION) ---
+# Tek ekran görüntüsü encode edilir, tıklanabilir kutular evrişim haritası üzerinde skorlanır
+# Bulunan elementler XPath adaylarına eklenir (canvas / karışık class isimli sayfalar için)
+# "off": kapalı | "auto": XPath adayı yoksa veya çok fazlaysa | "always": her taramada
+VISUAL_LOCALIZATION = os.getenv("VISUAL_LOCALIZATION", "off")
+LOCALIZE_ELEMENT_LIMIT = 150   # "auto" modunda bu sayının üstündeki aday listesine ısı haritası adayları eklenir
+LOCALIZE_TOP_K = 10            # Aday listesine eklenecek maksimum element
+LOCALIZE_MIN_SCORE = 0.5       # Bu skorun altındaki kutular eklenmez
+LOCALIZE_MAX_BOXES = 1000      # Ekran görüntüsünde skorlanan maksimum tıklanabilir kutu
+
+# --- 🚦 ÖĞRENİLMİŞ GÖRSEL KAPI (visual_gate.py / train_visual_gate.py) ---
+# Görsel skoru hesaplanan adaylar günlüğe yazılır; eğitilen politika kategori bazında
+# "sem_score >= 2.0" kuralının yerini alır (politikası olmayan kategoride eski kural)
+VISUAL_GATE_ENABLED = True
+VISUAL_GATE_LOGGING = True
+VISUAL_GATE_LOG_PATH = "knowledge/visual_gate_samples.jsonl"
+VISUAL_GATE_POLICY_PATH = "knowledge/visual_gate_policy.json"
+VISUAL_GATE_PRECISION = 0.97   # Atlanan adayların en az bu oranı görselle de kazanmış olmalı
+VISUAL_GATE_MIN_SAMPLES = 50   # Kategori başına minimum eğitim kaydı
+VISUAL_GATE_MIN_SKIPS = 10     # Eşiğin üstünde kalması gereken minimum kayıt
+
+# --- 💾 KNOWLEDGE JSON KAYDI (json_store.py) ---
+# İstatistik dosyaları en fazla bu aralıkla (saniye) ve bot kapanırken yazılır
+KNOWLEDGE_FLUSH_INTERVAL = 30.0
+
+# --- 📌 REFERANS İSABET İSTATİSTİKLERİ (reference_stats.py) ---
+# Site + kategori başına kazandıran referanslar önce denenir
+REFERENCE_STATS_PATH = "knowledge/reference_stats.json"
+REFERENCE_EARLY_PROBES = 2      # kNN aramasından önce denenen en iyi referans sayısı
+REFERENCE_EARLY_EXIT = 0.85     # Bu skoru geçen crop için diğer referanslara bakılmaz
+
+# --- 🖼️ VIEWPORT CAPTURE (viewport_capture.py) ---
+# Aday görselleri sayfa görüntüsünden kesilir; ekran dışındakiler için en fazla bu kadar ek görüntü
+CAPTURE_MAX_EXTRA = 4
+CAPTURE_EVIDENCE_MAX_AGE = 10.0  # log_action bu süreden eski tarama görüntüsünü kullanmaz (saniye)
+SCAN_PIPELINE_ENABLED = True     # ⏩ Crop'lar ekran görüntüsü alınırken worker thread'de skorlanır (scan_pipeline.py)
+
+# --- 🌳 DAL-SINIR GÖRSEL ANALİZ (candidate_table.py) ---
+# Eski "ilk 15 element" kesmesi yerine: üst sınırı en yüksek adaylar önce, kazananı geçemeyenler budanır
+VISUAL_BATCH_SIZE = 8              # Tur başına görsel analize giren aday sayısı
+VISUAL_ANALYSIS_BUDGET = 40        # Tarama başına en fazla görsel analiz (çok büyük sayfalar için)
+
+# --- 🧭 XPATH TELEMETRİSİ (xpath_telemetry.py) ---
+XPATH_TELEMETRY_PATH = "knowledge/xpath_telemetry.json"
+
+# --- 💾 ELEMENT CACHE (element_cache.py) ---
+ELEMENT_CACHE_SIZE = 64            # En fazla giriş (LRU ile en eskisi atılır)
+ELEMENT_CACHE_TTL = 600            # Giriş ömrü (saniye); uzun çoklu site koşularında bellek sınırlı kalır
+
+# --- 🧩 ŞABLON CACHE (template_cache.py) ---
+TEMPLATE_CACHE_PATH = "knowledge/template_cache.json"
+TEMPLATE_DEPTH = 4                 # Parmak izine giren body altı seviye sayısı
+TEMPLATE_MAX_CHILDREN = 12         # Seviye başına en fazla (tekrarsız) çocuk
+TEMPLATE_MIN_SCORE = 0.6           # Bu skorun altındaki kazananlar şablona kaydedilmez
+TEMPLATE_MAX_MISSES = 2            # Iskalama isabeti bu kadar aşarsa şablon girişi silinir
+TEMPLATE_MAX_PER_KEY = 8           # Site + kategori + hedef başına en fazla şablon
+
+# --- 🧾 MUTASYON GÜNLÜĞÜ (scan_journal.py) ---
+# Aynı sayfadaki tekrar taramalar sadece yeni / değişen düğümleri okur ve görsel analize sokar
+MUTATION_JOURNAL_ENABLED = True
+
+# --- 👁️ DOM SAKİNLİK BEKLEMESİ (dom_observer.py) ---
+DOM_QUIET_MS = 250                 # DOM bu süre değişmezse tarama başlar (ms)
+DOM_QUIET_TIMEOUT = 2.0            # Sürekli değişen sayfalarda en fazla bekleme (saniye)
 
 # --- PUANLAMA MOTORU AYARLARI (HEURISTICS) ---
 # Varsayılan ağırlıklar (kategori bulunamazsa kullanılır)
@@ -85,6 +206,9 @@ CATEGORY_MIN_THRESHOLDS = {
 # Genel eşik değeri (fallback)
 SCORE_THRESHOLD = 0.10  # Düşürüldü  
 
+# 📋 Aday dict'i ve debug metni üretilen ilk satır sayısı (auto_captured fallback ilk 5'e bakar)
+CANDIDATE_DETAIL_TOP_K = 5
+
 def get_weights_for_category(category: str) -> dict:
     """Kategori için uygun ağırlıkları döner."""
     return CATEGORY_WEIGHTS.get(category, DEFAULT_WEIGHTS)
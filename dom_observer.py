@@ -0,0 +1,103 @@
+"""
+👁️ DOM OBSERVER
+Sayfaya bir kez enjekte edilen MutationObserver ile DOM hareketliliğini izler.
+
+document.readyState SPA sitelerde (Trendyol vb.) içerik render edilmeden çok önce
+"complete" olur; sabit time.sleep() ise ya gereksiz bekler ya da yetmez.
+wait_for_quiet() DOM belirli bir süre (DOM_QUIET_MS) değişmeden kaldığında hemen,
+en geç DOM_QUIET_TIMEOUT sonunda döner.
+
+- Observer window.__smartDomObserver altında tutulur; aynı belgede tekrar kurulmaz
+  (sayfa değişince yeni belgeye yeniden kurulur)
+- Sakinlik için sadece yapısal değişiklikler (childList, characterData) sayılır; carousel /
+  animasyonların sürekli değiştirdiği style / class attribute'ları DOM'u "meşgul" saymaz
+- 🆕 Sayfa epoch'u: düğüm silen her mutasyon epoch'u artırır, id her belgede yenidir.
+  Saklı WebElement'lerin hâlâ güvenilir olup olmadığı (element_cache) buradan anlaşılır
+- 🆕 Mutasyon günlüğü: eklenen (alt ağacıyla), attribute'u veya metni değişen elementler
+  o anki nesil numarasıyla (el.__smartGen) işaretlenir; metin değişikliği ataları da
+  işaretler (innerText'leri değişir). Tarama nesli ilerletir (checkpoint), sonraki tarama
+  sadece checkpoint'ten sonra işaretlenenleri yeniden okur (scan_journal)
+"""
+
+import config
+from logger import get_bot_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_bot_logger()
+
+# Observer'ı kurar (yoksa) ve durum nesnesini döndürür (diğer script'lerin başına eklenebilir)
+INSTALL_JS = """
+function installObserver() {
+    var o = window.__smartDomObserver;
+    if (o && o.root === document) return o;
+    o = {root: document, id: Math.random().toString(36).slice(2), epoch: 0, gen: 1, last: performance.now(), mutations: 0};
+    function mark(el, subtree) {
+        if (!el || el.nodeType !== 1) return;
+        el.__smartGen = o.gen;
+        if (subtree) {
+            var all = el.getElementsByTagName('*');
+            for (var i = 0; i < all.length; i++) all[i].__smartGen = o.gen;
+        }
+    }
+    function markAncestors(el) {
+        for (var e = el; e && e.nodeType === 1 && e.__smartGen !== o.gen; e = e.parentElement) e.__smartGen = o.gen;
+    }
+    function handle(records) {
+        var structural = 0, removed = false;
+        for (var i = 0; i < records.length; i++) {
+            var r = records[i];
+            if (r.type === 'attributes') { mark(r.target, false); continue; }
+            structural++;
+            if (r.type === 'characterData') { markAncestors(r.target.parentElement); continue; }
+            for (var j = 0; j < r.addedNodes.length; j++) mark(r.addedNodes[j], true);
+            markAncestors(r.target);
+            removed = removed || r.removedNodes.length > 0;
+        }
+        // Sakinlik sadece yapısal değişikliklerle ölçülür (attribute animasyonları sayılmaz)
+        if (structural) { o.last = performance.now(); o.mutations += structural; }
+        if (removed) o.epoch++;
+    }
+    o.observer = new MutationObserver(handle);
+    // Henüz teslim edilmemiş kayıtları işler (checkpoint öncesi)
+    o.flush = function () { handle(o.observer.takeRecords()); };
+    o.observer.observe(document.documentElement || document,
+                       {childList: true, subtree: true, characterData: true, attributes: true});
+    window.__smartDomObserver = o;
+    return o;
+}
+"""
+
+_WAIT_JS = INSTALL_JS + """
+var quietMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var o = installObserver(), start = performance.now(), before = o.mutations;
+(function poll() {
+    var now = performance.now(), idle = now - o.last, waited = now - start;
+    if (idle >= quietMs || waited >= timeoutMs) {
+        done({waited: waited / 1000, stable: idle >= quietMs, mutations: o.mutations - before});
+        return;
+    }
+    setTimeout(poll, Math.max(10, Math.min(quietMs - idle, timeoutMs - waited)));
+})();
+"""
+
+
+def wait_for_quiet(driver, quiet_ms=None, timeout=None):
+    """
+    DOM sakinleşene kadar bekler (tek execute_async_script çağrısı).
+
+    Args:
+        driver: Selenium WebDriver
+        quiet_ms: DOM'un değişmeden kalması gereken süre (ms)
+        timeout: En fazla bekleme (saniye)
+
+    Returns:
+        dict: {"waited": saniye, "stable": bool, "mutations": bekleme sırasındaki değişiklik sayısı}
+              Observer kurulamazsa None
+    """
+    quiet_ms = config.DOM_QUIET_MS if quiet_ms is None else quiet_ms
+    timeout = config.DOM_QUIET_TIMEOUT if timeout is None else timeout
+    try:
+        return driver.execute_async_script(_WAIT_JS, quiet_ms, timeout * 1000)
+    except Exception as e:
+        log.warning(f"DOM observer beklemesi başarısız: {e}")
+        return None
@@ -0,0 +1,170 @@
+"""
+📸 ONE-ROUND-TRIP DOM SNAPSHOT
+Aday elementlerin tarama için gereken tüm alanlarını tek bir execute_script
+çağrısıyla okur. Eskiden her aday için is_displayed, size, location, tag_name ve
+~17 get_attribute çağrısı (aday başına ~20 WebDriver HTTP isteği) yapılıyordu.
+
+Her düğüm için dönen alanlar:
+- element (WebElement), tag, role, type, class, id, placeholder, value, title, aria_label
+- text (görünür metin), inner_text
+- x, y (sayfa koordinatı), width, height (getBoundingClientRect)
+- visible (hesaplanmış stil: display / visibility / opacity + boyut)
+"""
+
+import dom_observer
+from logger import get_bot_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_bot_logger()
+
+# Uzun container metinleri JSON'u şişirmesin diye kırpılır (semantik eşleşme için yeterli)
+MAX_TEXT = 500
+
+# Düğümleri tarama alanlarına çeviren ortak fonksiyon (bu modülün ve element_cache'in script'lerine eklenir)
+DESCRIBE_JS = """
+function attrOf(el, name) { var v = el.getAttribute(name); return v === null ? '' : String(v); }
+function isVisible(el, rect) {
+    if (!el.isConnected || rect.width <= 0 || rect.height <= 0) return false;
+    for (var e = el; e && e.nodeType === 1; e = e.parentElement) {
+        var s = window.getComputedStyle(e);
+        if (s.display === 'none' || parseFloat(s.opacity) === 0) return false;
+        if (e === el && (s.visibility === 'hidden' || s.visibility === 'collapse')) return false;
+    }
+    return true;
+}
+function fieldValue(el, maxText) {
+    var value = (el.value !== undefined && el.value !== null) ? String(el.value) : attrOf(el, 'value');
+    return value.slice(0, maxText);
+}
+function describe(nodes, maxText) {
+    var sx = window.scrollX || window.pageXOffset || 0, sy = window.scrollY || window.pageYOffset || 0;
+    var out = [];
+    for (var j = 0; j < nodes.length; j++) {
+        var el = nodes[j];
+        if (!el || el.nodeType !== 1) continue;
+        try {
+            var rect = el.getBoundingClientRect();
+            var inner = (el.innerText || '');
+            out.push({
+                element: el,
+                tag: el.tagName.toLowerCase(),
+                role: attrOf(el, 'role'), type: attrOf(el, 'type'),
+                'class': attrOf(el, 'class'), id: attrOf(el, 'id'),
+                placeholder: attrOf(el, 'placeholder'), title: attrOf(el, 'title'),
+                aria_label: attrOf(el, 'aria-label'), value: fieldValue(el, maxText),
+                text: inner.trim().slice(0, maxText), inner_text: inner.slice(0, maxText),
+                x: rect.left + sx, y: rect.top + sy, width: rect.width, height: rect.height,
+                visible: isVisible(el, rect)
+            });
+        } catch (err) {}
+    }
+    return out;
+}
+function evaluate(xpath) {
+    var found = document.evaluate(xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    var nodes = [];
+    for (var i = 0; i < found.snapshotLength; i++) nodes.push(found.snapshotItem(i));
+    return nodes;
+}
+"""
+
+_SNAPSHOT_JS = DESCRIBE_JS + """
+var source = arguments[0];
+return describe(typeof source === 'string' ? evaluate(source) : (source || []), arguments[1]);
+"""
+
+# XPath'leri öncelik sırasıyla çalıştırır: ilk boş olmayanın düğümleri + her XPath'in isabet sayısı
+# (son XPath geniş fallback ise sadece dar scope'ların hepsi boşsa çalıştırılır)
+# 🧾 journal ({doc, gen, epoch}) verildiyse o checkpoint'ten sonra değişmemiş düğümler için sadece
+# {element, unchanged, x, y, width, height, visible, value} döner; okuma sonunda yeni checkpoint alınır.
+# visible (atanın class / style değişikliği) ve value (yazılan metin mutasyon üretmez) her taramada
+# yeniden hesaplanır
+_FIRST_MATCH_JS = DESCRIBE_JS + dom_observer.INSTALL_JS + """
+var xpaths = arguments[0], maxText = arguments[1], withNodes = arguments[2], lazyLast = arguments[3];
+var journal = arguments[4], o = journal ? installObserver() : null;
+if (o) o.flush();
+var since = (o && journal.doc === o.id) ? journal.gen : null;
+var counts = [], chosen = -1, matched = [];
+for (var i = 0; i < xpaths.length; i++) {
+    if (lazyLast && i === xpaths.length - 1 && chosen >= 0) { counts.push(null); continue; }
+    try {
+        var nodes = evaluate(xpaths[i]);
+        counts.push(nodes.length);
+        if (chosen < 0 && nodes.length) { chosen = i; matched = nodes; }
+    } catch (err) {
+        counts.push(-1);  // Geçersiz XPath
+    }
+}
+var nodes = [];
+if (withNodes && since === null) nodes = describe(matched, maxText);
+else if (withNodes) {
+    var sx = window.scrollX || window.pageXOffset || 0, sy = window.scrollY || window.pageYOffset || 0;
+    for (var k = 0; k < matched.length; k++) {
+        var el = matched[k];
+        if (!el || el.nodeType !== 1) continue;
+        if ((el.__smartGen || 0) >= since) { nodes.push.apply(nodes, describe([el], maxText)); continue; }
+        var rect = el.getBoundingClientRect();
+        nodes.push({element: el, unchanged: true, x: rect.left + sx, y: rect.top + sy, width: rect.width, height: rect.height,
+                    visible: isVisible(el, rect), value: fieldValue(el, maxText)});
+    }
+}
+var checkpoint = null;
+if (o) { o.gen++; checkpoint = {doc: o.id, gen: o.gen, epoch: o.epoch}; }
+return {chosen: chosen, counts: counts, nodes: nodes, journal: checkpoint};
+"""
+
+
+def snapshot(driver, source):
+    """
+    XPath'e uyan (veya verilen) elementlerin tarama alanlarını tek çağrıda okur.
+
+    Args:
+        driver: Selenium WebDriver
+        source: XPath string'i veya WebElement listesi
+
+    Returns:
+        list: Düğüm dict'leri (belge sırasında); hata olursa boş liste
+    """
+    try:
+        return driver.execute_script(_SNAPSHOT_JS, source, MAX_TEXT) or []
+    except Exception as e:
+        log.warning(f"DOM snapshot alınamadı: {e}")
+        return []
+
+
+def first_match(driver, xpaths, with_nodes=True, lazy_last=False, journal=None):
+    """
+    🆕 XPath'leri tek execute_script çağrısında öncelik sırasıyla çalıştırır.
+
+    Args:
+        xpaths: Öncelik sırasıyla XPath listesi
+        with_nodes: Kazanan XPath'in düğümleri snapshot olarak dönsün mü
+        lazy_last: Son XPath (geniş fallback) sadece öncekilerin hepsi boşsa çalıştırılsın
+        journal: 🧾 Önceki taramanın checkpoint'i ({doc, gen, epoch}); {} ilk tarama (sadece checkpoint alınır),
+                 None günlük kullanılmaz
+
+    Returns:
+        tuple: (düğümler, isabet sayıları (çalıştırılmadıysa None, geçersizse -1),
+                kazanan XPath indeksi veya -1, yeni checkpoint veya None)
+    """
+    try:
+        result = driver.execute_script(_FIRST_MATCH_JS, list(xpaths), MAX_TEXT, with_nodes, lazy_last, journal)
+        return result["nodes"] or [], result["counts"], result["chosen"], result.get("journal")
+    except Exception as e:
+        log.warning(f"XPath değerlendirmesi başarısız: {e}")
+        return [], [None] * len(xpaths), -1, None
+
+
+def attributes(node):
+    """Snapshot düğümünden get_element_attributes ile aynı formatta attrs dict'i."""
+    return {
+        "tag": node["tag"],
+        "role": node["role"],
+        "type": node["type"],
+        "class": node["class"],
+        "id": node["id"],
+        "text": node["text"][:30],
+        "placeholder": node["placeholder"],
+        "value": node["value"],
+        "title": node["title"],
+    }
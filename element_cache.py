@@ -0,0 +1,168 @@
+"""
+💾 BOUNDED ELEMENT CACHE
+Kazanan elementler LRU + TTL ile sınırlı bir hafızada tutulur; WebElement tutamacının
+yanında yeniden bulunabilir bir konum tanımı (locator) saklanır:
+
+- css: id'li en yakın ataya kadar tag:nth-of-type zinciri (id benzersizse sadece #id)
+- fingerprint: tag, id, ilk class'lar ve metnin başı (bulunan elementin doğrulanması için)
+- doc / epoch: dom_observer'ın belge kimliği ve epoch'u (düğüm silen mutasyonlarda artar)
+
+get() tek execute_script çağrısıdır: epoch değişmediyse tutamaç doğrudan kullanılır,
+değiştiyse tutamaç parmak iziyle doğrulanır, kopmuşsa (re-render) locator ile yeniden
+bulunur. Dönen düğüm dom_snapshot formatındadır (ek get_attribute çağrısı yok).
+"""
+
+import time
+from collections import OrderedDict
+
+import config
+import dom_observer
+import dom_snapshot
+from logger import get_bot_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_bot_logger()
+
+# Locator çıkarma / doğrulama / yeniden bulma (template_cache script'lerinde de kullanılır)
+LOCATOR_JS = """
+function locatorOf(el) {
+    function esc(v) { return window.CSS && CSS.escape ? CSS.escape(v) : v.replace(/[^a-zA-Z0-9_-]/g, '\\\\$&'); }
+    function uniqueId(e) { return e.id && document.querySelectorAll('#' + esc(e.id)).length === 1; }
+    var parts = [];
+    for (var e = el; e && e.nodeType === 1; e = e.parentElement) {
+        if (uniqueId(e)) { parts.unshift('#' + esc(e.id)); break; }
+        var tag = e.tagName.toLowerCase(), n = 1;
+        for (var s = e.previousElementSibling; s; s = s.previousElementSibling) if (s.tagName === e.tagName) n++;
+        parts.unshift(tag + ':nth-of-type(' + n + ')');
+        if (tag === 'html') break;
+    }
+    var classes = (el.getAttribute('class') || '').trim().split(/\\s+/).filter(Boolean).slice(0, 3);
+    return {
+        css: parts.join(' > '),
+        fingerprint: {tag: el.tagName.toLowerCase(), id: el.id || '', classes: classes,
+                      text: (el.innerText || '').trim().slice(0, 40)}
+    };
+}
+function matchesFingerprint(el, fp) {
+    if (!el || el.nodeType !== 1 || el.tagName.toLowerCase() !== fp.tag) return false;
+    if (fp.id && el.id !== fp.id) return false;
+    if (fp.text && (el.innerText || '').trim().slice(0, 40) !== fp.text) return false;
+    if (fp.classes.length && !fp.classes.some(function (c) { return el.classList.contains(c); })) return false;
+    return true;
+}
+function usable(el) {
+    if (!el || !el.isConnected || el.disabled) return false;
+    var r = el.getBoundingClientRect(), s = window.getComputedStyle(el);
+    return r.width > 0 && r.height > 0 && s.display !== 'none' && s.visibility !== 'hidden';
+}
+function findByLocator(loc) {
+    var found = null;
+    try { found = document.querySelector(loc.css); } catch (err) {}
+    if (matchesFingerprint(found, loc.fingerprint) && usable(found)) return found;
+    var same = document.getElementsByTagName(loc.fingerprint.tag);
+    for (var i = 0; i < same.length; i++) {
+        if (matchesFingerprint(same[i], loc.fingerprint) && usable(same[i])) return same[i];
+    }
+    return null;
+}
+"""
+
+_STORE_JS = dom_observer.INSTALL_JS + LOCATOR_JS + """
+var o = installObserver(), loc = locatorOf(arguments[0]);
+loc.doc = o.id; loc.epoch = o.epoch;
+return loc;
+"""
+
+# Tutamaç -> (epoch değiştiyse) parmak izi doğrulaması -> css yolu -> parmak izi taraması
+_LOOKUP_JS = dom_observer.INSTALL_JS + dom_snapshot.DESCRIBE_JS + LOCATOR_JS + """
+var handle = arguments[0], loc = arguments[1], maxText = arguments[2];
+var o = installObserver(), fresh = o.id === loc.doc && o.epoch === loc.epoch, how = null, el = null;
+if (handle && handle.isConnected && (fresh || matchesFingerprint(handle, loc.fingerprint)) && usable(handle)) {
+    el = handle; how = fresh ? 'handle' : 'verified';
+} else {
+    el = findByLocator(loc);
+    how = el ? 'locator' : null;
+}
+if (!el) return {node: null, how: null};
+var fp = locatorOf(el);
+loc.css = fp.css; loc.doc = o.id; loc.epoch = o.epoch;
+return {node: describe([el], maxText)[0] || null, how: how, locator: loc};
+"""
+
+
+class ElementCache:
+    """
+    {anahtar: giriş} LRU sözlüğü; giriş: element, score, url, timestamp, locator.
+    """
+
+    def __init__(self, max_entries=None, ttl=None):
+        self.max_entries = max_entries or config.ELEMENT_CACHE_SIZE
+        self.ttl = config.ELEMENT_CACHE_TTL if ttl is None else ttl
+        self.entries = OrderedDict()
+        self.stats = {"hits": 0, "rehydrated": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def clear(self):
+        self.entries.clear()
+
+    def put(self, driver, key, element, score, url):
+        """
+        Kazananı locator'ıyla kaydeder (tek execute_script); kapasite aşılırsa en eskiyi atar.
+
+        Returns:
+            dict: Locator (css, fingerprint, doc, epoch); çıkarılamadıysa None
+        """
+        try:
+            locator = driver.execute_script(_STORE_JS, element)
+        except Exception as e:
+            log.warning(f"Cache locator'ı çıkarılamadı: {e}")
+            return None
+        self.entries[key] = {
+            "element": element, "score": score, "url": url,
+            "timestamp": time.time(), "locator": locator,
+        }
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats["evicted"] += 1
+        return locator
+
+    def get(self, driver, key):
+        """
+        Girişi doğrular / yeniden bulur.
+
+        Returns:
+            tuple: (giriş, snapshot düğümü, "handle" | "verified" | "locator") veya None
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry["timestamp"] > self.ttl:
+            del self.entries[key]
+            self.stats["expired"] += 1
+            return None
+
+        result = None
+        for handle in (entry["element"], None):
+            try:
+                result = driver.execute_script(_LOOKUP_JS, handle, entry["locator"], dom_snapshot.MAX_TEXT)
+                break
+            except Exception:
+                continue  # Kopmuş tutamaç script argümanı olarak gönderilemez, locator ile dene
+        if not result or not result.get("node"):
+            del self.entries[key]
+            self.stats["misses"] += 1
+            return None
+
+        node = result["node"]
+        entry["element"] = node["element"]
+        entry["locator"] = result["locator"]
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        self.stats["rehydrated"] += int(result["how"] == "locator")
+        return entry, node, result["how"]
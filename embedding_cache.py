@@ -0,0 +1,218 @@
+"""
+🧊 TWO-TIER EMBEDDING CACHE
+Aynı header butonları, arama kutuları ve sepet ikonları her taramada
+yeniden encode edilmesin diye crop piksellerinin hash'i -> embedding saklanır.
+
+- 1. katman: süreç içi LRU (float32)
+- 2. katman: knowledge/ altında SQLite dosyası (float16, süreçler ve koşular arası)
+- Her iki katman da boyut sınırlıdır (en eski kullanılan silinir)
+- Kayıtlar (model versiyonu, piksel hash'i) ile anahtarlanır: farklı backbone'lu
+  VisualBrain'ler aynı önbelleği birbirinin kaydını silmeden paylaşır
+- Uzun süredir kullanılmayan versiyonlar süreç başında bir kez silinir
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+import config
+from logger import get_ai_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_ai_logger()
+
+# Disk sınırı aşılınca bir seferde silinecek oran (her insert'te DELETE yapmamak için)
+_EVICT_FRACTION = 0.1
+
+
+def pixel_key(arr):
+    """Decode edilmiş (H, W, 3) uint8 görselin içerik hash'i."""
+    arr = np.ascontiguousarray(arr, dtype=np.uint8)
+    h = hashlib.sha1(str(arr.shape).encode("ascii"))
+    h.update(arr.data)
+    return h.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    (model versiyonu, pixel hash) -> embedding önbelleği (bellek LRU + SQLite). Thread-safe.
+    """
+
+    def __init__(self, path=None, memory_items=None, disk_items=None):
+        """
+        Args:
+            path: SQLite dosyası (varsayılan: config.EMBEDDING_CACHE_PATH)
+            memory_items: Bellek katmanı kapasitesi (varsayılan: config.EMBEDDING_CACHE_MEMORY_ITEMS)
+            disk_items: Disk katmanı kapasitesi (varsayılan: config.EMBEDDING_CACHE_DISK_ITEMS)
+        """
+        self.path = path or config.EMBEDDING_CACHE_PATH
+        self.memory_items = memory_items or config.EMBEDDING_CACHE_MEMORY_ITEMS
+        self.disk_items = disk_items or config.EMBEDDING_CACHE_DISK_ITEMS
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+
+        self._memory = OrderedDict()  # (model_version, key) -> (D,) float32
+        self._lock = threading.Lock()
+        self._db = None
+        self._disk_count = 0
+
+    # --- DİSK ---
+
+    def _connect(self):
+        """SQLite bağlantısını (ilk kullanımda) açar. Açılamazsa sadece bellek katmanı çalışır."""
+        if self._db is not None:
+            return self._db
+        try:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")  # Birden fazla worker süreci okuyabilir
+            db.execute("PRAGMA synchronous=NORMAL")
+            # Eski şema (sadece key birincil anahtar) önbellek olduğu için silinip yeniden kurulur
+            primary = [row[1] for row in db.execute("PRAGMA table_info(embeddings)") if row[5]]
+            if primary and "model_version" not in primary:
+                db.execute("DROP TABLE embeddings")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " model_version TEXT NOT NULL, key TEXT NOT NULL,"
+                " vector BLOB NOT NULL, last_used REAL NOT NULL,"
+                " PRIMARY KEY (model_version, key))"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings(last_used)")
+            db.commit()
+            self._prune_versions(db)
+            self._count(db)
+            self._db = db
+        except sqlite3.Error as e:
+            log.warning(f"Embedding önbelleği açılamadı ({e}), sadece bellek kullanılacak.")
+            self._db = False
+        return self._db
+
+    def _count(self, db):
+        # Diğer süreçler de yazdığı için sayaç her zaman tablodan okunur
+        self._disk_count = db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def _prune_versions(self, db):
+        """
+        EMBEDDING_CACHE_VERSION_MAX_AGE gündür hiç kullanılmayan model versiyonlarının
+        kayıtlarını siler (süreç başına bir kez, bağlantı açılırken).
+        """
+        cutoff = time.time() - config.EMBEDDING_CACHE_VERSION_MAX_AGE * 86400
+        with db:
+            removed = db.execute(
+                "DELETE FROM embeddings WHERE model_version IN ("
+                " SELECT model_version FROM embeddings GROUP BY model_version"
+                " HAVING MAX(last_used) < ?)",
+                (cutoff,),
+            ).rowcount
+        if removed > 0:
+            log.info(f"Embedding önbelleği: kullanılmayan model versiyonlarının {removed} kaydı silindi.")
+
+    def _evict_disk(self, db):
+        """Disk sınırı aşıldıysa en eski kullanılan kayıtların bir kısmını siler."""
+        if self._disk_count <= self.disk_items:
+            return
+        excess = self._disk_count - self.disk_items + int(self.disk_items * _EVICT_FRACTION)
+        db.execute(
+            "DELETE FROM embeddings WHERE rowid IN "
+            "(SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        self._count(db)
+
+    # --- SORGU / KAYIT ---
+
+    def get_many(self, model_version, keys):
+        """
+        Args:
+            model_version: Embedding'i üreten modelin versiyonu (VisualBrain.model_version)
+            keys: pixel_key() listesi
+
+        Returns:
+            dict: key -> (D,) float32 (sadece bulunanlar)
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get((model_version, key))
+                if vector is not None:
+                    self._memory.move_to_end((model_version, key))
+                    found[key] = vector
+            self.stats["memory_hits"] += len(found)
+
+            missing = [key for key in dict.fromkeys(keys) if key not in found]
+            db = self._connect() if missing else None
+            if db:
+                try:
+                    placeholders = ",".join("?" * len(missing))
+                    rows = db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE model_version = ? AND key IN ({placeholders})",
+                        [model_version] + missing,
+                    ).fetchall()
+                    if rows:
+                        with db:
+                            db.executemany(
+                                "UPDATE embeddings SET last_used = ? WHERE model_version = ? AND key = ?",
+                                [(time.time(), model_version, key) for key, _ in rows],
+                            )
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float16).astype(np.float32)
+                        found[key] = vector
+                        self._remember((model_version, key), vector)
+                    self.stats["disk_hits"] += len(rows)
+                except sqlite3.Error as e:
+                    log.warning(f"Embedding önbelleği okunamadı: {e}")
+            self.stats["misses"] += len([key for key in missing if key not in found])
+        return found
+
+    def put_many(self, model_version, keys, vectors):
+        """Yeni encode edilen embedding'leri (model versiyonuyla) iki katmana da yazar."""
+        if not keys:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember((model_version, key), vector.copy())
+            db = self._connect()
+            if not db:
+                return
+            now = time.time()
+            try:
+                with db:
+                    db.executemany(
+                        "INSERT OR REPLACE INTO embeddings (key, model_version, vector, last_used) "
+                        "VALUES (?, ?, ?, ?)",
+                        [(key, model_version, vector.astype(np.float16).tobytes(), now)
+                         for key, vector in zip(keys, vectors)],
+                    )
+                    # INSERT OR REPLACE var olan satırları da sayar: sayaç tablodan okunur
+                    self._count(db)
+                    self._evict_disk(db)
+            except sqlite3.Error as e:
+                log.warning(f"Embedding önbelleğine yazılamadı: {e}")
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+
+# Süreç başına dosya yolu -> tek önbellek
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_cache(path=None):
+    """Süreç genelinde paylaşılan EmbeddingCache'i döner."""
+    key = os.path.abspath(path or config.EMBEDDING_CACHE_PATH)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(key)
+        if cache is None:
+            cache = _CACHES[key] = EmbeddingCache(path)
+        return cache
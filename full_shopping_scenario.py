@@ -80,7 +80,7 @@ def main():
             if "giris-yap" not in current_url:
                 print(f"   ✅ Giriş başarılı! Yönlendirilen sayfa: {current_url}")
                 # Cache temizle (yeni sayfa için)
-                bot.element_cache = {}
+                bot.element_cache.clear()
                 print("   🧹 Element cache temizlendi (yeni sayfa için)")
             else:
                 print("   ⚠️ Giriş yapılamadı, devam ediliyor...")
@@ -157,6 +157,7 @@ def main():
         if hasattr(bot, 'learning'):
             bot.learning.print_session_summary()
         
+        bot.close()
         driver.quit()
         print("\n✨ Test tamamlandı! Raporları inceleyebilirsin.")
 
@@ -5,6 +5,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from ai_model import VisualBrain
+import config
 from logger import get_healer_logger, PerformanceLogger  # 📝 LOGGING
 
 # Logger instance
@@ -13,7 +14,7 @@ log = get_healer_logger()
 class Healer:
     def __init__(self, driver):
         self.driver = driver
-        self.brain = VisualBrain() 
+        self.brain = VisualBrain(config.MODEL_PATH)  # 🆕 Kayıttan paylaşımlı model
         # Eşik değeri: Kendi eğittiğimiz model için biraz daha esnek olabilir (0.50 - 0.70 arası)
         self.threshold = 0.50 
         
@@ -128,21 +129,26 @@ class Healer:
         
         best_score = 0
         best_element = None
-        temp_path = "temp_candidate_snapshot.png"
 
+        # 🆕 Aday görüntüleri bellekte toplanır (geçici dosya yok), tek batch'te skorlanır
+        good_elements = []
+        crops = []
         for element in candidates:
             try:
                 if not self._is_good_element(element): continue
-                
-                element.screenshot(temp_path)
-                score = self.brain.compare_images(ref_path, temp_path)
-                
-                if score > best_score:
-                    best_score = score
-                    best_element = element
+                crops.append(element.screenshot_as_png)
+                good_elements.append(element)
             except: continue
 
-        if os.path.exists(temp_path): os.remove(temp_path)
+        if crops:
+            try:
+                scores = self.brain.compare_many(crops, [ref_path])[:, 0]
+                best_idx = int(scores.argmax())
+                if scores[best_idx] > best_score:
+                    best_score = float(scores[best_idx])
+                    best_element = good_elements[best_idx]
+            except Exception as e:
+                log.warning(f"Görsel karşılaştırma hatası: {e}")
 
         log.info(f"AI analiz bitti. En yüksek skor: {best_score:.4f}")
         
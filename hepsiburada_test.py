@@ -117,6 +117,7 @@ def main():
     
     finally:
         print("\n🛑 Test bitti.")
+        bot.close()
         driver.quit()
         
         # Rapor
@@ -1,6 +1,8 @@
 # heuristics_engine.py
 import unicodedata
+import numpy as np
 import config
+import dom_snapshot  # 📸 TEK ÇAĞRIDA XPATH DEĞERLENDİRME
 from similarity_utils import (
     levenshtein_similarity, 
     jaccard_similarity, 
@@ -80,6 +82,73 @@ class Heuristics:
         text = text.replace("İ", "i").replace("I", "ı").replace("Ş", "ş").replace("Ğ", "ğ").replace("Ü", "ü").replace("Ö", "ö").replace("Ç", "ç")
         return " ".join(text.split()).lower()
 
+    # Dar scope XPath'ler - Daha spesifik, daha az element döner (öncelik sırasıyla)
+    NARROW_XPATHS = {
+        "email": [
+            "//input[@type='email']",
+            "//input[contains(@name, 'mail') or contains(@id, 'mail')]",
+            "//input[contains(@placeholder, 'mail') or contains(@placeholder, 'posta')]",
+            "//input[contains(@autocomplete, 'email')]",
+        ],
+        "password": [
+            "//input[@type='password']",
+            "//input[contains(@name, 'pass') or contains(@id, 'pass')]",
+            "//input[contains(@name, 'sifre') or contains(@id, 'sifre')]",
+        ],
+        "search": [
+            "//input[@type='search']",
+            "//input[contains(@name, 'search') or contains(@id, 'search')]",
+            "//input[contains(@name, 'q') or contains(@id, 'q')]",
+            "//input[contains(@placeholder, 'ara') or contains(@placeholder, 'search')]",
+            "//input[contains(@class, 'search')]",
+        ],
+        "add_to_cart": [
+            # Türkçe butonlar
+            "//button[contains(translate(., 'SEPETEKLİ', 'sepetekli'), 'sepete ekle')]",
+            "//button[contains(., 'Sepete Ekle')]",
+            "//a[contains(., 'Sepete Ekle')]",
+            "//button[contains(., 'Hemen Al')]",
+            "//button[contains(., 'Satın Al')]",
+            # İngilizce butonlar
+            "//button[contains(., 'Add to Cart')]",
+            "//button[contains(., 'Buy Now')]",
+            # Class bazlı
+            "//button[contains(@class, 'add-to-cart') or contains(@class, 'addToCart')]",
+            "//button[contains(@class, 'add-basket') or contains(@class, 'addBasket')]",
+            "//button[contains(@class, 'buy-now') or contains(@class, 'buyNow')]",
+            "//button[@data-testid='add-to-cart']",
+            "//*[contains(@class, 'add') and contains(@class, 'cart')]//button",
+            # Genel buton
+            "//button[contains(@class, 'btn') and contains(@class, 'cart')]",
+        ],
+        "cart": [
+            "//a[contains(@href, 'sepet') or contains(@href, 'cart') or contains(@href, 'basket')]",
+            "//*[contains(@class, 'cart') or contains(@class, 'basket') or contains(@class, 'sepet')]//a",
+            "//*[@id='cart' or @id='basket' or @id='sepet']//a",
+            "//a[contains(@class, 'cart')]",
+        ],
+        "login_btn": [
+            "//a[contains(@href, 'login') or contains(@href, 'giris')]",
+            "//*[contains(@class, 'login') or contains(@class, 'signin')]//a",
+            "//a[contains(., 'Giriş') or contains(., 'Login')]",
+        ],
+        "checkout": [
+            # Türkçe butonlar
+            "//button[contains(., 'Tamamla') or contains(., 'Onayla')]",
+            "//button[contains(., 'Ödeme')]",
+            "//a[contains(., 'Satın Al') or contains(., 'Ödeme')]",
+            "//button[contains(., 'Siparişi Tamamla')]",
+            "//button[contains(., 'Alışverişi Tamamla')]",
+            # İngilizce butonlar
+            "//button[contains(., 'Checkout')]",
+            "//button[contains(., 'Complete')]",
+            "//button[contains(., 'Proceed')]",
+            # Class bazlı
+            "//button[contains(@class, 'checkout') or contains(@class, 'confirm')]",
+            "//button[contains(@class, 'complete') or contains(@class, 'proceed')]",
+        ],
+    }
+
     def get_xpath(self, category):
         """Legacy XPath metodu - geriye uyumluluk için korundu."""
         return self._get_fallback_xpath(category)
@@ -98,83 +167,14 @@ class Heuristics:
         Returns:
             tuple: (xpath_string, scope_type)
         """
-        # Dar scope XPath'ler - Daha spesifik, daha az element döner
-        narrow_xpaths = {
-            "email": [
-                "//input[@type='email']",
-                "//input[contains(@name, 'mail') or contains(@id, 'mail')]",
-                "//input[contains(@placeholder, 'mail') or contains(@placeholder, 'posta')]",
-                "//input[contains(@autocomplete, 'email')]",
-            ],
-            "password": [
-                "//input[@type='password']",
-                "//input[contains(@name, 'pass') or contains(@id, 'pass')]",
-                "//input[contains(@name, 'sifre') or contains(@id, 'sifre')]",
-            ],
-            "search": [
-                "//input[@type='search']",
-                "//input[contains(@name, 'search') or contains(@id, 'search')]",
-                "//input[contains(@name, 'q') or contains(@id, 'q')]",
-                "//input[contains(@placeholder, 'ara') or contains(@placeholder, 'search')]",
-                "//input[contains(@class, 'search')]",
-            ],
-            "add_to_cart": [
-                # Türkçe butonlar
-                "//button[contains(translate(., 'SEPETEKLİ', 'sepetekli'), 'sepete ekle')]",
-                "//button[contains(., 'Sepete Ekle')]",
-                "//a[contains(., 'Sepete Ekle')]",
-                "//button[contains(., 'Hemen Al')]",
-                "//button[contains(., 'Satın Al')]",
-                # İngilizce butonlar
-                "//button[contains(., 'Add to Cart')]",
-                "//button[contains(., 'Buy Now')]",
-                # Class bazlı
-                "//button[contains(@class, 'add-to-cart') or contains(@class, 'addToCart')]",
-                "//button[contains(@class, 'add-basket') or contains(@class, 'addBasket')]",
-                "//button[contains(@class, 'buy-now') or contains(@class, 'buyNow')]",
-                "//button[@data-testid='add-to-cart']",
-                "//*[contains(@class, 'add') and contains(@class, 'cart')]//button",
-                # Genel buton
-                "//button[contains(@class, 'btn') and contains(@class, 'cart')]",
-            ],
-            "cart": [
-                "//a[contains(@href, 'sepet') or contains(@href, 'cart') or contains(@href, 'basket')]",
-                "//*[contains(@class, 'cart') or contains(@class, 'basket') or contains(@class, 'sepet')]//a",
-                "//*[@id='cart' or @id='basket' or @id='sepet']//a",
-                "//a[contains(@class, 'cart')]",
-            ],
-            "login_btn": [
-                "//a[contains(@href, 'login') or contains(@href, 'giris')]",
-                "//*[contains(@class, 'login') or contains(@class, 'signin')]//a",
-                "//a[contains(., 'Giriş') or contains(., 'Login')]",
-            ],
-            "checkout": [
-                # Türkçe butonlar
-                "//button[contains(., 'Tamamla') or contains(., 'Onayla')]",
-                "//button[contains(., 'Ödeme')]",
-                "//a[contains(., 'Satın Al') or contains(., 'Ödeme')]",
-                "//button[contains(., 'Siparişi Tamamla')]",
-                "//button[contains(., 'Alışverişi Tamamla')]",
-                # İngilizce butonlar
-                "//button[contains(., 'Checkout')]",
-                "//button[contains(., 'Complete')]",
-                "//button[contains(., 'Proceed')]",
-                # Class bazlı
-                "//button[contains(@class, 'checkout') or contains(@class, 'confirm')]",
-                "//button[contains(@class, 'complete') or contains(@class, 'proceed')]",
-            ],
-        }
+        narrow_xpaths = self.NARROW_XPATHS
         
         # Driver varsa ve dar scope test edilecekse
+        # 🆕 Tüm dar scope XPath'ler tek execute_script çağrısında (document.evaluate) denenir
         if driver and category in narrow_xpaths:
-            for xpath in narrow_xpaths[category]:
-                try:
-                    from selenium.webdriver.common.by import By
-                    elements = driver.find_elements(By.XPATH, xpath)
-                    if elements:
-                        return xpath, "NARROW"
-                except:
-                    continue
+            _, _, chosen, _ = dom_snapshot.first_match(driver, narrow_xpaths[category], with_nodes=False)
+            if chosen >= 0:
+                return narrow_xpaths[category][chosen], "NARROW"
         
         # Dar scope XPath string'i döndür (driver yoksa)
         if category in narrow_xpaths:
@@ -185,6 +185,17 @@ class Heuristics:
         # Fallback - Geniş scope
         return self._get_fallback_xpath(category), "FALLBACK"
     
+    def get_xpath_plan(self, category):
+        """
+        🆕 Tek çağrıda denenecek XPath'ler: dar scope'lar öncelik sırasıyla, en sonda geniş fallback.
+
+        Returns:
+            list: [(xpath, scope_type)] ("NARROW" veya "FALLBACK")
+        """
+        plan = [(xpath, "NARROW") for xpath in self.NARROW_XPATHS.get(category, [])]
+        plan.append((self._get_fallback_xpath(category), "FALLBACK"))
+        return plan
+
     def _get_fallback_xpath(self, category):
         """Geniş scope fallback XPath'ler."""
         if category in ["email", "password", "text_input", "search", "firstName", "lastName", "phone"]:
@@ -252,6 +263,29 @@ class Heuristics:
         if 0.2 <= relative_y <= 0.6: return 1.0 
         return 0.7
 
+    def score_locations(self, element_ys, screen_height, category):
+        """
+        🆕 score_location'ın vektörel hali: tüm adayların konum skoru tek seferde.
+
+        Args:
+            element_ys: Adayların y koordinatları (dizi)
+        """
+        y = np.asarray(element_ys, dtype=np.float64)
+        relative_y = y / screen_height
+        default = np.where((relative_y >= 0.2) & (relative_y <= 0.6), 1.0, 0.7)
+
+        if category == "login_btn":
+            scores = np.select([y < 120, y < 200], [1.0, 0.5], 0.0)
+        elif category == "search":
+            scores = np.where(y < 200, 1.0, 0.5)
+        elif category in ["email", "password", "text_input", "firstName", "lastName", "phone"]:
+            scores = np.where(y < 150, 0.1, default)  # Header'da olmamalı
+        elif category == "cart":
+            scores = np.where(y < 150, 1.0, 0.5)
+        else:
+            scores = default
+        return np.where(y > screen_height * 0.95, 0.1, scores)
+
     def score_semantic(self, element_text, target_keywords_key="login"):
         """
         🆕 GELİŞTİRİLMİŞ SEMANTİK PUANLAMA (EVRENSEL UYUMLULUK)
@@ -324,6 +358,14 @@ class Heuristics:
             return 0.05 
         return 0.0 
 
+    def score_proximities(self, element_ys, reference_y):
+        """🆕 score_proximity'nin vektörel hali."""
+        y = np.asarray(element_ys, dtype=np.float64)
+        if reference_y is None:
+            return np.zeros_like(y)
+        distance = y - reference_y
+        return np.select([(distance > 0) & (distance < 250), distance > 250], [0.3, 0.05], 0.0)
+
     def calculate_final_score(self, visual_score, semantic_score, location_score, tag_score, category="button"):
         """
         🆕 KATEGORİ BAZLI DİNAMİK PUANLAMA
@@ -341,20 +383,34 @@ class Heuristics:
         Returns:
             tuple: (final_score, confidence_level)
         """
+        scores, levels = self.calculate_final_scores(
+            [visual_score], [semantic_score], [location_score], [tag_score], category=category
+        )
+        return float(scores[0]), str(levels[0])
+
+    def calculate_final_scores(self, visual_scores, semantic_scores, location_scores, tag_scores, category="button"):
+        """
+        🆕 calculate_final_score'un vektörel hali: tüm adaylar dizi işlemleriyle tek seferde.
+
+        Returns:
+            tuple: (final_scores (N,) float64, confidence_levels (N,) str)
+        """
         # Kategori için ağırlıkları al
         weights = config.get_weights_for_category(category)
+        visual = np.asarray(visual_scores, dtype=np.float64)
+        semantic = np.asarray(semantic_scores, dtype=np.float64)
         
         # Semantik skor bazen 1'den büyük olabilir (güçlü eşleşme bonusu)
         # Bunu normalize edelim ama bonusu koruyalım
-        semantic_normalized = min(semantic_score, 1.0)
-        semantic_bonus = max(0, semantic_score - 1.0) * 0.15  # Bonus'un %15'ini ekle
+        semantic_normalized = np.minimum(semantic, 1.0)
+        semantic_bonus = np.maximum(0, semantic - 1.0) * 0.15  # Bonus'un %15'ini ekle
         
         # Ağırlıklı toplam hesapla
         weighted_sum = (
-            visual_score * weights["visual"] +
+            visual * weights["visual"] +
             semantic_normalized * weights["semantic"] +
-            location_score * weights["location"] +
-            tag_score * weights["tag"]
+            np.asarray(location_scores, dtype=np.float64) * weights["location"] +
+            np.asarray(tag_scores, dtype=np.float64) * weights["tag"]
         )
         
         # Semantic bonus ekle
@@ -362,21 +418,15 @@ class Heuristics:
         
         # 🆕 EVRENSEL: Tag skoru cezası kaldırıldı
         # Farklı sitelerde farklı tag yapıları olabilir
-        # if tag_score < 0.2:
-        #     weighted_sum *= 0.5
         
         # 🆕 EVRENSEL: Negatif semantik skor cezası hafifletildi
         # Bazı siteler farklı kelimeler kullanabilir
-        if semantic_score < 0:
-            weighted_sum *= 0.5  # 0.3'ten 0.5'e yükseltildi (daha toleranslı)
+        weighted_sum = np.where(semantic < 0, weighted_sum * 0.5, weighted_sum)  # 0.3'ten 0.5'e yükseltildi
         
         # Final skoru 0-1 arasında tut
-        final_score = max(0.0, min(weighted_sum, 1.0))
+        final_scores = np.clip(weighted_sum, 0.0, 1.0)
         
-        # Confidence level belirle
-        confidence_level = self._get_confidence_level(final_score)
-        
-        return final_score, confidence_level
+        return final_scores, self.get_confidence_levels(final_scores)
     
     def _get_confidence_level(self, score):
         """Skor bazlı güven seviyesi döner."""
@@ -390,6 +440,16 @@ class Heuristics:
             return "LOW"
         else:
             return "REJECT"
+
+    def get_confidence_levels(self, scores):
+        """🆕 _get_confidence_level'ın vektörel hali."""
+        thresholds = config.CONFIDENCE_THRESHOLDS
+        scores = np.asarray(scores)
+        return np.select(
+            [scores >= thresholds["high"], scores >= thresholds["medium"], scores >= thresholds["low"]],
+            ["HIGH", "MEDIUM", "LOW"],
+            "REJECT",
+        )
     
     # Geriye uyumluluk için eski metod imzası
     def calculate_final_score_legacy(self, visual_score, semantic_score, location_score, tag_score):
@@ -0,0 +1,380 @@
+"""
+🛰️ LOCAL INFERENCE SERVER
+Encoder'ı bir kez yükleyip aynı makinedeki tüm SmartBot süreçlerine
+Unix socket üzerinden hizmet verir (mega_site_test gibi çok worker'lı koşular için).
+
+- Eşzamanlı istekler gecikme sınırı (deadline) içinde mikro-batch'lere birleştirilir
+- İstemci görselleri model boyutunda RGB uint8 olarak gönderir, embedding veya skor alır
+- VisualBrain sunucu çalışıyorsa otomatik olarak uzak backend'e geçer
+
+Kullanım:
+    python inference_server.py
+    USE_INFERENCE_SERVER=1 python mega_site_test.py   # bot'lar sunucuya bağlanır
+
+Protokol (her mesaj): 4 byte uzunluk (big-endian) + JSON başlık + ham payload.
+Başlıktaki "payload" alanı payload'ın byte sayısıdır.
+"""
+
+import json
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+
+import numpy as np
+
+import config
+from logger import get_ai_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_ai_logger()
+
+_HEADER = struct.Struct(">I")
+
+# Batch istatistiği log aralığı
+_STATS_EVERY = 100
+
+
+def is_supported():
+    """Platform Unix socket destekliyor mu?"""
+    return hasattr(socket, "AF_UNIX")
+
+
+def _socket_alive(socket_path):
+    """Socket dosyasını dinleyen canlı bir süreç var mı? (bağlanmayı dener)"""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    probe.settimeout(1.0)
+    try:
+        probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+# --- MESAJ ÇERÇEVELEME ---
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    read = 0
+    while read < n:
+        got = sock.recv_into(view[read:], n - read)
+        if got == 0:
+            raise ConnectionError("Bağlantı kapandı")
+        read += got
+    return buf
+
+
+def _send(sock, header, payload=b""):
+    header = dict(header, payload=len(payload))
+    raw = json.dumps(header).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(raw)) + raw)
+    if payload:
+        sock.sendall(payload)
+
+
+def _recv(sock):
+    (length,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    header = json.loads(bytes(_recv_exact(sock, length)).decode("utf-8"))
+    size = header.get("payload", 0)
+    payload = _recv_exact(sock, size) if size else bytearray()
+    return header, payload
+
+
+# --- SUNUCU ---
+
+class _Job:
+    """Kuyrukta bekleyen tek bir istemci isteği."""
+
+    def __init__(self, images):
+        self.images = images
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class InferenceServer:
+    """
+    Encoder'ı yükleyip istekleri mikro-batch'ler halinde çalıştıran daemon.
+    Her bağlantı kendi thread'inde okunur; tek bir batch thread'i modeli kullanır.
+    """
+
+    def __init__(self, model_path=None, socket_path=None, max_batch=None, deadline_ms=None):
+        """
+        Args:
+            model_path: Model dosyası (varsayılan: config.MODEL_PATH)
+            socket_path: Unix socket yolu (varsayılan: config.INFERENCE_SOCKET)
+            max_batch: Bir batch'teki maksimum görsel (varsayılan: config.INFERENCE_MAX_BATCH)
+            deadline_ms: İlk istekten sonra batch'in bekleyebileceği süre
+                         (varsayılan: config.INFERENCE_BATCH_DEADLINE_MS)
+        """
+        from ai_model import VisualBrain
+
+        self.socket_path = socket_path or config.INFERENCE_SOCKET
+        self.max_batch = max_batch or config.INFERENCE_MAX_BATCH
+        self.deadline = (deadline_ms if deadline_ms is not None else config.INFERENCE_BATCH_DEADLINE_MS) / 1000.0
+        self.brain = VisualBrain(model_path or config.MODEL_PATH, use_server=False)
+
+        self._queue = queue.Queue()
+        self._running = False
+        self._sock = None
+        self.stats = {"requests": 0, "images": 0, "batches": 0}
+
+    def serve_forever(self):
+        """Modeli yükler, socket'i açar ve bağlantıları kabul eder."""
+        if not is_supported():
+            print("❌ Bu platform Unix socket desteklemiyor.")
+            return
+        self.brain.warmup()
+        if self.brain.encoder is None:
+            print("❌ Encoder hazır değil, sunucu başlatılamadı.")
+            return
+
+        if os.path.exists(self.socket_path):
+            if _socket_alive(self.socket_path):
+                print(f"❌ {self.socket_path} üzerinde çalışan bir sunucu var, yenisi başlatılmadı.")
+                return
+            os.remove(self.socket_path)  # Önceki koşudan kalan (sahipsiz) socket
+        socket_dir = os.path.dirname(self.socket_path)
+        if socket_dir:
+            os.makedirs(socket_dir, exist_ok=True)
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.socket_path)
+        self._sock.listen()
+        self._running = True
+        threading.Thread(target=self._batch_loop, name="inference-batcher", daemon=True).start()
+
+        print(f"🛰️ Inference sunucusu hazır: {self.socket_path} "
+              f"(batch<={self.max_batch}, deadline={self.deadline * 1000:.0f}ms)")
+        try:
+            while self._running:
+                try:
+                    conn, _ = self._sock.accept()
+                except OSError:
+                    break
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+        finally:
+            self.close()
+
+    def close(self):
+        self._running = False
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+            try:
+                os.remove(self.socket_path)
+            except OSError:
+                pass
+
+    def _handle(self, conn):
+        """Tek bir istemci bağlantısı (kalıcı, ardışık istekler)."""
+        with conn:
+            while self._running:
+                try:
+                    header, payload = _recv(conn)
+                except (ConnectionError, OSError, ValueError):
+                    return
+                try:
+                    reply, data = self._dispatch(header, payload)
+                except Exception as e:
+                    reply, data = {"ok": False, "error": str(e)}, b""
+                try:
+                    _send(conn, reply, data)
+                except OSError:
+                    return
+
+    def _dispatch(self, header, payload):
+        op = header.get("op")
+        if op == "info":
+            weights = np.asarray(self.brain.head_weights, dtype=np.float32)
+            return {
+                "ok": True,
+                "model_version": self.brain.model_version,
+                "meta": self.brain.meta,
+                "dim": int(weights.shape[0]),
+                "head_bias": self.brain.head_bias,
+            }, weights.tobytes()
+
+        # Görseller modelin giriş boyutunda gelmeli (istemci info'daki meta'yı kullanır)
+        count = int(header.get("count", 0))
+        shape = self.brain.image_size[::-1] + (3,)
+        image_bytes = count * int(np.prod(shape))
+        images = np.frombuffer(payload, dtype=np.uint8, count=image_bytes).reshape((count,) + shape)
+        embeddings = self._submit(images)
+
+        if op == "embed":
+            return {"ok": True, "shape": list(embeddings.shape)}, embeddings.tobytes()
+        if op == "compare":
+            refs = np.frombuffer(payload, dtype=np.float32, offset=image_bytes)
+            refs = refs.reshape(-1, embeddings.shape[1])
+            scores = np.asarray(self.brain.score(embeddings, refs), dtype=np.float32)
+            return {"ok": True, "shape": list(scores.shape)}, scores.tobytes()
+        raise ValueError(f"Bilinmeyen işlem: {op}")
+
+    def _submit(self, images):
+        """İsteği batch kuyruğuna koyar ve sonucu bekler."""
+        job = _Job(images)
+        self._queue.put(job)
+        job.done.wait()
+        if job.error is not None:
+            raise job.error
+        return job.result
+
+    def _batch_loop(self):
+        """
+        Kuyruktaki ilk isteği alır, deadline dolana veya max_batch'e ulaşana
+        kadar gelen diğer istekleri ekler, hepsini tek encoder çağrısında çalıştırır.
+        """
+        while self._running:
+            job = self._queue.get()
+            jobs = [job]
+            total = len(job.images)
+            deadline = time.monotonic() + self.deadline
+            while total < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                jobs.append(job)
+                total += len(job.images)
+
+            try:
+                images = np.concatenate([j.images for j in jobs]) if len(jobs) > 1 else jobs[0].images
+                embeddings = self.brain.embed(list(images))
+                start = 0
+                for j in jobs:
+                    j.result = embeddings[start:start + len(j.images)]
+                    start += len(j.images)
+            except Exception as e:
+                for j in jobs:
+                    j.error = e
+            for j in jobs:
+                j.done.set()
+
+            self.stats["requests"] += len(jobs)
+            self.stats["images"] += total
+            self.stats["batches"] += 1
+            if self.stats["batches"] % _STATS_EVERY == 0:
+                log.info(f"Inference sunucusu: {self.stats['batches']} batch, "
+                         f"ort. {self.stats['images'] / self.stats['batches']:.1f} görsel/batch, "
+                         f"ort. {self.stats['requests'] / self.stats['batches']:.1f} istek/batch")
+
+
+# --- İSTEMCİ ---
+
+class InferenceClient:
+    """
+    Inference sunucusuna kalıcı bağlantı. VisualBrain tarafından uzak
+    encoder olarak kullanılır; model_version ve karar katmanı ağırlıkları
+    bağlanırken sunucudan alınır. Thread-safe.
+    """
+
+    def __init__(self, socket_path=None, timeout=None):
+        self.socket_path = socket_path or config.INFERENCE_SOCKET
+        self.timeout = timeout or config.INFERENCE_TIMEOUT
+        self.model_version = None
+        self.meta = None
+        self.head_weights = None
+        self.head_bias = 0.0
+        self._sock = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def connect(cls, socket_path=None, timeout=None):
+        """
+        Sunucuya bağlanır. Sunucu çalışmıyorsa None döner.
+
+        Returns:
+            InferenceClient veya None
+        """
+        client = cls(socket_path, timeout)
+        if not is_supported() or not os.path.exists(client.socket_path):
+            return None
+        try:
+            header, payload = client._request({"op": "info"})
+            client.model_version = header["model_version"]
+            client.meta = header["meta"]
+            client.head_weights = np.frombuffer(payload, dtype=np.float32).copy()
+            client.head_bias = float(header["head_bias"])
+        except (OSError, ValueError, KeyError, RuntimeError):
+            # Eski/uyumsuz sunucu (bozuk başlık veya "error" cevabı): yerel modele dönülür
+            client.close()
+            return None
+        return client
+
+    def _open(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        self._sock = sock
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _request(self, header, payload=b""):
+        """İstek gönderir; bağlantı kopmuşsa bir kez yeniden bağlanır."""
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._open()
+                    _send(self._sock, header, payload)
+                    reply, data = _recv(self._sock)
+                    break
+                except OSError:
+                    self.close()
+                    if attempt:
+                        raise
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "Inference sunucusu hatası"))
+        return reply, data
+
+    def _pack(self, images):
+        size = self.meta["input_size"]
+        images = np.ascontiguousarray(images, dtype=np.uint8)
+        return images.reshape((-1, size, size, 3))
+
+    def embed(self, images):
+        """
+        Args:
+            images: (N, H, W, 3) uint8 RGB dizi (sunucu modelinin giriş boyutunda)
+
+        Returns:
+            np.ndarray: (N, D) float32 embedding
+        """
+        images = self._pack(images)
+        header, data = self._request({"op": "embed", "count": len(images)}, images.tobytes())
+        return np.frombuffer(data, dtype=np.float32).reshape(header["shape"])
+
+    def compare(self, images, ref_embeddings):
+        """
+        Görselleri sunucuda encode edip hazır referans embedding'leriyle skorlar.
+
+        Returns:
+            np.ndarray: (N, M) benzerlik matrisi
+        """
+        images = self._pack(images)
+        refs = np.ascontiguousarray(ref_embeddings, dtype=np.float32)
+        header, data = self._request(
+            {"op": "compare", "count": len(images)}, images.tobytes() + refs.tobytes()
+        )
+        return np.frombuffer(data, dtype=np.float32).reshape(header["shape"])
+
+
+if __name__ == "__main__":
+    server = InferenceServer()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Inference sunucusu kapatılıyor.")
+        server.close()
@@ -0,0 +1,107 @@
+"""
+💾 DEBOUNCED JSON STORE
+knowledge/ altındaki küçük istatistik dosyaları (reference_stats, xpath_telemetry,
+template_cache) her kayıtta baştan yazılmaz.
+
+- changed(): değişikliği işaretler; son yazmadan KNOWLEDGE_FLUSH_INTERVAL geçtiyse yazar
+- flush(): bekleyen değişikliği hemen yazar (SmartBot.close() ve süreç çıkışında)
+- Yazma benzersiz geçici dosya + os.replace ile atomiktir; yan yana çalışan bot'lar
+  birbirinin geçici dosyasını ezmez
+
+⚠️ TEK SÜREÇ: Dosya sadece açılışta okunur, flush() sahip sınıfın bellekteki verisini
+yazar (birleştirme yok, son yazan kazanır). Aynı knowledge/ klasörünü kullanan iki
+süreç (ör. aynı anda çalışan senaryo script'leri) birbirinin kayıtlarını ezer.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import time
+import weakref
+from pathlib import Path
+
+import config
+from logger import get_learning_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_learning_logger()
+
+# Süreç çıkışında yazılacak store'lar (zayıf referans: kapatılan bot'un store'u tutulmaz)
+_STORES = weakref.WeakSet()
+
+
+def _flush_all():
+    for store in list(_STORES):
+        store.flush()
+
+
+atexit.register(_flush_all)
+
+
+class JsonStore:
+    """
+    Bir JSON dosyasının debounce'lu, atomik kaydı. Veri sahibi sınıfta kalır.
+    """
+
+    def __init__(self, path, label, lock):
+        """
+        Args:
+            path: JSON dosyası
+            label: Log mesajlarındaki ad ("Referans istatistikleri" ...)
+            lock: Sahip sınıfın verisini koruyan kilit (flush() yazarken alır)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(exist_ok=True)
+        self.label = label
+        self._lock = lock
+        self._data = None
+        self._dirty = False
+        self._last_write = time.monotonic()
+        _STORES.add(self)
+
+    def load(self):
+        """Dosyadaki veri; yoksa veya okunamazsa boş dict."""
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                log.warning(f"{self.label} okunamadı, yeniden başlatılıyor...")
+        return {}
+
+    def changed(self, data):
+        """Verinin değiştiğini bildirir (sahip sınıfın kilidi alınmışken çağrılır)."""
+        self._data = data
+        self._dirty = True
+        if time.monotonic() - self._last_write >= config.KNOWLEDGE_FLUSH_INTERVAL:
+            self._write()
+
+    def flush(self):
+        """Bekleyen değişikliği hemen yazar."""
+        with self._lock:
+            if self._dirty:
+                self._write()
+
+    def _write(self):
+        tmp = None
+        try:
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self.path.parent, prefix=self.path.name + ".",
+                suffix=".tmp", delete=False
+            ) as f:
+                tmp = f.name
+                json.dump(self._data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            tmp = None
+            self._dirty = False
+        except OSError as e:
+            log.warning(f"{self.label} kaydedilemedi: {e}")
+        finally:
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+            # Başarısız yazma da süreyi başlatır: hata veren diske her kayıtta tekrar denenmez
+            self._last_write = time.monotonic()
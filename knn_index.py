@@ -0,0 +1,181 @@
+"""
+🧭 NEAREST-PROTOTYPE (kNN) INDEX
+Crop embedding'lerinin en benzer prototiplerini tek vektörel sorguda bulur.
+
+Aranan satır sayısı KNN_COMPRESS_THRESHOLD'u geçmedikçe arama kaba kuvvettir
+(kesin): tüm satırlar gerçek karar katmanı sigmoid(|a - b| · w + bias) ile skorlanır.
+
+Daha büyük kütüphanelerde arama iki aşamalıdır (yaklaşık):
+1. Kısa liste: ağırlıklı L2 vekili ||√|w|·(a - b)||², PCA ile sıkıştırılmış kodlar
+   + IVF kümeleri üzerinde. Ağırlıkların işareti karışık olduğu için vekil gerçek
+   skor sırasını korumaz; kısa liste bu yüzden kütüphaneyle büyür (KNN_SHORTLIST_RATIO)
+2. Kesin skor: kısa listedeki satırlar gerçek karar katmanıyla yeniden skorlanır
+"""
+
+import numpy as np
+
+import config
+
+# PCA kovaryansı ve k-means için kullanılacak maksimum örnek
+_FIT_SAMPLE = 4096
+_KMEANS_ITERATIONS = 8
+
+# Kesin skorda |a - b| ara tensörünün (M, R, blok) en fazla eleman sayısı
+_BLOCK_ELEMENTS = 1 << 22
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _sq_distances(queries, codes, code_norms):
+    """(M, P) x (R, P) -> (M, R) kare L2 uzaklık (||q||² sabit olduğu için atlanır)."""
+    return code_norms[None, :] - 2.0 * (queries @ codes.T)
+
+
+class KNNIndex:
+    """
+    Prototip embedding'leri üzerinde kesin (küçük kütüphane) veya kısa liste +
+    kesin skor (PCA/IVF) araması.
+    """
+
+    def __init__(self, embeddings, head_weights, head_bias):
+        """
+        Args:
+            embeddings: (N, D) prototip embedding'leri (memmap olabilir; kesin skor için okunur)
+            head_weights: (D,) karar katmanı ağırlıkları
+            head_bias: Karar katmanı bias'ı
+        """
+        self.embeddings = embeddings
+        self.head_weights = np.asarray(head_weights, dtype=np.float32)
+        self.head_bias = float(head_bias)
+        self.scale = np.sqrt(np.abs(self.head_weights))
+
+        # Vekil kodlar sadece sıkıştırılmış (PCA/IVF) aramada kullanılır
+        self.compressed = len(embeddings) > config.KNN_COMPRESS_THRESHOLD
+        self.mean = None
+        self.components = None
+        self.centroids = None
+        self.lists = None
+        self.codes = None
+        self.code_norms = None
+        if self.compressed:
+            scaled = np.asarray(embeddings, dtype=np.float32) * self.scale
+            self._fit_pca(scaled)
+            self.codes = self._encode(scaled)
+            self._fit_ivf()
+            self.code_norms = np.einsum("ij,ij->i", self.codes, self.codes)
+
+    # --- SIKIŞTIRMA ---
+
+    def _sample(self, n):
+        rng = np.random.default_rng(0)
+        return rng.choice(n, size=min(n, _FIT_SAMPLE), replace=False)
+
+    def _fit_pca(self, scaled):
+        sample = scaled[self._sample(len(scaled))]
+        self.mean = sample.mean(axis=0)
+        centered = sample - self.mean
+        _, eigvecs = np.linalg.eigh(centered.T @ centered)
+        dims = min(config.KNN_PCA_DIMS, scaled.shape[1])
+        self.components = np.ascontiguousarray(eigvecs[:, ::-1][:, :dims], dtype=np.float32)
+
+    def _encode(self, scaled):
+        if self.components is None:
+            return scaled
+        return (scaled - self.mean) @ self.components
+
+    def _fit_ivf(self):
+        """PCA kodlarını √N kümeye ayırır (sorgu sadece en yakın kümelere bakar)."""
+        n_lists = max(1, int(np.sqrt(len(self.codes))))
+        centroids = self.codes[self._sample(len(self.codes))[:n_lists]].copy()
+        for _ in range(_KMEANS_ITERATIONS):
+            assign = _sq_distances(self.codes, centroids, np.einsum("ij,ij->i", centroids, centroids)).argmin(axis=1)
+            for c in range(len(centroids)):
+                members = self.codes[assign == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+        self.centroids = centroids
+        self.centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+        self.lists = [np.flatnonzero(assign == c) for c in range(len(centroids))]
+
+    # --- SORGU ---
+
+    def _candidates(self, query_code, rows, mask, needed):
+        """Büyük aday kümelerinde sadece en yakın KNN_NPROBE kümenin satırları."""
+        if self.centroids is None or len(rows) <= config.KNN_COMPRESS_THRESHOLD:
+            return rows
+        nearest = np.argsort(_sq_distances(query_code[None, :], self.centroids, self.centroid_norms)[0])
+        probed = np.concatenate([self.lists[c] for c in nearest[:config.KNN_NPROBE]])
+        probed = probed[mask[probed]]
+        return probed if len(probed) >= needed else rows
+
+    def exact_scores(self, queries, rows):
+        """
+        Gerçek karar katmanı skoru.
+
+        Args:
+            queries: (M, D) sorgular
+            rows: (R,) tüm sorgular için ortak satırlar veya (M, S) sorgu başına satırlar
+
+        Returns:
+            np.ndarray: (M, R) veya (M, S)
+        """
+        if rows.ndim == 1:
+            candidates = np.asarray(self.embeddings[rows], dtype=np.float32)
+            # (M, R, D) fark tensörü yerine boyut blokları halinde toplanır
+            dims = candidates.shape[1]
+            block = max(1, min(dims, _BLOCK_ELEMENTS // max(1, len(queries) * len(rows))))
+            logits = np.full((len(queries), len(rows)), self.head_bias, dtype=np.float32)
+            for start in range(0, dims, block):
+                end = start + block
+                logits += np.abs(queries[:, None, start:end] - candidates[None, :, start:end]) @ self.head_weights[start:end]
+        else:
+            candidates = np.asarray(self.embeddings[rows.ravel()], dtype=np.float32).reshape(rows.shape + (-1,))
+            logits = np.abs(queries[:, None, :] - candidates) @ self.head_weights + self.head_bias
+        return np.nan_to_num(_sigmoid(logits), nan=0.0)
+
+    def query(self, queries, rows=None, k=None):
+        """
+        Args:
+            queries: (M, D) crop embedding'leri (NaN satırlar 0 skor alır)
+            rows: Aranacak prototip satırları (None: hepsi)
+            k: Döndürülecek komşu sayısı (varsayılan: config.KNN_TOP_K)
+
+        Returns:
+            tuple: (scores (M, k'), rows (M, k')) skorlar azalan sırada, k' = min(k, len(rows))
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        rows = np.arange(len(self.embeddings)) if rows is None else np.asarray(rows, dtype=np.intp)
+        k = min(k or config.KNN_TOP_K, len(rows))
+        m = len(queries)
+        if k == 0 or m == 0:
+            return np.zeros((m, k), dtype=np.float32), np.zeros((m, k), dtype=np.intp)
+
+        invalid = np.isnan(queries).any(axis=1)
+
+        if not self.compressed or len(rows) <= config.KNN_COMPRESS_THRESHOLD:
+            # Kaba kuvvet (kesin): tüm satırlar gerçek karar katmanıyla
+            scores = self.exact_scores(queries, rows)
+            candidates = np.broadcast_to(rows, scores.shape)
+        else:
+            # Vekil kısa liste kütüphaneyle büyür (vekil sırası gerçek skor sırası değildir)
+            safe = np.where(invalid[:, None], 0.0, queries)
+            query_codes = self._encode(safe * self.scale)
+            shortlist_size = max(config.KNN_SHORTLIST, k, int(len(rows) * config.KNN_SHORTLIST_RATIO))
+            shortlist_size = min(shortlist_size, len(rows))
+            mask = np.zeros(len(self.codes), dtype=bool)
+            mask[rows] = True
+            candidates = np.empty((m, shortlist_size), dtype=np.intp)
+            for i, code in enumerate(query_codes):
+                cand = self._candidates(code, rows, mask, shortlist_size)
+                proxy = _sq_distances(code[None, :], self.codes[cand], self.code_norms[cand])[0]
+                candidates[i] = cand[np.argpartition(proxy, shortlist_size - 1)[:shortlist_size]]
+            scores = self.exact_scores(queries, candidates)
+
+        scores[invalid] = 0.0
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        return np.take_along_axis(top_scores, order, axis=1), np.take_along_axis(candidates, top, axis=1)
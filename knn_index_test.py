@@ -0,0 +1,103 @@
+# knn_index_test.py
+"""
+🧭 kNN INDEX TESTİ
+KNNIndex.query sonuçlarını VisualBrain.score kaba kuvvet sıralamasıyla karşılaştırır
+(model gerekmez; rastgele embedding'ler + karışık işaretli karar katmanı):
+
+- KNN_COMPRESS_THRESHOLD altında sonuç kesin olmalı (aynı satırlar, aynı skorlar)
+- Kategori alt kümesi (rows) ve NaN sorgu satırı
+- Sıkıştırılmış (PCA/IVF) aramada dönen skorlar gerçek karar katmanı skoru olmalı
+"""
+
+import sys
+
+import numpy as np
+
+import config
+from ai_model import VisualBrain
+from knn_index import KNNIndex
+
+DIMS = 64
+
+
+class HeadOnlyBrain(VisualBrain):
+    """Modelsiz VisualBrain: sadece NumPy karar katmanı (score) kullanılır."""
+
+    head_weights = None
+    head_bias = 0.0
+
+    def __init__(self, head_weights, head_bias):
+        self.head_weights = head_weights
+        self.head_bias = head_bias
+
+
+def make_library(rng, n):
+    """ReLU + global pooling çıktısı gibi negatif olmayan embedding'ler."""
+    return np.maximum(rng.normal(size=(n, DIMS)), 0.0).astype(np.float32)
+
+
+def brute_force(brain, queries, library, rows, k):
+    scores = brain.score(queries, library[rows])
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(scores, order, axis=1), rows[order]
+
+
+def check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def main():
+    print("\n" + "="*70)
+    print("🧭 kNN INDEX TEST")
+    print("="*70)
+
+    rng = np.random.default_rng(7)
+    # Karışık işaretli ağırlıklar: ağırlıklı L2 vekili gerçek skor sırasını korumaz
+    brain = HeadOnlyBrain(rng.normal(scale=0.3, size=DIMS).astype(np.float32), 0.5)
+    results = []
+
+    library = make_library(rng, 400)
+    queries = make_library(rng, 25)
+    knn = KNNIndex(library.astype(np.float16), brain.head_weights, brain.head_bias)
+    library = library.astype(np.float16).astype(np.float32)  # İndeks float16 saklar
+    k = config.KNN_TOP_K
+
+    # 1. Tüm kütüphane: kaba kuvvetle aynı
+    scores, rows = knn.query(queries, k=k)
+    expected_scores, expected_rows = brute_force(brain, queries, library, np.arange(len(library)), k)
+    results.append(check("Tüm kütüphane: en yakın satırlar aynı", np.array_equal(rows, expected_rows)))
+    results.append(check("Tüm kütüphane: skorlar aynı", np.allclose(scores, expected_scores, atol=1e-5)))
+
+    # 2. Kategori alt kümesi
+    subset = np.sort(rng.choice(len(library), size=60, replace=False))
+    scores, rows = knn.query(queries, subset, k=k)
+    expected_scores, expected_rows = brute_force(brain, queries, library, subset, k)
+    results.append(check("Alt küme: en yakın satırlar aynı", np.array_equal(rows, expected_rows)))
+    results.append(check("Alt küme: skorlar aynı", np.allclose(scores, expected_scores, atol=1e-5)))
+
+    # 3. NaN sorgu (okunamayan crop) 0 skor alır, diğerleri etkilenmez
+    broken = queries.copy()
+    broken[3] = np.nan
+    scores, rows = knn.query(broken, k=k)
+    expected_scores, expected_rows = brute_force(brain, queries, library, np.arange(len(library)), k)
+    others = np.arange(len(queries)) != 3
+    results.append(check("NaN sorgu: 0 skor", not scores[3].any()))
+    results.append(check("NaN sorgu: diğer sorgular aynı", np.array_equal(rows[others], expected_rows[others])))
+
+    # 4. Sıkıştırılmış arama (yaklaşık): skorlar gerçek skor ve azalan sırada
+    big = make_library(rng, config.KNN_COMPRESS_THRESHOLD + 500)
+    knn = KNNIndex(big, brain.head_weights, brain.head_bias)
+    scores, rows = knn.query(queries, k=k)
+    exact = np.take_along_axis(brain.score(queries, big), rows, axis=1)
+    results.append(check("PCA/IVF: indeks sıkıştırıldı", knn.compressed))
+    results.append(check("PCA/IVF: skorlar gerçek karar katmanı skoru", np.allclose(scores, exact, atol=1e-5)))
+    results.append(check("PCA/IVF: skorlar azalan sırada", bool((np.diff(scores, axis=1) <= 0).all())))
+
+    passed = all(results)
+    print(f"\n{'✅ TÜM KONTROLLER GEÇTİ' if passed else '❌ BAŞARISIZ KONTROL VAR'} ({sum(results)}/{len(results)})")
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
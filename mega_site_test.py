@@ -146,6 +146,7 @@ def test_site(site_config, site_index, total_sites):
     options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
     
     driver = None
+    bot = None
     results = {
         "site": name,
         "url": url,
@@ -259,6 +260,8 @@ def test_site(site_config, site_index, total_sites):
         results["duration"] = round(time.time() - start_time, 2)
         
         # Driver kapat
+        if bot:
+            bot.close()
         if driver:
             try:
                 driver.quit()
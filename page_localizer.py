@@ -0,0 +1,193 @@
+"""
+🔥 PAGE LOCALIZER (FEATURE-MAP CORRELATION)
+DOM adaylarını tek tek kırpmak yerine görünür sayfanın TEK ekran görüntüsünü
+encoder'dan geçirir ve prototip embedding'lerini evrişim haritası üzerinde
+aday kutularıyla karşılaştırarak kategori ısı haritası çıkarır.
+
+- Ekran görüntüsü model giriş boyutunda karolara bölünür, karolar tek batch'te encode edilir
+- Görünür tıklanabilir elementlerin kutuları tek execute_script ile okunur
+- Harita, integral görüntü ile her kutunun KENDİ alanı üzerinde ortalanır: prototip
+  (element giriş boyutuna ölçeklenip tüm haritası ortalanarak) ile aynı kapsam
+- Her kutu Siyam karar katmanıyla prototiplere karşı skorlanır (vektörel)
+
+DOM boyutundan bağımsız olarak sayfa başına bir CNN geçişi yapılır; class isimleri
+karıştırılmış sayfalarda XPath adayları işe yaramadığında kullanılır.
+"""
+
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+import config
+from logger import get_bot_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_bot_logger()
+
+# Görünür, üstte kalan tıklanabilir elementlerin kutuları (CSS pikseli) + devicePixelRatio
+_BOXES_JS = """
+var sel = 'a, button, input, select, textarea, [role="button"], [onclick]';
+var w = window.innerWidth, h = window.innerHeight, boxes = [];
+var nodes = document.querySelectorAll(sel);
+for (var i = 0; i < nodes.length && boxes.length < arguments[0]; i++) {
+    var r = nodes[i].getBoundingClientRect();
+    if (r.width < 1 || r.height < 1 || r.right <= 0 || r.bottom <= 0 || r.left >= w || r.top >= h) continue;
+    var cx = Math.min(Math.max((r.left + r.right) / 2, 0), w - 1);
+    var cy = Math.min(Math.max((r.top + r.bottom) / 2, 0), h - 1);
+    var top = document.elementFromPoint(cx, cy);
+    if (!top || !(top === nodes[i] || nodes[i].contains(top))) continue;
+    boxes.push([nodes[i], r.left, r.top, r.width, r.height]);
+}
+return {dpr: window.devicePixelRatio || 1, boxes: boxes};
+"""
+
+
+def _box_means(fmap, boxes):
+    """
+    (H, W, D) haritanın verilen hücre kutuları üzerindeki ortalaması, integral görüntü ile.
+
+    Args:
+        boxes: (N, 4) int [y0, x0, y1, x1) hücre koordinatları (boş olmayan)
+
+    Returns:
+        (N, D)
+    """
+    integral = np.zeros((fmap.shape[0] + 1, fmap.shape[1] + 1, fmap.shape[2]), dtype=np.float64)
+    integral[1:, 1:] = fmap.cumsum(axis=0).cumsum(axis=1)
+    y0, x0, y1, x1 = boxes.T
+    total = integral[y1, x1] - integral[y0, x1] - integral[y1, x0] + integral[y0, x0]
+    area = ((y1 - y0) * (x1 - x0))[:, None]
+    return (total / area).astype(np.float32)
+
+
+class PageLocalizer:
+    """
+    Tek geçişte sayfa evrişim haritası + tıklanabilir kutuların skorlanması.
+    """
+
+    def __init__(self, brain, prototype_index):
+        """
+        Args:
+            brain: VisualBrain (feature_maps ve karar katmanı için)
+            prototype_index: PrototypeIndex (kategori prototip embedding'leri)
+        """
+        self.brain = brain
+        self.prototype_index = prototype_index
+
+    def should_run(self, elements):
+        """config.VISUAL_LOCALIZATION moduna göre bu tarama için çalışmalı mı?"""
+        mode = config.VISUAL_LOCALIZATION
+        if mode == "always":
+            return True
+        if mode == "auto":
+            return not elements or len(elements) > config.LOCALIZE_ELEMENT_LIMIT
+        return False
+
+    # --- HARİTA ---
+
+    def _tile(self, image):
+        """
+        (H, W, 3) görüntüyü giriş boyutunda karolara böler (kenarlar tekrar ile doldurulur).
+
+        Returns:
+            tuple: (karolar (N, S, S, 3), karo satır sayısı, karo sütun sayısı)
+        """
+        size = self.brain.image_size[0]
+        rows = -(-image.shape[0] // size)
+        cols = -(-image.shape[1] // size)
+        padded = np.pad(
+            image,
+            ((0, rows * size - image.shape[0]), (0, cols * size - image.shape[1]), (0, 0)),
+            mode="edge",
+        )
+        tiles = padded.reshape(rows, size, cols, size, 3).swapaxes(1, 2).reshape(-1, size, size, 3)
+        return tiles, rows, cols
+
+    def feature_map(self, image):
+        """
+        Görüntünün birleşik evrişim haritası.
+
+        Returns:
+            tuple: ((Gh, Gw, D) harita, hücre başına piksel) veya desteklenmiyorsa (None, None)
+        """
+        tiles, rows, cols = self._tile(image)
+        maps = self.brain.feature_maps(tiles)
+        if maps is None:
+            return None, None
+        h, w, d = maps.shape[1:]
+        fmap = maps.reshape(rows, cols, h, w, d).swapaxes(1, 2).reshape(rows * h, cols * w, d)
+        return fmap, self.brain.image_size[0] / h
+
+    def to_cells(self, boxes, cell_px, shape):
+        """
+        Piksel kutularını (x, y, w, h) haritanın hücre kutularına çevirir; her kutu en az
+        bir hücre kaplar ve haritanın içine kırpılır.
+
+        Returns:
+            (N, 4) int [y0, x0, y1, x1)
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        x0 = np.clip(np.floor(boxes[:, 0] / cell_px), 0, shape[1] - 1)
+        y0 = np.clip(np.floor(boxes[:, 1] / cell_px), 0, shape[0] - 1)
+        x1 = np.clip(np.ceil((boxes[:, 0] + boxes[:, 2]) / cell_px), x0 + 1, shape[1])
+        y1 = np.clip(np.ceil((boxes[:, 1] + boxes[:, 3]) / cell_px), y0 + 1, shape[0])
+        return np.stack([y0, x0, y1, x1], axis=1).astype(np.intp)
+
+    def heatmap(self, fmap, cell_px, boxes, references):
+        """
+        Aday kutusu başına skor: kutunun ortalama özelliği ile en benzer prototip
+        arasındaki Siyam skoru.
+
+        Args:
+            fmap: (Gh, Gw, D) evrişim haritası
+            cell_px: Hücre başına ekran görüntüsü pikseli
+            boxes: (N, 4) ekran görüntüsü pikseli (x, y, w, h)
+            references: (K, D) prototip embedding'leri
+
+        Returns:
+            np.ndarray: (N,) skor
+        """
+        if not len(boxes):
+            return np.zeros(0, dtype=np.float32)
+        pooled = _box_means(fmap, self.to_cells(boxes, cell_px, fmap.shape))
+        return self.brain.score(pooled, references).max(axis=1)
+
+    # --- SAYFA ---
+
+    def locate(self, driver, category):
+        """
+        Görünür sayfada kategoriye en çok benzeyen elementleri bulur.
+
+        Returns:
+            dict: {WebElement: görsel skor} (en yüksek skorlu LOCALIZE_TOP_K kutu); desteklenmiyorsa boş
+        """
+        _, references = self.prototype_index.lookup(category)
+        if references is None or not len(references) or not self.brain.available:
+            return {}
+        try:
+            png = driver.get_screenshot_as_png()
+            page = driver.execute_script(_BOXES_JS, config.LOCALIZE_MAX_BOXES)
+            image = np.asarray(Image.open(BytesIO(png)).convert("RGB"))
+        except Exception as e:
+            log.warning(f"Sayfa ekran görüntüsü alınamadı: {e}")
+            return {}
+        if not page or not page["boxes"]:
+            return {}
+
+        fmap, cell_px = self.feature_map(image)
+        if fmap is None:
+            return {}
+
+        # Kutular CSS pikseli, ekran görüntüsü cihaz pikseli
+        dpr = float(page["dpr"] or 1)
+        elements = [box[0] for box in page["boxes"]]
+        boxes = np.asarray([box[1:] for box in page["boxes"]], dtype=np.float64) * dpr
+        scores = self.heatmap(fmap, cell_px, boxes, references)
+
+        located = {}
+        for i in np.argsort(-scores, kind="stable")[:config.LOCALIZE_TOP_K]:
+            if scores[i] < config.LOCALIZE_MIN_SCORE:
+                break
+            located[elements[i]] = float(scores[i])
+        return located
@@ -0,0 +1,141 @@
+# page_localizer_test.py
+"""
+🔥 PAGE LOCALIZER TESTİ
+Sentetik bir sayfa ekran görüntüsünde ısı haritasının en yüksek skorunun bilinen
+elemente düştüğünü kontrol eder (model ve tarayıcı gerekmez):
+
+- Encoder yerine hücre başına renk + gradyan özelliği veren NumPy "evrişim haritası"
+- Prototip, referans element crop'u giriş boyutuna ölçeklenip haritası ortalanarak
+  (VisualBrain.embed ile aynı kapsam) elde edilir
+- Sayfada aynı boyutta benzer renkli / benzer desenli tuzak elementler vardır
+- devicePixelRatio 2 olan ekran görüntüsünde de aynı element bulunmalı
+"""
+
+import sys
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+import config
+from ai_model import VisualBrain
+from page_localizer import PageLocalizer
+
+SIZE = 64       # Sahte encoder giriş boyutu
+CELL = 8        # Hücre başına piksel (harita SIZE / CELL kare)
+BLUE = (30, 80, 200)
+RED = (200, 40, 40)
+GRAY = (150, 150, 150)
+
+# Sayfa elementleri: ad -> (renk, çubuklu mu, x, y, genişlik, yükseklik) CSS pikseli
+ELEMENTS = {
+    "target": (BLUE, True, 200, 160, 96, 32),
+    "solid_blue": (BLUE, False, 40, 40, 96, 32),
+    "red_button": (RED, True, 40, 240, 96, 32),
+    "gray_input": (GRAY, False, 240, 40, 200, 32),
+}
+
+
+class TextureBrain(VisualBrain):
+    """Modelsiz VisualBrain: hücre başına ortalama renk ve yatay/dikey gradyan."""
+
+    image_size = (SIZE, SIZE)
+    available = True
+    head_weights = None
+    head_bias = 0.0
+
+    def __init__(self):
+        self.head_weights = np.full(5, -20.0, dtype=np.float32)
+        self.head_bias = 3.0
+
+    def feature_maps(self, tiles):
+        t = np.asarray(tiles, dtype=np.float32) / 255.0
+        gray = t.mean(axis=3)
+        dx = np.zeros_like(gray)
+        dy = np.zeros_like(gray)
+        dx[:, :, 1:] = np.abs(np.diff(gray, axis=2))
+        dy[:, 1:, :] = np.abs(np.diff(gray, axis=1))
+        feats = np.concatenate([t, dx[..., None], dy[..., None]], axis=3)
+        grid = SIZE // CELL
+        return feats.reshape(len(t), grid, CELL, grid, CELL, 5).mean(axis=(2, 4))
+
+    def embed_crop(self, crop):
+        """VisualBrain.embed karşılığı: giriş boyutuna ölçekle, haritayı ortala."""
+        tile = np.asarray(Image.fromarray(crop).resize((SIZE, SIZE), Image.Resampling.NEAREST))
+        return self.feature_maps(tile[None])[0].mean(axis=(0, 1))
+
+
+class StaticIndex:
+    def __init__(self, references):
+        self.references = references
+
+    def lookup(self, category, source=None):
+        return ["reference.png"], self.references
+
+
+class PageDriver:
+    """Ekran görüntüsü ve _BOXES_JS cevabı veren sahte driver."""
+
+    def __init__(self, image, dpr):
+        self.image = image
+        self.dpr = dpr
+
+    def get_screenshot_as_png(self):
+        buffer = BytesIO()
+        Image.fromarray(self.image).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def execute_script(self, script, *args):
+        boxes = [[name, x, y, w, h] for name, (_, _, x, y, w, h) in ELEMENTS.items()]
+        return {"dpr": self.dpr, "boxes": boxes}
+
+
+def draw_button(width, height, color, bar):
+    """Düz renkli kutu; bar ise ortasında beyaz "yazı" çubuğu."""
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:] = color
+    if bar:
+        image[int(height * 0.4):int(height * 0.6), int(width * 0.2):int(width * 0.8)] = 255
+    return image
+
+
+def render_page(dpr):
+    page = np.full((320 * dpr, 480 * dpr, 3), 255, dtype=np.uint8)
+    for color, bar, x, y, w, h in ELEMENTS.values():
+        page[y * dpr:(y + h) * dpr, x * dpr:(x + w) * dpr] = draw_button(w * dpr, h * dpr, color, bar)
+    return page
+
+
+def check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def main():
+    print("\n" + "="*70)
+    print("🔥 PAGE LOCALIZER TEST")
+    print("="*70)
+
+    brain = TextureBrain()
+    # Referans farklı boyutta kaydedilmiş aynı buton (prototipler giriş boyutuna ölçeklenir)
+    reference = brain.embed_crop(draw_button(120, 40, BLUE, True))
+    localizer = PageLocalizer(brain, StaticIndex(reference[None]))
+    results = []
+
+    for dpr in (1, 2):
+        located = localizer.locate(PageDriver(render_page(dpr), dpr), "button")
+        ranked = sorted(located, key=located.get, reverse=True)
+        print(f"   dpr={dpr}: " + ", ".join(f"{name}={located[name]:.2f}" for name in ranked))
+        results.append(check(f"dpr={dpr}: en yüksek skor hedef butonda", bool(ranked) and ranked[0] == "target"))
+        results.append(check(
+            f"dpr={dpr}: hedef LOCALIZE_MIN_SCORE üstünde",
+            located.get("target", 0.0) >= config.LOCALIZE_MIN_SCORE,
+        ))
+
+    passed = all(results)
+    print(f"\n{'✅ TÜM KONTROLLER GEÇTİ' if passed else '❌ BAŞARISIZ KONTROL VAR'} ({sum(results)}/{len(results)})")
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,222 @@
+"""
+🪜 PERCEPTUAL SCORING CASCADE
+CNN'den önce ucuz görsel özelliklerle (NumPy, vektörel) ilk eleme:
+
+- Perceptual hash (32x32 gri -> DCT -> 8x8 düşük frekans, 63 bit)
+- Renk histogramı (RGB, kanal başına 4 bin -> 64 bin)
+- Kenar yönelim histogramı (gradyan büyüklüğüyle ağırlıklı, 8 bin)
+
+Referanslara çok benzeyen (kabul) veya hiç benzemeyen (ret) adaylar burada
+çözülür; sadece arada kalanlar Siyam CNN'e gider.
+
+Ucuz benzerlik CNN olasılığıyla aynı ölçekte değildir; kararlar CNN ölçeğine çevrilir
+ve iki karar da kalibrasyonla açılır (yeterli örnek toplanana kadar bant CNN'e gider):
+- ret -> 0.0. Ret bandındaki son PERCEPTUAL_CALIBRATION_MIN+ CNN skorunun hepsi
+  PERCEPTUAL_REJECT_CNN_MAX altında kalmalı (yeniden renklendirilmiş doğru element
+  ucuz katmanda sessizce elenmez)
+- kabul -> kabul bandındaki crop'ların CNN skorlarının medyanı
+"""
+
+import os
+import threading
+from collections import deque
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+import config
+
+# Özellik çıkarımı için küçük görsel boyutu
+_SIZE = 32
+_HASH_SIZE = 8
+_COLOR_LEVELS = 4
+_EDGE_BINS = 8
+_GRAY = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m.astype(np.float32)
+
+
+_DCT = _dct_matrix(_SIZE)
+
+
+def _load_small(img):
+    """Görseli 32x32 RGB uint8'e indirir (BOX: alan ortalaması). Okunamazsa None."""
+    try:
+        if isinstance(img, np.ndarray):
+            pil = Image.fromarray(np.ascontiguousarray(img[..., :3], dtype=np.uint8))
+        elif isinstance(img, (bytes, bytearray, memoryview)):
+            pil = Image.open(BytesIO(img))
+        elif isinstance(img, Image.Image):
+            pil = img
+        else:
+            pil = Image.open(img)
+        return np.asarray(pil.convert("RGB").resize((_SIZE, _SIZE), Image.Resampling.BOX))
+    except Exception:
+        return None
+
+
+def _flat_bins(values, bins):
+    """(N, P) bin indekslerini satır başına kaydırır: tek np.bincount ile (N, bins) histogram."""
+    n = values.shape[0]
+    offsets = (np.arange(n) * bins)[:, None]
+    return (values + offsets).ravel(), n * bins
+
+
+def extract_features(images):
+    """
+    Görsel listesinin ucuz özelliklerini tek seferde hesaplar.
+
+    Returns:
+        dict: "hash" (N, 63) ±1, "color" (N, 64), "edges" (N, 8), "valid" (N,) bool
+    """
+    n = len(images)
+    pixels = np.zeros((n, _SIZE, _SIZE, 3), dtype=np.float32)
+    valid = np.zeros(n, dtype=bool)
+    for i, img in enumerate(images):
+        arr = _load_small(img)
+        if arr is not None:
+            pixels[i] = arr
+            valid[i] = True
+
+    gray = pixels @ _GRAY  # (N, 32, 32)
+
+    # Perceptual hash: düşük frekans DCT katsayıları medyandan büyük mü
+    dct = np.einsum("ij,njk,lk->nil", _DCT, gray, _DCT)
+    low = dct[:, :_HASH_SIZE, :_HASH_SIZE].reshape(n, -1)[:, 1:]  # DC hariç
+    bits = np.where(low > np.median(low, axis=1, keepdims=True), 1.0, -1.0).astype(np.float32)
+
+    # Renk histogramı
+    levels = np.minimum(pixels.astype(np.int32) * _COLOR_LEVELS // 256, _COLOR_LEVELS - 1)
+    color_idx = (levels[..., 0] * _COLOR_LEVELS + levels[..., 1]) * _COLOR_LEVELS + levels[..., 2]
+    n_colors = _COLOR_LEVELS ** 3
+    flat, length = _flat_bins(color_idx.reshape(n, -1), n_colors)
+    color = np.bincount(flat, minlength=length).reshape(n, n_colors).astype(np.float32)
+    color /= float(_SIZE * _SIZE)
+
+    # Kenar yönelim histogramı (merkezi fark gradyanı)
+    gx = gray[:, 1:-1, 2:] - gray[:, 1:-1, :-2]
+    gy = gray[:, 2:, 1:-1] - gray[:, :-2, 1:-1]
+    magnitude = np.hypot(gx, gy).reshape(n, -1)
+    angle = np.mod(np.arctan2(gy, gx), np.pi).reshape(n, -1)
+    edge_idx = np.minimum((angle / np.pi * _EDGE_BINS).astype(np.int32), _EDGE_BINS - 1)
+    flat, length = _flat_bins(edge_idx, _EDGE_BINS)
+    edges = np.bincount(flat, weights=magnitude.ravel(), minlength=length).reshape(n, _EDGE_BINS)
+    edges = (edges / (edges.sum(axis=1, keepdims=True) + 1e-6)).astype(np.float32)
+
+    return {"hash": bits, "color": color, "edges": edges, "valid": valid}
+
+
+def similarity(feats_a, feats_b):
+    """
+    (N, M) birleşik ucuz benzerlik (0-1): hash Hamming benzerliği,
+    renk ve kenar histogramı kesişimi; ağırlıklar config.PERCEPTUAL_WEIGHTS.
+    """
+    bits = feats_a["hash"].shape[1]
+    hash_sim = (feats_a["hash"] @ feats_b["hash"].T + bits) / (2.0 * bits)
+    color_sim = np.minimum(feats_a["color"][:, None, :], feats_b["color"][None, :, :]).sum(axis=2)
+    edge_sim = np.minimum(feats_a["edges"][:, None, :], feats_b["edges"][None, :, :]).sum(axis=2)
+
+    w = config.PERCEPTUAL_WEIGHTS
+    total = w["hash"] + w["color"] + w["edges"]
+    scores = (w["hash"] * hash_sim + w["color"] * color_sim + w["edges"] * edge_sim) / total
+    scores[~feats_a["valid"]] = 0.0
+    scores[:, ~feats_b["valid"]] = 0.0
+    return scores.astype(np.float32)
+
+
+class PerceptualCascade:
+    """
+    Ucuz katman: referans özellikleri dosya başına bir kez hesaplanıp saklanır.
+    """
+
+    def __init__(self):
+        self._bank = {}  # path -> (mtime_ns, özellik satırı)
+        self._accept_cnn = deque(maxlen=config.PERCEPTUAL_CALIBRATION_WINDOW)  # Kabul bandının CNN skorları
+        self._reject_cnn = deque(maxlen=config.PERCEPTUAL_CALIBRATION_WINDOW)  # Ret bandının CNN skorları
+        self._lock = threading.Lock()
+
+    @property
+    def accept_score(self):
+        """Kabul kararının CNN ölçeğindeki karşılığı (kalibrasyon hazır değilse None)."""
+        with self._lock:
+            if len(self._accept_cnn) < config.PERCEPTUAL_CALIBRATION_MIN:
+                return None
+            return float(np.median(self._accept_cnn))
+
+    @property
+    def reject_ready(self):
+        """Ret kararı açık mı: ret bandındaki son CNN skorlarının hepsi görsel eşiğin altında."""
+        with self._lock:
+            return (len(self._reject_cnn) >= config.PERCEPTUAL_CALIBRATION_MIN
+                    and max(self._reject_cnn) < config.PERCEPTUAL_REJECT_CNN_MAX)
+
+    def calibrate(self, perceptual, cnn, best=None):
+        """
+        CNN'e giden crop'lardan ucuz skoru kabul veya ret bandında olanların CNN skorlarını toplar.
+
+        Args:
+            perceptual: (K,) crop başına en iyi ucuz skor (ana referanslar) - kabul bandı
+            cnn: (K,) aynı crop'ların CNN skorları
+            best: (K,) tüm referanslar arasında en iyi ucuz skor - ret bandı (None: perceptual)
+        """
+        cnn = np.asarray(cnn, dtype=np.float32)
+        valid = np.isfinite(cnn)
+        best = perceptual if best is None else best
+        accept = (np.asarray(perceptual) >= config.PERCEPTUAL_ACCEPT) & valid
+        reject = (np.asarray(best) <= config.PERCEPTUAL_REJECT) & valid
+        if accept.any() or reject.any():
+            with self._lock:
+                self._accept_cnn.extend(cnn[accept].tolist())
+                self._reject_cnn.extend(cnn[reject].tolist())
+
+    def reference_features(self, paths):
+        """Referans dosyalarının özellikleri (değişmeyenler önbellekten)."""
+        with self._lock:
+            stamps = []
+            for path in paths:
+                try:
+                    stamps.append(os.stat(path).st_mtime_ns)
+                except OSError:
+                    stamps.append(None)
+            todo = [i for i, (p, st) in enumerate(zip(paths, stamps))
+                    if p not in self._bank or self._bank[p][0] != st]
+            if todo:
+                fresh = extract_features([paths[i] for i in todo])
+                for row, i in enumerate(todo):
+                    self._bank[paths[i]] = (stamps[i], {key: value[row] for key, value in fresh.items()})
+            rows = [self._bank[p][1] for p in paths]
+        return {key: np.stack([r[key] for r in rows]) for key in ("hash", "color", "edges", "valid")}
+
+    def evaluate(self, crops, ref_paths, n_primary=None):
+        """
+        Adayları ucuz özelliklerle referanslara karşı skorlar.
+
+        Args:
+            crops: Aday görseller (PNG byte'ları, yol veya NumPy dizisi)
+            ref_paths: Referans dosya yolları
+            n_primary: İlk kaç referans ana referans (kabul sadece bunlara göre; None: hepsi)
+
+        Returns:
+            tuple: (scores (N, M), accepted (N,) bool, rejected (N,) bool) - CNN'e gitmesi
+            gerekmeyen adaylar. accepted (accept_score) ve rejected (reject_ready) sadece
+            kalibrasyon hazırsa işaretlenir
+        """
+        scores = similarity(extract_features(crops), self.reference_features(ref_paths))
+        n_primary = scores.shape[1] if n_primary is None else n_primary
+        empty = np.zeros(len(crops), dtype=np.float32)
+        best = scores.max(axis=1) if scores.shape[1] else empty
+        primary_best = scores[:, :n_primary].max(axis=1) if n_primary else empty
+        rejected = best <= config.PERCEPTUAL_REJECT
+        accepted = (primary_best >= config.PERCEPTUAL_ACCEPT) & ~rejected
+        if self.accept_score is None:
+            accepted[:] = False
+        if not self.reject_ready:
+            rejected[:] = False
+        return scores, accepted, rejected
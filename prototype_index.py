@@ -0,0 +1,389 @@
+"""
+🗂️ PROTOTYPE EMBEDDING INDEX
+prototypes/ ve prototypes/auto_captured/ altındaki referans görsellerin
+embedding'lerini diskte float16 dizi olarak saklar.
+
+- Her kayıt (içerik hash'i, model versiyonu, kategori) ile anahtarlanır
+- Dizi np.load(mmap_mode='r') ile açılır, birden fazla worker süreci aynı
+  sayfaları paylaşır
+- Dosya eklenince/silinince sadece değişen görseller yeniden encode edilir
+- nearest(): tüm prototipler üzerinde kNN araması (knn_index.py)
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import uuid
+
+import numpy as np
+
+import config
+from knn_index import KNNIndex  # 🧭 kNN
+from logger import get_ai_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_ai_logger()
+
+# Kaynak klasör adları -> lookup(source=...) değerleri
+PRIMARY = "primary"
+AUTO = "auto"
+
+# "Search_ref_manual_1.png" -> "search", "add_to_cart_auto_n11_..." -> "add_to_cart"
+_CATEGORY_SPLIT = re.compile(r"_(?:ref|auto|learned)(?:_|$)")
+
+# Tek seferde encoder'a verilecek maksimum görsel sayısı
+_EMBED_CHUNK = 32
+
+
+def category_of(filename):
+    """Dosya adından referans kategorisini çıkarır."""
+    stem = os.path.splitext(os.path.basename(filename))[0].lower()
+    return _CATEGORY_SPLIT.split(stem, maxsplit=1)[0]
+
+
+def _file_sha1(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class PrototypeIndex:
+    """
+    Referans görsellerin kalıcı, memory-mapped embedding indeksi.
+    """
+
+    def __init__(self, brain, prototypes_dir=None, index_dir=None):
+        """
+        Args:
+            brain: VisualBrain instance (embed() ve model_version için)
+            prototypes_dir: Ana prototip klasörü (varsayılan: config.PROTOTYPES_DIR)
+            index_dir: İndeks klasörü (varsayılan: config.EMBEDDING_INDEX_DIR)
+        """
+        self.brain = brain
+        self.prototypes_dir = prototypes_dir or config.PROTOTYPES_DIR
+        self.index_dir = index_dir or config.EMBEDDING_INDEX_DIR
+        self.sources = {
+            PRIMARY: self.prototypes_dir,
+            AUTO: os.path.join(self.prototypes_dir, "auto_captured"),
+        }
+        self.manifest_path = os.path.join(self.index_dir, "manifest.json")
+
+        self.entries = []        # [{"path", "source", "category", "sha1", "size", "mtime_ns"}]
+        self.embeddings = None   # np.memmap (N, D) float16 veya None
+        self.model_version = None
+        self._rows = {}          # (category, source) -> satır numaraları
+        self._dir_stamp = None   # None: ilk refresh_if_stale() tam karşılaştırma yapar
+        self._retry_at = 0.0     # Encode başarısız olduysa refresh_if_stale() bu ana kadar denemez
+        self._deferred = False   # Encode, model yüklenene kadar ertelendi (load_model=False)
+        self._knn = None         # KNNIndex (ilk nearest() çağrısında kurulur)
+        self._knn_version = None
+        self._lock = threading.RLock()
+
+        os.makedirs(self.index_dir, exist_ok=True)
+        self._load()
+
+    # --- DİSK ---
+
+    def _load(self):
+        """Manifest + memory-mapped diziyi yükler (varsa)."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        entries = manifest.get("entries", [])
+        array_file = manifest.get("array_file")
+        embeddings = None
+        if array_file:
+            try:
+                embeddings = np.load(os.path.join(self.index_dir, array_file), mmap_mode="r")
+            except (OSError, ValueError):
+                return
+            if embeddings.shape[0] != len(entries):
+                log.warning("Embedding indeksi tutarsız, yeniden oluşturulacak.")
+                return
+
+        self.model_version = manifest.get("model_version")
+        self.entries = entries
+        self.embeddings = embeddings
+        self._knn = None
+        self._build_rows()
+
+    def _build_rows(self):
+        """(kategori, kaynak) -> satır listesi haritası (None: hepsi); lookup() tek dizi indekslemesi olur."""
+        rows = {}
+        for i, entry in enumerate(self.entries):
+            rows.setdefault((entry["category"], entry["source"]), []).append(i)
+            rows.setdefault((entry["category"], None), []).append(i)
+            rows.setdefault((None, entry["source"]), []).append(i)
+            rows.setdefault((None, None), []).append(i)
+        self._rows = {key: np.asarray(value, dtype=np.intp) for key, value in rows.items()}
+
+    def _write(self, entries, embeddings):
+        """
+        Yeni diziyi benzersiz bir dosyaya yazar, ardından manifest'i atomik olarak
+        değiştirir. Eski diziyi map etmiş süreçler etkilenmez.
+        """
+        array_file = f"embeddings_{uuid.uuid4().hex[:12]}.npy"
+        tmp_array = os.path.join(self.index_dir, array_file + ".tmp")
+        with open(tmp_array, "wb") as f:
+            np.save(f, embeddings.astype(np.float16))
+        os.replace(tmp_array, os.path.join(self.index_dir, array_file))
+
+        manifest = {
+            "model_version": self.brain.model_version,
+            "array_file": array_file,
+            "updated": time.time(),
+            "entries": entries,
+        }
+        tmp_manifest = self.manifest_path + f".{os.getpid()}.tmp"
+        with open(tmp_manifest, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp_manifest, self.manifest_path)
+
+        self._cleanup(keep=array_file)
+
+    def _cleanup(self, keep):
+        """Kullanılmayan eski dizi dosyalarını siler (map'li olanlar atlanır)."""
+        for name in os.listdir(self.index_dir):
+            if name.startswith("embeddings_") and name.endswith(".npy") and name != keep:
+                try:
+                    os.remove(os.path.join(self.index_dir, name))
+                except OSError:
+                    pass  # Başka bir süreç hala kullanıyor olabilir (Windows)
+
+    # --- GÜNCELLEME ---
+
+    def _scan_dirs(self):
+        """{path: (source, stat)} - sadece .png dosyaları."""
+        found = {}
+        for source, folder in self.sources.items():
+            if not os.path.isdir(folder):
+                continue
+            with os.scandir(folder) as it:
+                for item in it:
+                    if item.is_file() and item.name.endswith(".png"):
+                        found[item.path] = (source, item.stat())
+        return found
+
+    def _stamp_dirs(self):
+        stamp = []
+        for folder in self.sources.values():
+            try:
+                stamp.append(os.stat(folder).st_mtime_ns)
+            except OSError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def refresh(self, load_model=True):
+        """
+        Klasörleri indeksle karşılaştırır, sadece yeni/değişen görselleri encode eder.
+
+        Args:
+            load_model: False ise model henüz yüklenmemişse yüklenmez; encode
+                refresh_if_stale() ile ilk görsel skorlamaya ertelenir
+
+        Returns:
+            int: Yeniden encode edilen görsel sayısı
+        """
+        with self._lock:
+            return self._refresh(load_model)
+
+    def _refresh(self, load_model=True):
+        # Damga sadece indeks klasörlerle eşitlenince kaydedilir; başarısız encode tekrar denenir
+        stamp = self._stamp_dirs()
+        found = self._scan_dirs()
+
+        # Model sadece encode edilecek yeni görsel varsa yüklenir
+        can_embed = self.brain.available
+        same_model = self.model_version == self.brain.model_version
+        old_rows = {entry["path"]: row for row, entry in enumerate(self.entries)}
+        by_key = {}      # (sha1, category) -> eski embedding satırı
+        if same_model and self.embeddings is not None:
+            for row, entry in enumerate(self.entries):
+                by_key[(entry["sha1"], entry["category"])] = row
+
+        entries = []
+        reuse = []       # yeni sıradaki her kayıt için eski satır no veya None
+        to_embed = []
+        changed = len(found) != len(self.entries) or (can_embed and self.embeddings is None)
+        changed = changed or not same_model
+
+        for path in sorted(found):
+            source, st = found[path]
+            category = category_of(path)
+            old = self.entries[old_rows[path]] if path in old_rows else None
+
+            if old and old["size"] == st.st_size and old["mtime_ns"] == st.st_mtime_ns:
+                sha1 = old["sha1"]
+            else:
+                try:
+                    sha1 = _file_sha1(path)
+                except OSError:
+                    continue
+                changed = True
+
+            entries.append({
+                "path": path,
+                "source": source,
+                "category": category,
+                "sha1": sha1,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+            })
+            row = by_key.get((sha1, category))
+            reuse.append(row)
+            if row is None and can_embed:
+                to_embed.append(len(entries) - 1)
+
+        if not changed and not to_embed:
+            self._dir_stamp = stamp
+            self._deferred = False
+            return 0
+
+        if to_embed and not (load_model or self.brain.is_loaded):
+            # Model henüz yüklenmedi: encode ilk CNN skorlamasına (refresh_if_stale) ertelenir.
+            # Embedding'i olmayan indeks sadece dosya listesini günceller; varsa eski indeks kalır
+            self._dir_stamp = stamp
+            self._deferred = True
+            if self.embeddings is None:
+                self.entries = entries
+                self._knn = None
+                self._build_rows()
+            return 0
+
+        if not can_embed:
+            # Model yok: diskteki indekse dokunma, sadece dosya listesini güncelle
+            self.entries = entries
+            self.embeddings = None
+            self._knn = None
+            self._build_rows()
+            self._dir_stamp = stamp
+            return 0
+
+        if to_embed:
+            if self.brain.encoder is None:
+                # Model yüklenemedi veya encoder ayrılamadı
+                self._retry_at = time.monotonic() + config.PROTOTYPE_RETRY_INTERVAL
+                return 0
+            dim = self.brain.head_weights.shape[0]
+        elif self.embeddings is not None:
+            dim = self.embeddings.shape[1]
+        else:
+            # Encode edilecek görsel yok (boş klasör)
+            self.entries = entries
+            self._knn = None
+            self._build_rows()
+            self._dir_stamp = stamp
+            self._deferred = False
+            return 0
+        embeddings = np.empty((len(entries), dim), dtype=np.float16)
+        for i, row in enumerate(reuse):
+            if row is not None:
+                embeddings[i] = self.embeddings[row]
+        failed = []
+        for start in range(0, len(to_embed), _EMBED_CHUNK):
+            chunk = to_embed[start:start + _EMBED_CHUNK]
+            vectors = self.brain.embed([entries[i]["path"] for i in chunk])
+            if vectors is None:
+                failed.extend(chunk)  # Model kullanılamadı
+                continue
+            embeddings[chunk] = vectors
+            # Okunamayan dosyaların satırı NaN döner
+            failed.extend(i for i, ok in zip(chunk, np.isfinite(vectors).all(axis=1)) if not ok)
+
+        if failed:
+            # Encode edilemeyenler indekse (ve manifest'e) alınmaz; sonraki refresh tekrar dener
+            log.warning(f"{len(failed)} prototip encode edilemedi, indekse alınmadı")
+            self._retry_at = time.monotonic() + config.PROTOTYPE_RETRY_INTERVAL
+            keep = np.setdiff1d(np.arange(len(entries)), failed)
+            entries = [entries[i] for i in keep]
+            embeddings = embeddings[keep]
+
+        self._write(entries, embeddings)
+        self.entries = entries
+        self.model_version = self.brain.model_version
+        self.embeddings = None
+        self._rows = {}
+        self._load()
+        if not failed:
+            self._dir_stamp = stamp
+            self._deferred = False
+
+        encoded = len(to_embed) - len(failed)
+        log.info(f"Prototip indeksi güncellendi: {len(entries)} görsel ({encoded} yeni encode)")
+        return encoded
+
+    def refresh_if_stale(self, load_model=True):
+        """
+        Klasör zaman damgaları (başka süreç dahil) veya model versiyonu değiştiyse
+        refresh() çağırır. Son encode başarısız olduysa PROTOTYPE_RETRY_INTERVAL
+        dolana kadar tekrar denemez (eksik model her taramada yeniden aranmaz).
+
+        Args:
+            load_model: False ise sadece dosya listesi eşitlenir, model yüklenmez
+                (tarama başı); True ise ertelenen encode yapılır (CNN skorlaması)
+        """
+        with self._lock:
+            if time.monotonic() < self._retry_at:
+                return 0
+            can_load = load_model or self.brain.is_loaded
+            model_changed = self.brain.available and self.model_version != self.brain.model_version
+            if self._stamp_dirs() != self._dir_stamp or (can_load and (model_changed or self._deferred)):
+                return self._refresh(load_model)
+        return 0
+
+    # --- SORGU ---
+
+    def lookup(self, category, source=None):
+        """
+        Kategoriye ait referansları döner.
+
+        Args:
+            category: Element kategorisi (email, search, button, ...)
+            source: "primary", "auto" veya None (hepsi)
+
+        Returns:
+            tuple: (paths, embeddings) - embeddings (K, D) float32 veya model yoksa None
+        """
+        rows = self._rows.get((category.lower(), source), np.empty(0, dtype=np.intp))
+        paths = [self.entries[i]["path"] for i in rows]
+        if self.embeddings is None:
+            return paths, None
+        return paths, np.asarray(self.embeddings[rows], dtype=np.float32)
+
+    def paths(self, category, source=None):
+        """Kategoriye ait referans dosyaları (embedding okumadan)."""
+        rows = self._rows.get((category.lower(), source), ())
+        return [self.entries[i]["path"] for i in rows]
+
+    def nearest(self, queries, category=None, source=None, k=None):
+        """
+        🆕 Crop embedding'lerinin en benzer prototiplerini tek sorguda bulur.
+
+        Args:
+            queries: (M, D) crop embedding'leri (VisualBrain.embed)
+            category: Sadece bu kategori (None: tüm kategoriler)
+            source: "primary", "auto" veya None (hepsi)
+            k: Komşu sayısı (varsayılan: config.KNN_TOP_K)
+
+        Returns:
+            tuple: (scores (M, k'), rows (M, k')) azalan skor sırasında;
+            satırın dosyası self.entries[row]["path"]. Embedding yoksa None.
+        """
+        with self._lock:
+            if self.embeddings is None:
+                return None
+            if self._knn is None or self._knn_version != self.brain.model_version:
+                self._knn = KNNIndex(self.embeddings, self.brain.head_weights, self.brain.head_bias)
+                self._knn_version = self.brain.model_version
+            knn = self._knn
+            key = (category.lower() if category else None, source)
+            rows = self._rows.get(key, np.empty(0, dtype=np.intp))
+        return knn.query(queries, rows, k)
@@ -0,0 +1,170 @@
+"""
+⚡ QUANTIZED CPU BACKEND EXPORT + PARITY CHECK
+Siyam modelin encoder kulesini TFLite'a (float16 ve int8) aktarır,
+karar katmanını <model>.head.npz olarak yanına yazar ve her varyantı
+prototypes/ görselleri üzerinde Keras referansıyla karşılaştırır.
+
+Kullanım:
+    python quantize_model.py
+
+Rapor: skor sapması (max/ortalama), en yakın referans uyumu ve
+görsel başına gecikme (ms).
+"""
+
+import os
+import time
+
+import numpy as np
+
+import config
+from ai_model import VisualBrain, TFLiteModel
+from backbones import write_model_meta  # 🧱 BACKBONE
+
+# int8 kalibrasyonu için kullanılacak maksimum görsel
+CALIBRATION_LIMIT = 200
+
+# Gecikme ölçümünde batch boyutu ve tekrar sayısı
+BENCH_BATCH = 16
+BENCH_ROUNDS = 3
+
+
+def list_prototypes(prototypes_dir=None):
+    """prototypes/ ve alt klasörlerindeki tüm .png dosyaları."""
+    prototypes_dir = prototypes_dir or config.PROTOTYPES_DIR
+    paths = []
+    for root, _, files in os.walk(prototypes_dir):
+        paths.extend(os.path.join(root, f) for f in files if f.endswith(".png"))
+    return sorted(paths)
+
+
+def export_tflite(brain, out_path, mode, calibration_images=None):
+    """
+    Keras encoder'ı TFLite'a aktarır ve karar katmanını yanına yazar.
+
+    Args:
+        brain: Keras modeli yüklü VisualBrain
+        out_path: .tflite çıktı yolu
+        mode: "float16" veya "int8"
+        calibration_images: int8 için temsilî görseller (yol listesi)
+
+    Returns:
+        str: Yazılan .tflite yolu
+    """
+    import tensorflow as tf
+
+    if brain.encoder is None:
+        raise RuntimeError("Encoder ayrılamadı, dışa aktarım yapılamaz.")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(brain.encoder)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if mode == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif mode == "int8":
+        images = (calibration_images or [])[:CALIBRATION_LIMIT]
+        if not images:
+            raise ValueError("int8 kalibrasyonu için görsel gerekli.")
+
+        def representative_dataset():
+            for path in images:
+                batch = brain._preprocess_image(path)
+                if batch is not None:
+                    yield [batch]
+
+        # Ağırlık + aktivasyonlar int8; giriş/çıkış float32 kalır
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    else:
+        raise ValueError(f"Bilinmeyen quantize modu: {mode}")
+
+    with open(out_path, "wb") as f:
+        f.write(converter.convert())
+    np.savez(TFLiteModel.head_path(out_path), weights=brain.head_weights, bias=np.float32(brain.head_bias))
+    write_model_meta(out_path, brain.meta)
+    print(f"💾 {mode} encoder kaydedildi: {out_path} ({os.path.getsize(out_path) / 1e6:.1f} MB)")
+    return out_path
+
+
+def measure(brain, images):
+    """
+    Tüm görselleri encode eder ve görsel başına gecikmeyi ölçer.
+
+    Returns:
+        tuple: (embeddings (N, D), ms/görsel)
+    """
+    brain.embed(images[:1])  # warmup
+    best = float("inf")
+    embeddings = None
+    for _ in range(BENCH_ROUNDS):
+        start = time.perf_counter()
+        chunks = [brain.embed(images[i:i + BENCH_BATCH]) for i in range(0, len(images), BENCH_BATCH)]
+        best = min(best, time.perf_counter() - start)
+        embeddings = np.concatenate(chunks)
+    return embeddings, best * 1000.0 / len(images)
+
+
+def parity_report(reference, candidate, images):
+    """
+    Aday backend'i Keras referansıyla karşılaştırır.
+
+    Skorlar tüm görsellerin birbirine karşı (N, N) benzerlik matrisi üzerinden
+    hesaplanır; "NN uyumu" her görsel için en benzer diğer görselin aynı olma oranıdır.
+
+    Returns:
+        dict: Sapma ve gecikme metrikleri
+    """
+    ref_emb, ref_ms = measure(reference, images)
+    cand_emb, cand_ms = measure(candidate, images)
+
+    ref_scores = reference.score(ref_emb, ref_emb)
+    cand_scores = candidate.score(cand_emb, cand_emb)
+    drift = np.abs(ref_scores - cand_scores)
+
+    np.fill_diagonal(ref_scores, -1.0)
+    np.fill_diagonal(cand_scores, -1.0)
+    nn_agreement = float(np.mean(ref_scores.argmax(axis=1) == cand_scores.argmax(axis=1)))
+
+    return {
+        "max_drift": float(drift.max()),
+        "mean_drift": float(drift.mean()),
+        "nn_agreement": nn_agreement,
+        "reference_ms": ref_ms,
+        "candidate_ms": cand_ms,
+        "speedup": ref_ms / cand_ms if cand_ms else 0.0,
+    }
+
+
+def main():
+    images = list_prototypes()
+    if len(images) < 2:
+        print(f"❌ HATA: '{config.PROTOTYPES_DIR}' altında yeterli görsel yok.")
+        return
+
+    reference = VisualBrain(config.KERAS_MODEL_PATH, use_server=False, use_cache=False)
+    if reference.encoder is None:
+        print(f"❌ HATA: Keras referans modeli yüklenemedi: {config.KERAS_MODEL_PATH}")
+        return
+
+    print(f"🔍 {len(images)} prototip görseli ile parity kontrolü yapılacak.")
+    targets = [("float16", config.TFLITE_FP16_PATH), ("int8", config.TFLITE_INT8_PATH)]
+    reports = {}
+    for mode, path in targets:
+        export_tflite(reference, path, mode, calibration_images=images)
+        candidate = VisualBrain(path, use_server=False, use_cache=False)
+        if candidate.encoder is None:
+            print(f"⚠️ {path} yüklenemedi, atlanıyor.")
+            continue
+        reports[mode] = parity_report(reference, candidate, images)
+
+    print("\n" + "=" * 70)
+    print(f"{'Backend':<10}{'Max drift':>12}{'Ort. drift':>12}{'NN uyumu':>10}{'ms/görsel':>12}{'Hızlanma':>10}")
+    print("-" * 70)
+    for mode, r in reports.items():
+        print(f"{mode:<10}{r['max_drift']:>12.4f}{r['mean_drift']:>12.4f}{r['nn_agreement']:>10.1%}"
+              f"{r['candidate_ms']:>12.1f}{r['speedup']:>9.2f}x")
+    if reports:
+        print(f"{'keras':<10}{'-':>12}{'-':>12}{'-':>10}{next(iter(reports.values()))['reference_ms']:>12.1f}{'1.00x':>10}")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+📌 REFERENCE HIT STATISTICS
+Her site + kategori için kazanan görsel skoru hangi referans dosyasının verdiğini sayar.
+Sonraki taramalarda referanslar dosya adı sırası yerine isabet sayısına göre denenir;
+en iyi referanslar erken çıkış eşiğini geçerse diğerlerine bakılmaz.
+"""
+
+import os
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+
+import config
+from json_store import JsonStore  # 💾 DEBOUNCE'LU KAYIT
+
+
+def site_of(url):
+    """URL'nin host kısmı (www. olmadan); istatistik anahtarı."""
+    host = urlparse(url or "").netloc.lower()
+    return host[4:] if host.startswith("www.") else (host or "unknown")
+
+
+class ReferenceStats:
+    """
+    {site_kategori: {referans dosya adı: isabet}} deposu (knowledge/reference_stats.json).
+    """
+
+    def __init__(self, stats_file=None):
+        self._lock = threading.Lock()
+        self._store = JsonStore(stats_file or config.REFERENCE_STATS_PATH, "Referans istatistikleri", self._lock)
+        self.stats_file = self._store.path
+        self.stats = self._store.load()
+
+    def flush(self):
+        """Bekleyen değişiklikleri diske yazar."""
+        self._store.flush()
+
+    def rank(self, site, category, refs):
+        """
+        Referansların deneme sırası: isabet sayısı azalan, eşitlikte dosya sırası.
+
+        Returns:
+            list: refs indeksleri
+        """
+        with self._lock:
+            hits = self.stats.get(f"{site}_{category}", {}).get("hits", {})
+            return sorted(range(len(refs)), key=lambda i: -hits.get(os.path.basename(refs[i]), 0))
+
+    def record(self, site, category, ref, rank):
+        """
+        Kazanan görsel skoru veren referansı kaydeder.
+
+        Args:
+            ref: Referans dosya yolu
+            rank: Bu taramada referansın deneme sırasındaki yeri (0: ilk)
+        """
+        with self._lock:
+            entry = self.stats.setdefault(f"{site}_{category}", {"scans": 0, "first_hits": 0, "hits": {}})
+            name = os.path.basename(ref)
+            entry["hits"][name] = entry["hits"].get(name, 0) + 1
+            entry["scans"] += 1
+            entry["first_hits"] += int(rank == 0)
+            entry["last_updated"] = datetime.now().isoformat()
+            self._store.changed(self.stats)
+
+    def first_hit_rate(self, site, category):
+        """Kazanan referansın ilk denenen referans olduğu taramaların oranı (0-1)."""
+        with self._lock:
+            entry = self.stats.get(f"{site}_{category}")
+            return entry["first_hits"] / entry["scans"] if entry and entry["scans"] else 0.0
@@ -0,0 +1,123 @@
+"""
+🧾 MUTATION-JOURNAL INCREMENTAL RESCANS
+Aynı sayfada aynı kategori tekrar tarandığında (progressive_scroll_and_scan adımları,
+mega_site_test'teki "Sepete At" / "Add to Cart" denemeleri) tüm adaylar baştan okunup
+skorlanmaz.
+
+- dom_observer'ın mutasyon günlüğü checkpoint'ten sonra eklenen / değişen elementleri işaretler
+- dom_snapshot.first_match(journal=...) değişmeyen düğümler için sadece element, konum,
+  visible ve value döner (ata class'ı / yazılan metin mutasyon kaydı üretmeyebilir);
+  diğer alanları önceki taramanın snapshot'ından tamamlanır
+- Görsel skor (crop + model) sadece referanslara ve görünüşe bağlıdır: değişmeyen
+  elementlerin ölçülmüş görsel skorları yeniden kullanılır. Boyutu değişen (responsive
+  yerleşim) elementlerde ve sayfa epoch'u değişince (düğüm silen mutasyon; ata class'ı /
+  stil değişikliği element işaretlenmeden görünüşü değiştirebilir) yeniden ölçülür.
+  Semantik / konum / tag skorları ucuzdur ve hedef metin değişebildiği için her taramada
+  yeniden hesaplanır
+
+Sonsuz scroll listelerinde WebDriver, crop ve inference maliyeti sayfa boyuyla değil
+yeni düğüm sayısıyla ölçeklenir. Kategori başına sadece son belgenin son taraması tutulur.
+"""
+
+import dom_snapshot
+from logger import get_bot_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_bot_logger()
+
+
+class ScanJournal:
+    """
+    {kategori: {"checkpoint", "refs", "nodes": {element: düğüm},
+                "visual": {element: ((genişlik, yükseklik), (vis, auto_vis, ref))}}}
+    """
+
+    def __init__(self):
+        self.states = {}
+
+    def checkpoint(self, category):
+        """first_match'e verilecek checkpoint ({} : ilk tarama, günlük kurulur)."""
+        state = self.states.get(category)
+        return state["checkpoint"] if state else {}
+
+    def merge(self, driver, category, nodes):
+        """
+        Değişmemiş düğüm taslaklarını önceki snapshot'la tamamlar.
+
+        Önceki taramada olmayan (ör. başka XPath'le bulunmuş) taslaklar tek snapshot
+        çağrısıyla okunur.
+
+        Returns:
+            tuple: (tam düğüm listesi (DOM sırası), yeniden kullanılan düğüm sayısı)
+        """
+        state = self.states.get(category)
+        known = state["nodes"] if state else {}
+        merged = []
+        missing = []
+        reused = 0
+        for node in nodes:
+            if not node.get("unchanged"):
+                merged.append(node)
+                continue
+            previous = known.get(node["element"])
+            if previous is None:
+                missing.append(len(merged))
+                merged.append(node)
+                continue
+            # Taslağın yeniden ölçülen alanları (konum, visible, value) öncekinin üstüne yazılır
+            merged.append(dict(previous, **{key: value for key, value in node.items() if key != "unchanged"}))
+            reused += 1
+        if missing:
+            fresh = dom_snapshot.snapshot(driver, [merged[k]["element"] for k in missing])
+            by_element = {node["element"]: node for node in fresh}
+            for k in missing:
+                merged[k] = by_element.get(merged[k]["element"])
+            merged = [node for node in merged if node is not None]
+        return merged, reused
+
+    @staticmethod
+    def _size(node):
+        return (round(node["width"]), round(node["height"]))
+
+    def visual(self, category, node, refs, checkpoint):
+        """
+        Elementin önceki taramada ölçülmüş görsel sonucu.
+
+        Args:
+            node: Bu taramanın (merge edilmiş) düğümü
+            checkpoint: Bu taramanın first_match checkpoint'i (sayfa epoch'u için)
+
+        Returns:
+            tuple: (vis, auto_vis, visual_ref) veya referanslar / boyut / sayfa epoch'u
+            değiştiyse ya da ölçülmediyse None
+        """
+        state = self.states.get(category)
+        if not state or not checkpoint or state["refs"] != tuple(refs):
+            return None
+        if state["checkpoint"].get("epoch") != checkpoint.get("epoch"):
+            return None
+        size, result = state["visual"].get(node["element"], (None, None))
+        return result if size == self._size(node) else None
+
+    def update(self, category, checkpoint, refs, nodes, visual):
+        """
+        Taramanın sonunu kaydeder.
+
+        Args:
+            checkpoint: first_match'in döndürdüğü yeni checkpoint (None: günlük yok, durum silinir)
+            nodes: Taramanın tam düğüm listesi
+            visual: {element: (vis, auto_vis, visual_ref)} bu taramada bilinen görsel sonuçlar
+        """
+        if not checkpoint:
+            self.states.pop(category, None)
+            return
+        by_element = {node["element"]: node for node in nodes}
+        self.states[category] = {
+            "checkpoint": checkpoint,
+            "refs": tuple(refs),
+            "nodes": by_element,
+            "visual": {
+                element: (self._size(by_element[element]), result)
+                for element, result in visual.items() if element in by_element
+            },
+        }
@@ -0,0 +1,82 @@
+# scan_journal_test.py
+"""
+🧾 MUTATION JOURNAL TESTİ
+Yerel bir test sayfasında (data: URL, internet gerekmez) günlüklü tekrar taramanın
+mutasyon kaydı üretmeyen değişiklikleri kaçırmadığını kontrol eder:
+
+- Atanın class'ı değişince (alt elementi gizleyen CSS) değişmemiş düğümün visible'ı
+- Input'a yazılan metin (value property'si mutasyon üretmez)
+"""
+
+import sys
+from urllib.parse import quote
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+import dom_snapshot
+from scan_journal import ScanJournal
+
+PAGE = """
+<html><head><style>.collapsed .item { display: none; }</style></head><body>
+<div id="panel"><button class="item">Giriş Yap</button></div>
+<input id="email" type="email" placeholder="E-posta">
+</body></html>
+"""
+
+XPATHS = ["//button | //input"]
+
+
+def rescan(driver, journal, category="button"):
+    """first_match + merge: SmartBot.scan_and_decide'ın günlüklü okuma adımı."""
+    nodes, _, _, checkpoint = dom_snapshot.first_match(
+        driver, XPATHS, journal=journal.checkpoint(category)
+    )
+    nodes, reused = journal.merge(driver, category, nodes)
+    journal.update(category, checkpoint, [], nodes, {})
+    return {node["tag"]: node for node in nodes}, reused
+
+
+def check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def main():
+    print("\n" + "="*70)
+    print("🧾 MUTATION JOURNAL TEST")
+    print("="*70)
+
+    options = Options()
+    options.add_argument("--headless=new")
+    driver = webdriver.Chrome(options=options)
+    results = []
+
+    try:
+        driver.get("data:text/html;charset=utf-8," + quote(PAGE))
+        journal = ScanJournal()
+
+        nodes, _ = rescan(driver, journal)
+        results.append(check("İlk tarama: buton görünür", nodes["button"]["visible"]))
+
+        # 1. Atanın class'ı: mutasyon sadece #panel'i işaretler, buton taslak olarak döner
+        driver.execute_script("document.getElementById('panel').classList.add('collapsed');")
+        nodes, reused = rescan(driver, journal)
+        results.append(check("Ata class'ı sonrası buton önceki taramadan", reused > 0))
+        results.append(check("Ata class'ı sonrası buton görünmez", not nodes["button"]["visible"]))
+
+        # 2. Yazılan metin: value property'si attribute mutasyonu üretmez
+        driver.execute_script("document.getElementById('email').value = 'test@example.com';")
+        nodes, _ = rescan(driver, journal)
+        results.append(check("Yazılan metin okundu", nodes["input"]["value"] == "test@example.com"))
+
+    finally:
+        driver.quit()
+
+    passed = all(results)
+    print(f"\n{'✅ TÜM KONTROLLER GEÇTİ' if passed else '❌ BAŞARISIZ KONTROL VAR'} ({sum(results)}/{len(results)})")
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
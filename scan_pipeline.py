@@ -0,0 +1,118 @@
+"""
+⏩ PIPELINED VISUAL SCAN
+Tarayıcı tarafı (kaydır + ekran görüntüsü + crop) ile model tarafı (perceptual
+kademe + encoder + kNN) üst üste bindirilir.
+
+- Üretici: ana thread, ViewportCapture her ekran görüntüsünden kestiği crop'ları
+  hemen submit() eder ve sıradaki kaydırma / görüntüye geçer
+- Tüketici: tek worker thread crop gruplarını sırayla modele verir
+  (TensorFlow / inference sunucusu çağrıları GIL'i bırakır)
+- join() kuyruğu boşaltır, sonuçlar crop sırasına göre birleştirilir
+  (wait(): dal-sınır turları arasında worker'ı kapatmadan bekler)
+
+Toplam süre ~ toplam(capture, inference) yerine ~ max(capture, inference) + son grubun inference'ı.
+Model tek thread'den kullanılır; ana thread scan sırasında modele dokunmaz.
+"""
+
+import queue
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+from logger import get_bot_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_bot_logger()
+
+
+class ScanPipeline:
+    """
+    Crop grupları için tek tüketicili inference kuyruğu.
+    """
+
+    _STOP = object()
+
+    def __init__(self, score_fn, size, with_auto=False, threaded=True):
+        """
+        Args:
+            score_fn: crops -> (primary (N,), auto (N,) veya None, best_ref (N,), kademe sayıları dict)
+            size: Toplam crop sayısı (sonuç dizilerinin boyu)
+            with_auto: auto_captured skorları da tutulsun mu
+            threaded: False ise submit() grubu hemen (ana thread'de) skorlar
+        """
+        self.score_fn = score_fn
+        self.primary = np.full(size, np.nan, dtype=np.float32)
+        self.auto = np.full(size, np.nan, dtype=np.float32) if with_auto else None
+        self.best = np.full(size, -1, dtype=np.intp)
+        self.tiers = Counter()
+        self.batches = 0
+        self.busy = 0.0           # Worker'ın inference'ta geçirdiği süre (saniye)
+        self._queue = queue.Queue()
+        self._thread = None
+        if threaded and size:
+            self._thread = threading.Thread(target=self._worker, name="scan-inference", daemon=True)
+            self._thread.start()
+
+    def submit(self, batch):
+        """
+        Bir ekran görüntüsünden kesilen crop'ları kuyruğa ekler.
+
+        Args:
+            batch: [(crop indeksi, (H, W, 3) görsel veya None)]
+        """
+        batch = [(k, image) for k, image in batch if image is not None]
+        if not batch:
+            return
+        if self._thread is not None:
+            self._queue.put(batch)
+        else:
+            self._run(batch)
+
+    def _worker(self):
+        while True:
+            batch = self._queue.get()
+            try:
+                if batch is self._STOP:
+                    return
+                self._run(batch)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, batch):
+        index = np.array([k for k, _ in batch], dtype=np.intp)
+        started = time.time()
+        try:
+            primary, auto, best, tiers = self.score_fn([image for _, image in batch])
+        except Exception as e:
+            print(f"   ⚠️ Batch görsel analiz başarısız: {e}")
+            log.warning(f"Pipeline batch başarısız ({len(batch)} crop): {e}")
+            return
+        finally:
+            self.busy += time.time() - started
+        self.batches += 1
+        self.tiers.update(tiers)
+        if primary is not None:
+            self.primary[index] = primary
+        if auto is not None and self.auto is not None:
+            self.auto[index] = auto
+        self.best[index] = best
+
+    def wait(self):
+        """🌳 Kuyruktaki grupların bitmesini bekler; worker açık kalır (sonraki tur için)."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def join(self):
+        """
+        Kuyruktaki tüm grupların bitmesini bekler.
+
+        Returns:
+            tuple: (primary, auto veya None, best_ref) - skorlanamayan crop'lar NaN / -1
+        """
+        if self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+        return self.primary, self.auto, self.best
@@ -3,6 +3,7 @@ import time
 import os
 import datetime
 import random 
+import numpy as np
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys 
 from selenium.webdriver.support.ui import WebDriverWait
@@ -14,6 +15,20 @@ from recovery_manager import RecoveryManager  # 🔄 SELF-RECOVERY
 from learning_system import LearningSystem  # 🧠 LEARNING
 from logger import get_bot_logger, PerformanceLogger  # 📝 LOGGING
 from auto_capture import AutoReferenceCapture  # 📸 AUTO-CAPTURE
+from prototype_index import PrototypeIndex, PRIMARY, AUTO  # 🗂️ EMBEDDING INDEX
+from perceptual_cascade import PerceptualCascade  # 🪜 CASCADE
+from page_localizer import PageLocalizer  # 🔥 HEATMAP
+from visual_gate import VisualGate, log_samples  # 🚦 SKIP-VISUAL GATE
+from reference_stats import ReferenceStats, site_of  # 📌 REFERENCE RANKING
+import dom_snapshot  # 📸 TEK ÇAĞRIDA DOM OKUMA
+import dom_observer  # 👁️ DOM SAKİNLİK BEKLEMESİ
+from xpath_telemetry import XPathTelemetry  # 🧭 XPATH İSABETLERİ
+from scan_pipeline import ScanPipeline  # ⏩ CAPTURE / INFERENCE ÖRTÜŞMESİ
+from element_cache import ElementCache  # 💾 SINIRLI ELEMENT CACHE
+from template_cache import TemplateCache  # 🧩 ŞABLON CACHE
+from scan_journal import ScanJournal  # 🧾 ARTIMLI TARAMA
+from viewport_capture import ViewportCapture  # 🖼️ SAYFA BAŞINA SCREENSHOT
+from candidate_table import CandidateTable, CONFIDENCE_EMOJI  # 📋 SÜTUNLU ADAY TABLOSU
 import config
 
 # Logger instance
@@ -26,6 +41,34 @@ class SmartBot:
         self.rules = Heuristics()
         self.prototypes_dir = config.PROTOTYPES_DIR
         
+        # 🗂️ PROTOTYPE EMBEDDING INDEX (diskte float16, memory-mapped)
+        # Referanslar bir kez encode edilir, taramalar sadece dizi okur
+        self.prototype_index = PrototypeIndex(self.brain, self.prototypes_dir)
+        
+        # 🪜 UCUZ GÖRSEL KADEME: phash + renk + kenar; sadece kararsız adaylar CNN'e gider
+        self.cascade = PerceptualCascade()
+        
+        # 🔥 SAYFA ISI HARİTASI: XPath adayları işe yaramazsa tek CNN geçişiyle aday bulur
+        self.localizer = PageLocalizer(self.brain, self.prototype_index)
+        
+        # 🚦 ÖĞRENİLMİŞ GÖRSEL KAPI: görsel skor kazananı değiştiremeyecekse CNN atlanır
+        self.visual_gate = VisualGate()
+        
+        # 📌 REFERANS SIRALAMASI: site + kategori başına hangi referansın kazandırdığı sayılır
+        self.reference_stats = ReferenceStats()
+        
+        # 🖼️ Aday görselleri element başına screenshot yerine viewport görüntüsünden kesilir
+        self.capture = ViewportCapture(driver)
+        
+        # 🧭 Dar scope XPath isabet sayıları (knowledge/xpath_telemetry.json)
+        self.xpath_telemetry = XPathTelemetry()
+        
+        # 🔥 ARKA PLAN WARMUP: Model + indeks, tarayıcı ilk sayfayı yüklerken hazırlanır
+        # Kapalıysa model ilk görsel analizde yüklenir
+        self.warmup_thread = None
+        if config.MODEL_BACKGROUND_WARMUP and self.brain.available:
+            self.warmup_thread = self.brain.warmup_async(on_ready=self.prototype_index.refresh_if_stale)
+        
         self.evidence_dir = "evidence"
         if not os.path.exists(self.evidence_dir):
             os.makedirs(self.evidence_dir)
@@ -39,7 +82,14 @@ class SmartBot:
         self.last_input_y = None
         
         # 🆕 CACHE SİSTEMİ (Hafıza)
-        self.element_cache = {}  # {"email": {"element": WebElement, "url": "...", "timestamp": ...}}
+        # 💾 LRU + TTL; tutamaç re-render'da kopsa bile saklı locator ile yeniden bulunur
+        self.element_cache = ElementCache()  # {"email_url": {"element", "score", "url", "timestamp", "locator"}}
+        
+        # 🧩 Şablon parmak izi -> kazananın locator'ı (aynı şablonlu ürün sayfaları URL'den bağımsız paylaşır)
+        self.template_cache = TemplateCache()
+        
+        # 🧾 Aynı sayfada tekrar taramalar sadece yeni / değişen düğümleri okur ve görsel analize sokar
+        self.scan_journal = ScanJournal()
         
         # 📊 RAPORLAMA SİSTEMİ
         self.reporter = reporter
@@ -53,7 +103,13 @@ class SmartBot:
         # 📸 AUTO-CAPTURE SİSTEMİ (High confidence referansları kaydet)
         self.auto_capture = AutoReferenceCapture(driver, output_dir="prototypes/auto_captured") 
 
-    def log_action(self, action_type, category, details, element):
+    def close(self):
+        """💾 Bekleyen istatistikleri diske yazar (tarayıcı kapanırken çağrılır)."""
+        self.reference_stats.flush()
+        self.xpath_telemetry.flush()
+        self.template_cache.flush()
+
+    def log_action(self, action_type, category, details, element, node=None):
         timestamp = datetime.datetime.now().strftime("%H%M%S")
         log_msg = f"[{timestamp}] {action_type.upper()} -> {category}: {details}\n"
         print(f"   📝 {log_msg.strip()}")
@@ -64,6 +120,9 @@ class SmartBot:
         try:
             screenshot_name = f"{timestamp}_{category}_{action_type}.png"
             path = os.path.join(self.evidence_dir, screenshot_name)
+            # 🖼️ Tarama görüntüsü tazeyse kanıt ondan çizilir (ek capture + bekleme yok)
+            if node is not None and self.capture.save_evidence(node, path):
+                return
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
             self.driver.execute_script("arguments[0].style.border='5px solid red !important'", element)
             time.sleep(0.5)
@@ -104,7 +163,7 @@ class SmartBot:
         Sabit time.sleep() yerine gerçek koşullara göre bekler.
         
         Args:
-            condition_type: "page_ready", "url_change", "element_clickable", "custom"
+            condition_type: "page_ready", "url_change", "dom_quiet", "element_clickable", "custom"
             timeout: Maksimum bekleme süresi
             custom_condition: Özel Selenium EC koşulu
         """
@@ -122,6 +181,13 @@ class SmartBot:
                 WebDriverWait(self.driver, timeout).until(
                     lambda d: d.current_url != current_url
                 )
+            elif condition_type == "dom_quiet":
+                # 🆕 MutationObserver: DOM DOM_QUIET_MS boyunca değişmeyince hemen döner
+                result = dom_observer.wait_for_quiet(self.driver, timeout=timeout)
+                if result is None:
+                    time.sleep(0.5)  # Observer kurulamadı, eski sabit bekleme (başarılı sayılır)
+                elif not result["stable"]:
+                    raise TimeoutException()
             elif condition_type == "custom" and custom_condition:
                 # Özel koşul
                 WebDriverWait(self.driver, timeout).until(custom_condition)
@@ -206,12 +272,18 @@ class SmartBot:
         else:
             return "button"  # Default
     
-    def check_semantic_match(self, element, target_text):
+    def check_semantic_match(self, node, target_text):
+        """
+        Semantik eşleşme skoru.
+
+        Args:
+            node: dom_snapshot düğümü (WebDriver çağrısı yapılmaz)
+            target_text: Aranan metin
+        """
         try:
-            # Element attribute'larını al
-            el_text = (element.text or "").lower()
-            el_class = (element.get_attribute("class") or "").lower()
-            el_id = (element.get_attribute("id") or "").lower()
+            # Element attribute'larını al (snapshot'tan)
+            el_class = node["class"].lower()
+            el_id = node["id"].lower()
             
             # 🆕 CLASS VE ID İÇİN AYRI NEGATİF KEYWORD KONTROLÜ
             # Bu çok önemli - text doğru olsa bile class yanlışsa reddet
@@ -258,12 +330,12 @@ class SmartBot:
                             return -1.0
             
             # DAHA KAPSAMLI ÖZELLİK TARAMASI (Class ve ID dahil!)
-            own_text = (element.text or "") + " " + \
-                       (element.get_attribute("innerText") or "") + " " + \
-                       (element.get_attribute("value") or "") + " " + \
-                       (element.get_attribute("placeholder") or "") + " " + \
-                       (element.get_attribute("title") or "") + " " + \
-                       (element.get_attribute("aria-label") or "") + " " + \
+            own_text = node["text"] + " " + \
+                       node["inner_text"] + " " + \
+                       node["value"] + " " + \
+                       node["placeholder"] + " " + \
+                       node["title"] + " " + \
+                       node["aria_label"] + " " + \
                        el_class + " " + el_id
             
             t = str(target_text).lower()
@@ -283,92 +355,249 @@ class SmartBot:
         except:
             return 0.0
 
+    def _nearest_visual_scores(self, crops, category, refs, auto_refs, order=None):
+        """
+        🆕 Crop'ları tek encoder çağrısında embed eder ve prototip indeksinde
+        kategori içi en yakın komşu skorlarını döner.
+
+        📌 order (ReferenceStats.rank) verildiyse önce geçmişte en çok kazanan referanslar
+        denenir; REFERENCE_EARLY_EXIT'i geçen crop'lar için kNN aramasına gerek kalmaz.
+
+        Returns:
+            tuple: (primary (N,) veya None, auto (N,) veya None,
+                    best (N,) primary skoru veren refs indeksi, bilinmiyorsa -1)
+        """
+        # Tarama başında ertelenen prototip encode'u (model burada zaten gerekiyor)
+        self.prototype_index.refresh_if_stale()
+        order = list(range(len(refs))) if order is None else order
+        best = np.full(len(crops), -1, dtype=np.intp)
+        if self.brain.encoder is not None and self.prototype_index.embeddings is not None:
+            crop_embeddings = self.brain.embed(crops)
+            primary = auto = None
+            if refs:
+                primary = np.zeros(len(crops), dtype=np.float32)
+                todo = np.arange(len(crops))
+                _, ref_embeddings = self.prototype_index.lookup(category, PRIMARY)
+                probes = order[:config.REFERENCE_EARLY_PROBES]
+                if probes and ref_embeddings is not None and len(ref_embeddings) == len(refs):
+                    probe_scores = np.nan_to_num(self.brain.score(crop_embeddings, ref_embeddings[probes]), nan=0.0)
+                    done = probe_scores.max(axis=1) > config.REFERENCE_EARLY_EXIT
+                    primary[done] = probe_scores[done].max(axis=1)
+                    best[done] = np.asarray(probes)[probe_scores[done].argmax(axis=1)]
+                    todo = np.flatnonzero(~done)
+                if len(todo):
+                    scores, rows = self.prototype_index.nearest(crop_embeddings[todo], category, PRIMARY)
+                    position = {path: i for i, path in enumerate(refs)}
+                    primary[todo] = scores[:, 0]
+                    best[todo] = [position.get(self.prototype_index.entries[row]["path"], -1) for row in rows[:, 0]]
+            if auto_refs:
+                auto = self.prototype_index.nearest(crop_embeddings, category, AUTO)[0].max(axis=1)
+            return primary, auto, best
+
+        # Encoder ayrılamadıysa (klasik Siyam modeli): en çok kazanan referanslarla çift karşılaştırma
+        ranked = order[:2]
+        n_primary = len(ranked)
+        n_auto = min(len(auto_refs), 3)
+        score_matrix = self.brain.compare_many(crops, [refs[i] for i in ranked] + auto_refs[:n_auto])
+        primary = score_matrix[:, :n_primary].max(axis=1) if n_primary else None
+        auto = score_matrix[:, n_primary:].max(axis=1) if n_auto else None
+        if n_primary:
+            best[:] = np.asarray(ranked)[score_matrix[:, :n_primary].argmax(axis=1)]
+        return primary, auto, best
+
+    def _score_crops(self, crops, category, refs, auto_refs, ref_order):
+        """
+        ⏩ Bir crop grubunun görsel skorları (ScanPipeline worker'ında çalışır).
+
+        🪜 Kademe 1: ucuz perceptual özellikler. Referansla neredeyse aynı (kabul) veya
+        hiç benzemeyen (ret) crop'lar CNN'e gitmez; skorları CNN ölçeğine çevrilir.
+        🪜 Kademe 2: kalanlar bir kez encode edilir, kNN ile skorlanır.
+
+        Returns:
+            tuple: (primary (N,), auto (N,) veya None, best (N,) refs indeksi, kademe sayıları)
+        """
+        tiers = {"perceptual_accept": 0, "perceptual_reject": 0, "cnn": 0}
+        primary_scores = np.full(len(crops), np.nan, dtype=np.float32)
+        auto_scores = np.full(len(crops), np.nan, dtype=np.float32) if auto_refs else None
+        best_refs = np.full(len(crops), -1, dtype=np.intp)  # 📌 primary skoru veren refs indeksi
+        to_cnn = np.arange(len(crops))
+        cheap = None
+        if config.PERCEPTUAL_CASCADE_ENABLED:
+            try:
+                # Kararlar CNN ölçeğine çevrilir: ret -> 0.0, kabul -> kalibre edilmiş kabul skoru
+                # (ikisi de yeterli CNN örneği toplanana kadar kapalı; bant CNN'e gider)
+                cheap, accepted, rejected = self.cascade.evaluate(crops, refs + auto_refs, len(refs))
+                accept_score = self.cascade.accept_score
+                primary_scores[rejected] = 0.0
+                primary_scores[accepted] = accept_score
+                best_refs[accepted] = cheap[accepted, :len(refs)].argmax(axis=1)
+                if auto_refs:
+                    auto_cheap = cheap[:, len(refs):].max(axis=1)
+                    auto_scores[rejected] = 0.0
+                    auto_scores[accepted & (auto_cheap >= config.PERCEPTUAL_ACCEPT)] = accept_score
+                tiers["perceptual_accept"] += int(accepted.sum())
+                tiers["perceptual_reject"] += int(rejected.sum())
+                to_cnn = np.flatnonzero(~(accepted | rejected))
+            except Exception as e:
+                cheap = None
+                print(f"   ⚠️ Perceptual kademe başarısız: {e}")
+
+        # 🆕 TEK INFERENCE + kNN: kategorinin TÜM prototipleri içinde en yakın komşular (dosya sırası değil)
+        if len(to_cnn) and self.brain.model is not None:  # 🆕 Model burada (ilk ihtiyaçta) yüklenir
+            try:
+                cnn_primary, cnn_auto, cnn_best = self._nearest_visual_scores(
+                    [crops[j] for j in to_cnn], category, refs, auto_refs, ref_order
+                )
+                primary_scores[to_cnn] = cnn_primary
+                best_refs[to_cnn] = cnn_best
+                if cheap is not None and refs:
+                    self.cascade.calibrate(
+                        cheap[to_cnn, :len(refs)].max(axis=1), cnn_primary, cheap[to_cnn].max(axis=1)
+                    )
+                if cnn_auto is not None:
+                    auto_scores[to_cnn] = cnn_auto
+                tiers["cnn"] += len(to_cnn)
+            except Exception as e:
+                print(f"   ⚠️ Batch görsel analiz başarısız: {e}")
+        return primary_scores, auto_scores, best_refs, tiers
+
+    def _cached_winner(self, category, node, score, details, scan_start_time):
+        """Cache / şablon isabetini reporter'a kaydeder ve winner formatında döner."""
+        # 📊 Reporter'a kaydet
+        if self.reporter:
+            self.reporter.log_scan(
+                category=category,
+                elements_found=1,
+                best_score=score,
+                duration=time.time() - scan_start_time,
+                cache_hit=True
+            )
+        
+        # Yine de winner formatında dönmeli
+        winner = {
+            "element": node["element"],
+            "score": score,
+            "attrs": dom_snapshot.attributes(node),
+            "node": node,
+            "details": details
+        }
+        return node["element"], winner
+
     def scan_and_decide(self, category, target_text=None):
         print(f"\n🤖 Analiz Başlıyor: '{category}' aranıyor (Hedef: {target_text})...")
         scan_start_time = time.time()
+        # 🖼️ Önceki taramanın görüntüleri bu taramanın kanıtı olarak kullanılmaz
+        self.capture.reset()
         
         # 🆕 CACHE KONTROLÜ (Hafızadan Al)
         current_url = self.driver.current_url
         cache_key = f"{category}_{current_url}"
         
         if cache_key in self.element_cache:
-            try:
-                cached = self.element_cache[cache_key]
-                element = cached["element"]
-                
-                # Hala geçerli mi kontrol et
-                if element.is_displayed() and element.is_enabled():
-                    print(f"   ⚡ CACHE HIT: '{category}' hafızadan alındı! (Zaman Kazancı: ~2-3s)")
-                    
-                    # 📊 Reporter'a kaydet
-                    if self.reporter:
-                        self.reporter.log_scan(
-                            category=category,
-                            elements_found=1,
-                            best_score=cached["score"],
-                            duration=time.time() - scan_start_time,
-                            cache_hit=True
-                        )
-                    
-                    # Yine de winner formatında dönmeli
-                    attrs = self.get_element_attributes(element)
-                    winner = {
-                        "element": element,
-                        "score": cached["score"],
-                        "attrs": attrs,
-                        "details": "CACHED"
-                    }
-                    return element, winner
-            except:
-                # Cache eskimiş, sil ve yeniden ara
-                print(f"   🗑️ Cache eskimiş, yeniden taranıyor...")
-                del self.element_cache[cache_key]
+            # Hala geçerli mi kontrol et (tek çağrı: epoch / parmak izi / locator ile yeniden bulma)
+            hit = self.element_cache.get(self.driver, cache_key)
+            if hit:
+                cached, node, how = hit
+                how_text = {"handle": "", "verified": " (DOM değişmiş, doğrulandı)", "locator": " (re-render, locator ile bulundu)"}[how]
+                print(f"   ⚡ CACHE HIT: '{category}' hafızadan alındı!{how_text} (Zaman Kazancı: ~2-3s)")
+                return self._cached_winner(category, node, cached["score"], "CACHED", scan_start_time)
+            # Cache eskimiş, silindi ve yeniden aranıyor
+            print(f"   🗑️ Cache eskimiş, yeniden taranıyor...")
+        
+        # 🧩 ŞABLON CACHE: aynı şablonlu başka bir sayfada (ör. başka ürün) bulunan kazanan
+        # tek çağrıda denenir; şablon parmak izi tam tarama sonrası kayıt için de tutulur
+        site = site_of(current_url)
+        template_fp, node, template = self.template_cache.probe(self.driver, site, category, target_text)
+        if node:
+            print(f"   🧩 ŞABLON HIT: '{category}' aynı şablonlu sayfadan bulundu (şablon {template_fp})")
+            self.element_cache.put(self.driver, cache_key, node["element"], template["score"], current_url)
+            return self._cached_winner(category, node, template["score"], "TEMPLATE", scan_start_time)
         
         # 🆕 REFERANS YÜK: Primary + Fallback
+        # 🗂️ Embedding indeksinden tek dizi okuması (PNG decode yok)
+        # Yeni dosya eklendiyse (auto-capture veya başka worker) liste güncellenir; model burada
+        # yüklenmez, encode ilk CNN skorlamasında (_nearest_visual_scores) yapılır
+        self.prototype_index.refresh_if_stale(load_model=False)
+        
         # Primary: prototypes/*.png
-        refs = [os.path.join(self.prototypes_dir, f) for f in os.listdir(self.prototypes_dir) if category.lower() in f.lower() and f.endswith(".png")]
+        refs = self.prototype_index.paths(category, source=PRIMARY)
         
         # 🆕 FALLBACK HAZIRLA: auto_captured/*.png (henüz kullanılmayacak)
-        auto_captured_dir = os.path.join(self.prototypes_dir, "auto_captured")
-        auto_refs = []
-        if os.path.exists(auto_captured_dir):
-            auto_refs = [os.path.join(auto_captured_dir, f) for f in os.listdir(auto_captured_dir) if category.lower() in f.lower() and f.endswith(".png")]
+        auto_refs = self.prototype_index.paths(category, source=AUTO)
         
         initial_ref_count = len(refs)
         
+        # 📌 Referanslar dosya sırası yerine bu sitede en çok kazandıranlardan başlayarak denenir
+        ref_order = self.reference_stats.rank(site, category, refs)
+        
         # 🆕 SMART XPATH STRATEJİSİ
-        # Önce dar scope dene, bulamazsa geniş scope'a geç
-        xpath, scope_type = self.rules.get_smart_xpath(category, self.driver)
+        # Önce dar scope'lar (öncelik sırasıyla), hepsi boşsa geniş scope
+        # 📸 Tüm XPath'ler + kazananın düğümleri ve skorlama alanları TEK execute_script çağrısında
+        xpath_plan = self.rules.get_xpath_plan(category)
         
-        time.sleep(0.5)  # Reduced from 1s
-        elements = self.driver.find_elements(By.XPATH, xpath)
+        # 👁️ Sabit 0.5s yerine DOM sakinleşene kadar (SPA render'ı bitince hemen)
+        self.smart_wait("dom_quiet", timeout=config.DOM_QUIET_TIMEOUT)
+        # 🧾 Günlük: önceki taramadan beri değişmeyen düğümler sadece element + konum olarak döner
+        journal = self.scan_journal.checkpoint(category) if config.MUTATION_JOURNAL_ENABLED else None
+        nodes, xpath_counts, chosen, checkpoint = dom_snapshot.first_match(
+            self.driver, [xpath for xpath, _ in xpath_plan], lazy_last=True, journal=journal
+        )
+        nodes, reused_nodes = self.scan_journal.merge(self.driver, category, nodes)
+        if reused_nodes:
+            print(f"   🧾 Günlük: {len(nodes) - reused_nodes} yeni/değişen düğüm okundu, {reused_nodes} önceki taramadan")
+        scope_type = xpath_plan[chosen][1] if chosen >= 0 else "FALLBACK"
+        if scope_type == "FALLBACK" and len(xpath_plan) > 1:
+            print("   ⚠️ Dar scope boş, geniş scope kullanıldı...")
+        # 🧭 XPath isabet telemetrisi (hangi dar scope'lar işe yarıyor)
+        self.xpath_telemetry.record(category, xpath_plan, xpath_counts, chosen)
+        elements = [node["element"] for node in nodes]
         
-        # Dar scope boş döndüyse fallback'e geç
-        if not elements and scope_type != "FALLBACK":
-            print(f"   ⚠️ Dar scope ({scope_type}) boş, geniş scope deneniyor...")
-            xpath = self.rules.get_xpath(category)  # Fallback
-            elements = self.driver.find_elements(By.XPATH, xpath)
-            scope_type = "FALLBACK"
+        # 🔥 ISI HARİTASI: tek ekran görüntüsünden bulunan elementler DOM adaylarına EKLENİR
+        # (XPath adayları atılmaz). Görsel skorları ısı haritasındaki kutu skorudur (crop alınmaz)
+        located = {}
+        if refs and self.brain.available and self.localizer.should_run(elements):
+            located = self.localizer.locate(self.driver, category)
+            known = set(elements)
+            extra = [el for el in located if el not in known]
+            if extra:
+                nodes = nodes + dom_snapshot.snapshot(self.driver, extra)
+                print(f"   🔥 Isı haritası: {len(extra)} yeni aday eklendi")
+                if not elements:
+                    scope_type = "HEATMAP"
+                elements = [node["element"] for node in nodes]
         
-        candidates = []
         screen_height = self.driver.execute_script("return window.innerHeight")
 
-        scope_emoji = {"NARROW": "🎯", "NARROW_COMBINED": "🎯", "FALLBACK": "🔍"}.get(scope_type, "🔍")
+        scope_emoji = {"NARROW": "🎯", "NARROW_COMBINED": "🎯", "FALLBACK": "🔍", "HEATMAP": "🔥"}.get(scope_type, "🔍")
         print(f"   {scope_emoji} {len(elements)} element bulundu ({scope_type}). Detaylı analiz başlıyor...")
 
-        for i, el in enumerate(elements):
+        # 🆕 BATCH GÖRSEL ANALİZ
+        # 1. geçiş: TÜM adaylar için ucuz skorlar (semantik / konum / tag)
+        # 2. 🌳 dal-sınır: görsel analiz en yüksek üst sınırlı adaylardan başlar, turlar halinde;
+        #    ⏩ crop'lar ekran görüntüleri alınırken worker thread'de skorlanır
+        # 3. geçiş: final skor ve eşik kontrolleri
+        use_auto_refs = bool(auto_refs) and initial_ref_count > 0
+        use_visual = bool(refs) and self.brain.available
+        pending = []
+        # 🪜 Her kademenin çözdüğü aday sayısı (semantik / kapı / günlük / ucuz kabul / ucuz ret / CNN / atlandı)
+        tiers = {"semantic": 0, "gate": 0, "journal": 0, "perceptual_accept": 0, "perceptual_reject": 0, "cnn": 0, "fallback": 0}
+        gate_active = self.visual_gate.covers(category)
+        # 📋 Konum skorları tüm düğümler için tek dizi işleminde
+        loc_scores = self.rules.score_locations([node["y"] for node in nodes], screen_height, category)
+
+        for i, node in enumerate(nodes):
             try:
-                if not el.is_displayed(): 
+                el = node["element"]
+                if not node["visible"]: 
                     if category == "search":
                         print(f"      🚫 Search Debug: Element {i} görünür değil")
                     continue
-                size = el.size
-                if size['width'] < 20 or size['height'] < 20: 
+                if node["width"] < 20 or node["height"] < 20: 
                     if category == "search":
-                        print(f"      🚫 Search Debug: Element {i} çok küçük ({size['width']}x{size['height']})")
+                        print(f"      🚫 Search Debug: Element {i} çok küçük ({node['width']:.0f}x{node['height']:.0f})")
                     continue
                 
-                attrs = self.get_element_attributes(el)
+                attrs = dom_snapshot.attributes(node)
                 el_id = attrs['id']
                 
                 if el_id and self.last_interaction['id'] == el_id:
@@ -381,131 +610,134 @@ class SmartBot:
                     print(f"      🚫 Atlandı (İçi Dolu): {el_id}")
                     continue
 
-                loc_score = self.rules.score_location(el.location['y'], screen_height, category)
-                tag_score = self.rules.score_tag_priority(el.tag_name, attrs, category)
-                sem_score = self.check_semantic_match(el, target_text)
+                el_y = node["y"]
+                loc_score = float(loc_scores[i])
+                tag_score = self.rules.score_tag_priority(node["tag"], attrs, category)
+                sem_score = self.check_semantic_match(node, target_text)
                 
                 # 🆕 ADD_TO_CART DEBUG - Neden bulunamadığını görmek için
                 if category == "add_to_cart":
-                    el_text = (el.text or "")[:50]
+                    el_text = node["text"][:50]
                     print(f"      🔍 AddToCart Debug: Element {i}")
                     print(f"          Text: '{el_text}'")
                     print(f"          Tag: {attrs.get('tag')} | Class: {(attrs.get('class') or '')[:30]}")
                     print(f"          Sem:{sem_score:.2f} Loc:{loc_score:.2f} Tag:{tag_score:.2f}")
                 
-                # 🆕 EARLY STOPPING - Semantik skor çok yüksekse görsel analizi atla
-                # Bu "Sepete Ekle" gibi tam eşleşmelerde büyük zaman kazandırır
-                skip_visual = False
-                if sem_score >= 2.0:  # Güçlü semantik eşleşme (örn: "sepete ekle" tam eşleşme)
-                    skip_visual = True
-                    vis_score = 0.5  # Varsayılan görsel skor
+                item = {
+                    "index": i, "element": el, "node": node, "attrs": attrs, "y": el_y,
+                    "loc": loc_score, "tag": tag_score, "sem": sem_score,
+                    "vis": None, "resolved": False,
+                }
                 
-                # 🆕 GÖRSEL ANALİZ OPTİMİZASYONU
-                if not skip_visual:
-                    vis_score = 0.0
-                    
-                    # Sadece ilk N elementi görsel analiz et (performans için)
-                    MAX_VISUAL_ANALYSIS = 15
-                    
-                    if refs and self.brain.model and i < MAX_VISUAL_ANALYSIS:
-                        try:
-                            # Elementi görsel olarak kaydet
-                            temp_el_img = f"{config.TEMP_SCAN_IMAGE.replace('.png', '')}_{i}.png"
-                            el.screenshot(temp_el_img)
-                            
-                            # 🆕 İLK PROTOTYPE YETERLİ - Eğer yüksek skor bulursan dur
-                            max_similarity = 0.0
-                            for ref_path in refs[:2]:  # Sadece ilk 2 prototype (hız için)
-                                similarity = self.brain.compare_images(temp_el_img, ref_path)
-                                max_similarity = max(max_similarity, similarity)
-                                
-                                # Early exit - Yeterince yüksek skor bulunduysa dur
-                                if max_similarity > 0.85:
-                                    break
-                            
-                            vis_score = max_similarity
-                            
-                            # Temizlik
-                            try:
-                                os.remove(temp_el_img)
-                            except:
-                                pass
-                                
-                        except Exception as e:
-                            # Görsel analiz başarısız, fallback
-                            vis_score = 0.25 if refs else 0.0
-                    else:
-                        # Görsel analiz atlandı veya model yok
-                        vis_score = 0.25 if refs else 0.0
+                # 🚦 ÖĞRENİLMİŞ KAPI: görsel olmayan skorlarla kazanma olasılığı eşiğin üstündeyse
+                # görsel analiz atlanır (kategorinin politikası yoksa None döner)
+                gate_vis = self.visual_gate.skip_visual(category, sem_score, loc_score, tag_score) if gate_active else None
+                remembered = self.scan_journal.visual(category, node, refs + auto_refs, checkpoint) if use_visual else None
                 
-                proximity_bonus = 0.0
-                if category == "button" and self.last_input_y:
-                    proximity_bonus = self.rules.score_proximity(el.location['y'], self.last_input_y)
+                if gate_vis is not None:
+                    item["vis"] = gate_vis  # Kategorideki kazananların tipik görsel skoru
+                    item["resolved"] = True
+                    tiers["gate"] += 1
+                # 🆕 EARLY STOPPING - Semantik skor çok yüksekse görsel analizi atla
+                # Politikası olmayan kategorilerde "Sepete Ekle" gibi tam eşleşmeler için eski kural
+                elif not gate_active and sem_score >= 2.0:  # Güçlü semantik eşleşme
+                    item["vis"] = 0.5  # Varsayılan görsel skor
+                    item["resolved"] = True
+                    tiers["semantic"] += 1
+                elif el in located:
+                    item["vis"] = located[el]  # 🔥 Isı haritası skoru
+                    item["resolved"] = True
+                    tiers["cnn"] += 1
+                elif remembered:
+                    # 🧾 Değişmemiş element: önceki taramada ölçülen görsel skor
+                    item["vis"], item["auto_vis"], item["visual_ref"] = remembered
+                    item["resolved"] = True
+                    item["journal"] = True
+                    tiers["journal"] += 1
+                elif use_visual:
+                    pass  # 🌳 Görsel skor dal-sınır turlarında (vis None: açık aday)
+                else:
+                    # Görsel analiz yok (referans veya model yok)
+                    item["vis"] = 0.25 if refs else 0.0
+                
+                pending.append(item)
+            except:
+                continue
 
-                # 🆕 KATEGORİ BAZLI DİNAMİK PUANLAMA
-                final_score, confidence_level = self.rules.calculate_final_score(
-                    vis_score, sem_score, loc_score, tag_score, category=category
+        table = CandidateTable(pending)
+        table.prepare(self.rules, category, self.last_input_y)
+
+        # 🌳 DAL-SINIR: her turda üst sınırı (görsel skor = 1.0) en yüksek açık adaylar analiz edilir;
+        # mevcut kazananı geçemeyecek adaylar budanır. Bütçe çok büyük sayfalarda toplam crop'u sınırlar.
+        # ⏩ PIPELINE: ana thread kaydırıp ekran görüntüsü alırken worker thread crop'ları
+        # kademe 1 + kademe 2'den geçirir (sonuç dizileri tablo satırı indeksli)
+        pipeline = ScanPipeline(
+            lambda crops: self._score_crops(crops, category, refs, auto_refs if use_auto_refs else [], ref_order),
+            len(table), with_auto=use_auto_refs, threaded=config.SCAN_PIPELINE_ENABLED,
+        )
+        capture_start = time.time()
+        capture_time = 0.0
+        analyzed = rounds = 0
+        try:
+            while analyzed < config.VISUAL_ANALYSIS_BUDGET:
+                batch = table.next_visual_batch(
+                    self.rules, category, min(config.VISUAL_BATCH_SIZE, config.VISUAL_ANALYSIS_BUDGET - analyzed)
                 )
-                final_score += proximity_bonus
-                
-                # Minimum eşik kontrolü
-                min_threshold = config.get_min_threshold_for_category(category)
-                
-                # 🆕 SEARCH DEBUG
-                if category == "search":
-                    print(f"      🔍 Search Debug: Element {i}")
-                    print(f"          V:{vis_score:.2f} S:{sem_score:.1f} L:{loc_score:.1f} T:{tag_score:.1f}")
-                    print(f"          Final:{final_score:.2f} Threshold:{min_threshold:.2f} Conf:{confidence_level}")
+                if not len(batch):
+                    break
+                round_start = time.time()
+                self.capture.crop(
+                    [table.nodes[r] for r in batch], reuse=rounds > 0,
+                    on_frame=lambda cut, batch=batch: pipeline.submit([(batch[k], image) for k, image in cut]),
+                )
+                capture_time += time.time() - round_start
+                pipeline.wait()
+                tiers["fallback"] += table.record_visual(batch, pipeline.primary, pipeline.auto, pipeline.best)
+                analyzed += len(batch)
+                rounds += 1
+        finally:
+            primary_scores, _, _ = pipeline.join()
+        pruned = table.close_open()
+        tiers["fallback"] += table.skipped()
+        for tier, count in pipeline.tiers.items():
+            tiers[tier] += count
+        if analyzed or pruned:
+            print(f"   🌳 Dal-sınır: {analyzed} aday görsel analiz ({rounds} tur), {pruned} aday budandı")
+        if analyzed:
+            print(f"   ⏩ Pipeline: {pipeline.batches} grup | capture {capture_time:.2f}s | "
+                  f"inference {pipeline.busy:.2f}s | toplam {time.time() - capture_start:.2f}s")
 
-                # 🆕 SEARCH İÇİN DAHA TOLERANSLI EŞİK
-                # Search input'ları kritik olduğu için düşük skorlu bile kabul et
-                if category == "search" and attrs.get('tag', '').lower() == 'input':
-                    if final_score > 0.0:  # Herhangi bir pozitif skor varsa kabul et
-                        candidates.append({
-                            "element": el,
-                            "score": final_score,
-                            "confidence": confidence_level,
-                            "attrs": attrs,
-                            "visual_score": vis_score,
-                            "details": f"V:{vis_score:.2f} S:{sem_score:.1f} L:{loc_score:.1f} T:{tag_score:.1f} P:{proximity_bonus:.2f} [{confidence_level}]"
-                        })
-                        continue
-                
-                # 🆕 EVRENSEL: ADD_TO_CART VE CHECKOUT İÇİN DE TOLERANSLI EŞİK
-                # Bu butonlar farklı sitelerde çok farklı yapıda olabilir
-                if category in ["add_to_cart", "checkout"] and attrs.get('tag', '').lower() in ['button', 'a', 'div', 'span']:
-                    if final_score > 0.05:  # Çok düşük eşik - pozitif skor varsa kabul et
-                        candidates.append({
-                            "element": el,
-                            "score": final_score,
-                            "confidence": confidence_level,
-                            "attrs": attrs,
-                            "visual_score": vis_score,
-                            "details": f"V:{vis_score:.2f} S:{sem_score:.1f} L:{loc_score:.1f} T:{tag_score:.1f} P:{proximity_bonus:.2f} [{confidence_level}]"
-                        })
-                        continue
+        # 📋 3. GEÇİŞ - SÜTUNLU TABLO: ağırlıklandırma, güven seviyesi ve eşikler
+        # tüm adaylara dizi işlemleriyle; aday dict'leri sadece ilk k için
+        table.score(self.rules, category, self.last_input_y)
 
-                if final_score > min_threshold or confidence_level != "REJECT":
-                    candidates.append({
-                        "element": el,
-                        "score": final_score,
-                        "confidence": confidence_level,
-                        "attrs": attrs,
-                        "visual_score": vis_score,  # 📸 Auto-capture için
-                        "details": f"V:{vis_score:.2f} S:{sem_score:.1f} L:{loc_score:.1f} T:{tag_score:.1f} P:{proximity_bonus:.2f} [{confidence_level}]"
-                    })
-            except:
-                continue
+        # 🆕 SEARCH DEBUG
+        if category == "search":
+            min_threshold = config.get_min_threshold_for_category(category)
+            for r, row in enumerate(table.rows):
+                print(f"      🔍 Search Debug: Element {row['index']}")
+                print(f"          V:{row['vis']:.2f} S:{row['sem']:.1f} L:{row['loc']:.1f} T:{row['tag']:.1f}")
+                print(f"          Final:{row['score']:.2f} Threshold:{min_threshold:.2f} Conf:{table.confidence[r]}")
 
-        if not candidates: return None
+        candidates = [table.candidate(r) for r in table.ranked(category)[:config.CANDIDATE_DETAIL_TOP_K]]
 
-        candidates.sort(key=lambda x: x['score'], reverse=True)
+        # 🧾 Sonraki tarama için: düğümler + ölçülmüş (veya günlükten gelen) görsel skorlar
+        self.scan_journal.update(category, checkpoint, refs + auto_refs, nodes, {
+            table.elements[r]: (float(row["vis"]), float(row["auto_vis"]), int(row["visual_ref"]))
+            for r, row in enumerate(table.rows)
+            if pending[r].get("journal") or (row["crop"] >= 0 and not np.isnan(primary_scores[r]))
+        })
+
+        print(f"   🪜 Görsel kademe: semantik {tiers['semantic']} | kapı {tiers['gate']} | günlük {tiers['journal']} | ucuz kabul {tiers['perceptual_accept']} | "
+              f"ucuz ret {tiers['perceptual_reject']} | CNN {tiers['cnn']} | atlandı {tiers['fallback']}")
+
+        if not candidates: return None
         
         # --- DEBUG: İLK 3 ADAYI GÖSTER ---
         print("\n   🔍 EN İYİ ADAYLAR:")
         for idx, cand in enumerate(candidates[:3]):
             identifier = f"ID:{cand['attrs']['id']}" if cand['attrs']['id'] else f"CLASS:{cand['attrs']['class']}"
-            conf_emoji = {"HIGH": "🟢", "MEDIUM": "🟡", "LOW": "🟠", "REJECT": "🔴"}.get(cand.get('confidence', 'LOW'), "⚪")
+            conf_emoji = CONFIDENCE_EMOJI.get(cand.get('confidence', 'LOW'), "⚪")
             print(f"      #{idx+1}: {cand['attrs']['tag']} (Skor: {cand['score']:.4f}) {conf_emoji} {identifier}")
             print(f"          └-> {cand['details']}")
             
@@ -513,39 +745,45 @@ class SmartBot:
         
         # 🆕 FALLBACK: Düşük skor ve auto_refs varsa tekrar tara
         FALLBACK_THRESHOLD = 0.7
-        if winner['score'] < FALLBACK_THRESHOLD and auto_refs and initial_ref_count > 0:
+        if winner['score'] < FALLBACK_THRESHOLD and use_auto_refs:
             print(f"   ⚠️ Düşük skor ({winner['score']:.2f}), auto_captured refs ile tekrar taranıyor...")
             print(f"   📁 Referans sayısı: {initial_ref_count} → {initial_ref_count + len(auto_refs)} (+{len(auto_refs)} auto)")
             
-            # Auto-captured ile tüm candidate'ları tekrar değerlendir
-            improved_count = 0
-            for cand in candidates[:5]:  # İlk 5 candidate
-                el = cand['element']
-                try:
-                    temp_el_img = f"{config.TEMP_SCAN_IMAGE.replace('.png', '')}_fallback.png"
-                    el.screenshot(temp_el_img)
-                    
-                    # Auto refs ile karşılaştır
-                    max_auto_sim = 0.0
-                    for ref_path in auto_refs[:3]:
-                        sim = self.brain.compare_images(temp_el_img, ref_path)
-                        max_auto_sim = max(max_auto_sim, sim)
-                    
-                    # İyileştirme varsa uygula
-                    if max_auto_sim > cand.get('visual_score', 0):
-                        old_score = cand['score']
-                        score_boost = (max_auto_sim - cand.get('visual_score', 0)) * 0.4
-                        cand['score'] += score_boost
-                        cand['visual_score'] = max_auto_sim
-                        improved_count += 1
-                        print(f"      ✨ #{candidates.index(cand)+1} iyileşti: {old_score:.2f} → {cand['score']:.2f}")
-                    
+            # Auto-captured skorları ilk batch'ten gelir; görsel analize girmemiş
+            # adaylar (kapı / semantik / dal-sınır budaması) tek ek batch'te skorlanır
+            top = candidates[:5]  # İlk 5 candidate
+            missing = [cand for cand in top if cand.get('auto_visual_score') is None]
+            if missing:
+                extra_crops = []
+                extra_cands = []
+                for cand, image in zip(missing, self.capture.crop([cand['node'] for cand in missing])):
+                    if image is not None:
+                        extra_crops.append(image)
+                        extra_cands.append(cand)
+                if extra_crops:
                     try:
-                        os.remove(temp_el_img)
+                        _, extra_scores, _ = self._nearest_visual_scores(extra_crops, category, [], auto_refs)
+                        for cand, sim in zip(extra_cands, extra_scores):
+                            cand['auto_visual_score'] = float(sim)
                     except:
                         pass
-                except:
-                    pass
+            
+            # Auto-captured ile tüm candidate'ları tekrar değerlendir
+            improved_count = 0
+            for cand in top:
+                max_auto_sim = cand.get('auto_visual_score')
+                if max_auto_sim is None:
+                    continue
+                
+                # İyileştirme varsa uygula
+                if max_auto_sim > cand.get('visual_score', 0):
+                    old_score = cand['score']
+                    score_boost = (max_auto_sim - cand.get('visual_score', 0)) * 0.4
+                    cand['score'] += score_boost
+                    cand['visual_score'] = max_auto_sim
+                    cand['visual_ref'] = -1  # Skor artık auto_captured'dan
+                    improved_count += 1
+                    print(f"      ✨ #{candidates.index(cand)+1} iyileşti: {old_score:.2f} → {cand['score']:.2f}")
             
             if improved_count > 0:
                 candidates.sort(key=lambda x: x['score'], reverse=True)
@@ -554,9 +792,25 @@ class SmartBot:
                 print(f"   🔄 Fallback sonucu: {old_winner_score:.2f} → {winner['score']:.2f}")
         
         identifier = f"ID:{winner['attrs']['id']}" if winner['attrs']['id'] else f"CLASS:{winner['attrs']['class']}"
-        conf_emoji = {"HIGH": "🟢", "MEDIUM": "🟡", "LOW": "🟠", "REJECT": "🔴"}.get(winner.get('confidence', 'LOW'), "⚪")
+        conf_emoji = CONFIDENCE_EMOJI.get(winner.get('confidence', 'LOW'), "⚪")
         print(f"\n   🏆 KAZANAN: {winner['attrs']['tag']} (Skor: {winner['score']:.4f}) {conf_emoji} {winner.get('confidence', 'N/A')} {identifier}")
         
+        # 📌 Kazanan görsel skoru veren referansı bu site için say
+        if winner.get('visual_ref', -1) >= 0:
+            ref_index = winner['visual_ref']
+            self.reference_stats.record(site, category, refs[ref_index], ref_order.index(ref_index))
+            print(f"   📌 Kazanan referans: {os.path.basename(refs[ref_index])} "
+                  f"(sıra #{ref_order.index(ref_index) + 1}, ilk deneme isabeti "
+                  f"{self.reference_stats.first_hit_rate(site, category):.0%})")
+        
+        # 🚦 Kapı eğitimi için: görsel skoru gerçekten hesaplanan adaylar ve kazanıp kazanmadıkları
+        log_samples(category, [
+            {"vis": round(float(primary_scores[r]), 4), "sem": item["sem"], "loc": item["loc"],
+             "tag": item["tag"], "won": item["element"] == winner["element"]}
+            for r, item in enumerate(pending)
+            if table.rows["crop"][r] >= 0 and not np.isnan(primary_scores[r])
+        ])
+        
         # 📊 Reporter'a kaydet
         scan_duration = time.time() - scan_start_time
         if self.reporter:
@@ -565,17 +819,17 @@ class SmartBot:
                 elements_found=len(elements),
                 best_score=winner['score'],
                 duration=scan_duration,
-                cache_hit=False
+                cache_hit=False,
+                visual_tiers=tiers
             )
         
         # 🆕 CACHE'E KAYDET (Gelecekte kullan)
-        self.element_cache[cache_key] = {
-            "element": winner['element'],
-            "score": winner['score'],
-            "url": current_url,
-            "timestamp": time.time()
-        }
-        print(f"   💾 Cache'e kaydedildi: {cache_key}")
+        locator = self.element_cache.put(self.driver, cache_key, winner['element'], winner['score'], current_url)
+        if locator:
+            print(f"   💾 Cache'e kaydedildi: {cache_key}")
+            # 🧩 Aynı şablondaki diğer sayfalar (diğer ürünler) için
+            if self.template_cache.record(site, category, target_text, template_fp, locator, winner['score']):
+                print(f"   🧩 Şablon kaydedildi: {template_fp}")
         
         return winner['element'], winner
 
@@ -606,7 +860,7 @@ class SmartBot:
             details = f"Skor:{winner_data['score']:.2f} {identifier}"
             
             if text:
-                self.log_action("TYPE", category, f"{details} -> Yazılan: {text}", element)
+                self.log_action("TYPE", category, f"{details} -> Yazılan: {text}", element, winner_data.get('node'))
                 element.click()
                 time.sleep(0.5)  # Focus için bekle
                 
@@ -665,7 +919,7 @@ class SmartBot:
                     self.last_input_y = 0  # Sayfa değişti, eski location geçersiz
                 action_type = "TYPE"
             else:
-                self.log_action("CLICK", category, details, element)
+                self.log_action("CLICK", category, details, element, winner_data.get('node'))
                 try:
                     element.click()
                 except:
@@ -0,0 +1,134 @@
+"""
+🧩 PAGE-TEMPLATE CACHE
+Aynı sitenin ürün sayfaları (N11, Trendyol ...) tek bir şablondan üretilir; URL'ye bağlı
+element cache'i her yeni ürün sayfasında soğuk kalır.
+
+- Şablon parmak izi: body altındaki ana bölgelerin (TEMPLATE_DEPTH seviye) tag + class
+  iskeletinin hash'i. Rakam içeren (build hash'i / ürün id'si) class'lar atılır, art arda
+  tekrar eden kardeşler (farklı uzunlukta listeler) tek sayılır
+- Parmak izi -> kazananın locator'ı (element_cache.LOCATOR_JS: id'li ataya göre css yolu +
+  attribute parmak izi) ve skoru; site + kategori + hedef metin başına
+  (knowledge/template_cache.json)
+- probe(): parmak izini hesaplar ve eşleşen şablonun locator'ını TEK execute_script
+  çağrısında dener. Bulunamazsa tam tarama yapılır, sonucu record() ile saklanır
+"""
+
+import threading
+from datetime import datetime
+
+import config
+import dom_snapshot
+from element_cache import LOCATOR_JS
+from json_store import JsonStore  # 💾 DEBOUNCE'LU KAYIT
+from logger import get_learning_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_learning_logger()
+
+_FINGERPRINT_JS = """
+function templateFingerprint(maxDepth, maxChildren) {
+    var skip = {script: 1, style: 1, noscript: 1, link: 1, meta: 1, template: 1, svg: 1};
+    var out = [];
+    function sig(el) {
+        var cls = (el.getAttribute('class') || '').trim().split(/\\s+/)
+            .filter(function (c) { return c && !/\\d/.test(c); }).sort().join('.');
+        return el.tagName.toLowerCase() + (cls ? '.' + cls : '');
+    }
+    function walk(el, depth) {
+        var prev = null, n = 0;
+        for (var i = 0; i < el.children.length && n < maxChildren; i++) {
+            var child = el.children[i];
+            if (skip[child.tagName.toLowerCase()]) continue;
+            var s = sig(child);
+            if (s === prev) continue;
+            prev = s; n++;
+            out.push(depth + ':' + s);
+            if (depth < maxDepth) walk(child, depth + 1);
+        }
+    }
+    if (document.body) walk(document.body, 1);
+    var text = out.join('|'), h = 5381;
+    for (var j = 0; j < text.length; j++) h = ((h * 33) ^ text.charCodeAt(j)) >>> 0;
+    return h.toString(16) + '-' + out.length;
+}
+"""
+
+_PROBE_JS = dom_snapshot.DESCRIBE_JS + LOCATOR_JS + _FINGERPRINT_JS + """
+var known = arguments[0], fp = templateFingerprint(arguments[1], arguments[2]);
+var loc = known[fp], el = loc ? findByLocator(loc) : null;
+return {fingerprint: fp, tried: !!loc, node: el ? (describe([el], arguments[3])[0] || null) : null};
+"""
+
+
+class TemplateCache:
+    """
+    {site_kategori_hedef: {parmak izi: {locator, score, hits, misses, last_used}}}
+    """
+
+    def __init__(self, cache_file=None):
+        self._lock = threading.Lock()
+        self._store = JsonStore(cache_file or config.TEMPLATE_CACHE_PATH, "Şablon cache'i", self._lock)
+        self.cache_file = self._store.path
+        self.templates = self._store.load()
+
+    def flush(self):
+        """Bekleyen değişiklikleri diske yazar."""
+        self._store.flush()
+
+    @staticmethod
+    def _key(site, category, target_text):
+        return f"{site}_{category}_{(target_text or '').strip().lower()}"
+
+    def probe(self, driver, site, category, target_text=None):
+        """
+        Sayfanın şablon parmak izini hesaplar; bilinen şablonsa kazananı locator ile arar.
+
+        Returns:
+            tuple: (parmak izi veya None, snapshot düğümü veya None, şablon girişi veya None)
+        """
+        key = self._key(site, category, target_text)
+        with self._lock:
+            known = {fp: entry["locator"] for fp, entry in self.templates.get(key, {}).items()}
+        try:
+            result = driver.execute_script(
+                _PROBE_JS, known, config.TEMPLATE_DEPTH, config.TEMPLATE_MAX_CHILDREN, dom_snapshot.MAX_TEXT
+            )
+            fingerprint = result["fingerprint"]
+        except Exception as e:
+            log.warning(f"Şablon parmak izi alınamadı: {e}")
+            return None, None, None
+
+        if not result["tried"]:
+            return fingerprint, None, None
+        with self._lock:
+            entry = self.templates[key][fingerprint]
+            entry["last_used"] = datetime.now().isoformat()
+            if result["node"]:
+                entry["hits"] += 1
+            else:
+                entry["misses"] += 1
+                # Şablon değişmiş / locator artık tutmuyor: sürekli ıskalayan giriş silinir
+                if entry["misses"] > entry["hits"] + config.TEMPLATE_MAX_MISSES:
+                    del self.templates[key][fingerprint]
+            self._store.changed(self.templates)
+        return fingerprint, result["node"], entry
+
+    def record(self, site, category, target_text, fingerprint, locator, score):
+        """
+        Tam taramanın kazananını bu şablon için saklar (skor TEMPLATE_MIN_SCORE altındaysa saklamaz).
+        Anahtar başına en fazla TEMPLATE_MAX_PER_KEY şablon; en eski kullanılan atılır.
+        """
+        if not fingerprint or not locator or score < config.TEMPLATE_MIN_SCORE:
+            return False
+        key = self._key(site, category, target_text)
+        with self._lock:
+            entries = self.templates.setdefault(key, {})
+            now = datetime.now().isoformat()
+            entries[fingerprint] = {
+                "locator": {"css": locator["css"], "fingerprint": locator["fingerprint"]},
+                "score": score, "hits": 0, "misses": 0, "last_used": now,
+            }
+            while len(entries) > config.TEMPLATE_MAX_PER_KEY:
+                del entries[min(entries, key=lambda fp: entries[fp]["last_used"])]
+            self._store.changed(self.templates)
+        return True
@@ -0,0 +1,72 @@
+# template_cache_test.py
+"""
+🧩 ŞABLON CACHE KAYIT TESTİ
+Şablon cache'i debounce'lu yazılır (json_store.py); kaydedilen şablonun
+SmartBot.close() ile diske yazıldığını ve yeni bir süreçte okunduğunu kontrol eder
+(tarayıcı gerekmez, geçici klasör kullanılır):
+
+- record() hemen dosyaya yazmaz (KNOWLEDGE_FLUSH_INTERVAL dolmadı)
+- close() sonrası dosyada kayıt var
+- Yeni TemplateCache aynı şablonu yükler
+"""
+
+import os
+import sys
+import tempfile
+
+from reference_stats import ReferenceStats
+from smart_bot import SmartBot
+from template_cache import TemplateCache
+from xpath_telemetry import XPathTelemetry
+
+SITE = "n11"
+CATEGORY = "add_to_cart"
+TARGET = "Sepete Ekle"
+FINGERPRINT = "1a2b3c-42"
+LOCATOR = {"css": "#product > div.actions > button", "fingerprint": "button|sepete ekle"}
+
+
+def make_bot(folder):
+    """close() için gereken kayıtları geçici klasörde tutan, tarayıcısız SmartBot."""
+    bot = SmartBot.__new__(SmartBot)
+    bot.reference_stats = ReferenceStats(os.path.join(folder, "reference_stats.json"))
+    bot.xpath_telemetry = XPathTelemetry(os.path.join(folder, "xpath_telemetry.json"))
+    bot.template_cache = TemplateCache(os.path.join(folder, "template_cache.json"))
+    return bot
+
+
+def check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def main():
+    print("\n" + "="*70)
+    print("🧩 TEMPLATE CACHE CLOSE TEST")
+    print("="*70)
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        bot = make_bot(folder)
+        cache_file = bot.template_cache.cache_file
+
+        stored = bot.template_cache.record(SITE, CATEGORY, TARGET, FINGERPRINT, LOCATOR, 0.92)
+        results.append(check("Şablon kaydedildi", stored))
+        results.append(check("Kayıt hemen yazılmadı (debounce)", not cache_file.exists()))
+
+        bot.close()
+        results.append(check("close() sonrası dosya yazıldı", cache_file.exists()))
+
+        # Yeni süreç: dosyadan yükle
+        reloaded = TemplateCache(cache_file)
+        entry = reloaded.templates.get(TemplateCache._key(SITE, CATEGORY, TARGET), {}).get(FINGERPRINT)
+        results.append(check("Yeniden yüklenen cache şablonu içeriyor", entry is not None))
+        results.append(check("Locator ve skor korundu", bool(entry) and entry["locator"] == LOCATOR and entry["score"] == 0.92))
+
+    passed = all(results)
+    print(f"\n{'✅ TÜM KONTROLLER GEÇTİ' if passed else '❌ BAŞARISIZ KONTROL VAR'} ({sum(results)}/{len(results)})")
+    return passed
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -29,6 +29,7 @@ class TestReporter:
         self.warnings = []      # Uyarılar
         self.cache_hits = 0     # Cache kullanım sayısı
         self.total_scans = 0    # Toplam tarama sayısı
+        self.visual_tiers = {}  # 🪜 Görsel kademe -> çözülen aday sayısı (toplam)
         
         # Timing verileri
         self.timings = {
@@ -59,8 +60,9 @@ class TestReporter:
         self.timings["interact"].append(duration)
     
     def log_scan(self, category: str, elements_found: int, 
-                 best_score: float, duration: float, cache_hit: bool = False):
-        """Bir taramayı kaydet"""
+                 best_score: float, duration: float, cache_hit: bool = False,
+                 visual_tiers: Dict[str, int] = None):
+        """Bir taramayı kaydet (visual_tiers: kademe başına çözülen aday sayısı)"""
         if cache_hit:
             self.cache_hits += 1
         else:
@@ -75,6 +77,9 @@ class TestReporter:
             "duration_ms": round(duration * 1000, 2),
             "cache_hit": cache_hit
         }
+        for tier, count in (visual_tiers or {}).items():
+            scan_info[f"tier_{tier}"] = count
+            self.visual_tiers[tier] = self.visual_tiers.get(tier, 0) + count
         self.interactions.append(scan_info)
     
     def log_error(self, error_type: str, message: str, element_info: Dict = None):
@@ -192,6 +197,12 @@ class TestReporter:
             f.write(f"   Cache Hit Rate: {stats['cache_hit_rate']:.1f}%\n")
             f.write(f"   Ort. Tarama Süresi: {stats['avg_scan_time']:.0f}ms\n\n")
             
+            if self.visual_tiers:
+                f.write("🪜 GÖRSEL KADEME:\n")
+                for tier, count in self.visual_tiers.items():
+                    f.write(f"   {tier}: {count}\n")
+                f.write(f"   CNN'siz Çözülen: {stats['cnn_saved_rate']:.1f}%\n\n")
+            
             f.write(f"⚡ PERFORMANS:\n")
             f.write(f"   Ort. Etkileşim Süresi: {stats['avg_interact_time']:.0f}ms\n")
             f.write(f"   Ort. Bekleme Süresi: {stats['avg_wait_time']:.0f}ms\n")
@@ -247,5 +258,16 @@ class TestReporter:
             
             "min_interact_time": min(interact_times) * 1000 if interact_times else 0,
             "max_interact_time": max(interact_times) * 1000 if interact_times else 0,
+            
+            "visual_tiers": dict(self.visual_tiers),
+            "cnn_saved_rate": self._cnn_saved_rate(),
         }
+    
+    def _cnn_saved_rate(self) -> float:
+        """🪜 Görsel skor alan adayların yüzde kaçı CNN'e gitmeden çözüldü"""
+        tiers = self.visual_tiers
+        saved = (tiers.get("semantic", 0) + tiers.get("gate", 0) + tiers.get("journal", 0)
+                 + tiers.get("perceptual_accept", 0) + tiers.get("perceptual_reject", 0))
+        total = saved + tiers.get("cnn", 0)
+        return (saved / total * 100) if total > 0 else 0
 
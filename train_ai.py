@@ -4,15 +4,19 @@ import random
 import tensorflow as tf
 from tensorflow.keras.models import Model
 from tensorflow.keras.layers import Input, Flatten, Dense, Dropout, Lambda
-from tensorflow.keras.applications.resnet50 import ResNet50, preprocess_input
 from tensorflow.keras.preprocessing import image
 from tensorflow.keras.optimizers import Adam
 
+import config
+from backbones import resolve, build_backbone, preprocess_batch, write_model_meta  # 🧱 BACKBONE
+
 # --- AYARLAR ---
 # Veri seti yolunu kendi bilgisayarına göre ayarla
 DATASET_PATH = r"C:\Users\cagap\Desktop\pton\Ytma\dataset_ready" 
-MODEL_SAVE_PATH = "my_best_model.keras" 
-IMG_SIZE = (224, 224)
+MODEL_SAVE_PATH = config.KERAS_MODEL_PATH
+# 🆕 Backbone ve giriş boyutu config'den (VISUAL_BACKBONE / VISUAL_INPUT_SIZE)
+MODEL_META = resolve(config.VISUAL_BACKBONE, config.VISUAL_INPUT_SIZE)
+IMG_SIZE = (MODEL_META["input_size"], MODEL_META["input_size"])
 BATCH_SIZE = 32
 EPOCHS = 5 
 
@@ -22,7 +26,7 @@ def load_image(img_path):
         img = image.load_img(img_path, target_size=IMG_SIZE)
         img_array = image.img_to_array(img)
         img_array = np.expand_dims(img_array, axis=0)
-        return preprocess_input(img_array)[0]
+        return preprocess_batch(img_array, MODEL_META["preprocess"])[0]
     except:
         return None
 
@@ -76,8 +80,8 @@ def create_pairs(dataset_path):
 
 def build_siamese_model():
     """Siyam Ağı mimarisini kurar."""
-    # 1. Temel Model (ResNet50)
-    base_cnn = ResNet50(weights="imagenet", include_top=False, input_shape=IMG_SIZE + (3,), pooling="avg")
+    # 1. Temel Model (config.VISUAL_BACKBONE, varsayılan ResNet50)
+    base_cnn = build_backbone(MODEL_META["backbone"], MODEL_META["input_size"])
     
     for layer in base_cnn.layers:
         layer.trainable = False
@@ -132,4 +136,5 @@ if __name__ == "__main__":
 
     print(f"💾 Model kaydediliyor: {MODEL_SAVE_PATH}")
     model.save(MODEL_SAVE_PATH)
+    write_model_meta(MODEL_SAVE_PATH, MODEL_META)  # 🆕 Çıkarım aynı boyut/ön işlemeyi kullanır
     print("🎉 TEBRİKLER! Kendi Yapay Zeka modelini eğittin.")
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+🚦 VISUAL GATE TRAINER
+Tarama günlüğündeki (vis, sem, loc, tag, kazandı mı) kayıtlarından kategori başına
+görsel kapı politikası eğitir ve tasarruf raporu yazar.
+
+- Model: görsel olmayan skorlardan kazanma olasılığını tahmin eden lojistik regresyon
+  (NumPy, L2 düzenlileştirmeli Newton adımları)
+- Eşik: tahmini olasılığı eşiğin üstünde olan adayların en az VISUAL_GATE_PRECISION
+  kadarı görsel skorla da kazanmış olmalı; böyle bir eşik yoksa kategori kapıya alınmaz
+- Tasarruf: eşiğin üstünde kalan (artık görsel analize girmeyecek) kayıtların oranı
+
+Kullanım:
+    python train_visual_gate.py
+"""
+
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+import config
+from visual_gate import FEATURE_NAMES, gate_features
+
+_NEWTON_STEPS = 25
+_L2 = 1e-2
+
+
+def load_samples(path=None):
+    """Günlükteki kayıtları kategoriye göre gruplar (bozuk satırlar atlanır)."""
+    path = path or config.VISUAL_GATE_LOG_PATH
+    grouped = defaultdict(list)
+    if not os.path.exists(path):
+        return grouped
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                sample = json.loads(line)
+                grouped[sample["category"]].append(
+                    (float(sample["vis"]), float(sample["sem"]), float(sample["loc"]),
+                     float(sample["tag"]), bool(sample["won"]))
+                )
+            except (ValueError, KeyError, TypeError):
+                continue
+    return grouped
+
+
+def fit_logistic(features, labels):
+    """L2 düzenlileştirmeli lojistik regresyon (IRLS / Newton)."""
+    weights = np.zeros(features.shape[1], dtype=np.float64)
+    penalty = _L2 * np.eye(features.shape[1])
+    penalty[0, 0] = 0.0  # bias düzenlileştirilmez
+    for _ in range(_NEWTON_STEPS):
+        p = 1.0 / (1.0 + np.exp(-(features @ weights)))
+        gradient = features.T @ (p - labels) + penalty @ weights
+        hessian = (features * (p * (1 - p))[:, None]).T @ features + penalty
+        step = np.linalg.solve(hessian + 1e-9 * np.eye(len(weights)), gradient)
+        weights -= step
+        if np.abs(step).max() < 1e-6:
+            break
+    return weights
+
+
+def choose_threshold(probabilities, labels):
+    """
+    Üstündeki kayıtların kazanma oranı VISUAL_GATE_PRECISION'ı geçen en düşük eşik.
+
+    Returns:
+        tuple: (eşik, atlanan oran, atlananlarda kazanma oranı) veya uygun eşik yoksa None
+    """
+    order = np.argsort(-probabilities)
+    hits = np.cumsum(labels[order])
+    counts = np.arange(1, len(order) + 1)
+    precision = hits / counts
+    ranked = probabilities[order]
+    # Sadece eşit olasılıklı kayıtları bölmeyen kesim noktaları (eşik >= ile uygulanır)
+    cut = np.append(ranked[:-1] > ranked[1:], True)
+    ok = np.flatnonzero(cut & (precision >= config.VISUAL_GATE_PRECISION)
+                        & (counts >= config.VISUAL_GATE_MIN_SKIPS))
+    if not len(ok):
+        return None
+    threshold = float(ranked[ok[-1]])
+    skipped = probabilities >= threshold
+    return threshold, float(skipped.mean()), float(labels[skipped].mean())
+
+
+def train_category(samples):
+    """
+    Tek kategori için politika ve rapor satırı.
+
+    Returns:
+        tuple: (politika veya None, rapor dict)
+    """
+    data = np.asarray(samples, dtype=np.float64)
+    vis, sem, loc, tag, won = data.T
+    report = {"samples": len(samples), "winners": int(won.sum())}
+    if len(samples) < config.VISUAL_GATE_MIN_SAMPLES or won.sum() == 0 or won.sum() == len(won):
+        report["status"] = "yetersiz veri"
+        return None, report
+
+    features = gate_features(sem, loc, tag).astype(np.float64)
+    weights = fit_logistic(features, won)
+    probabilities = 1.0 / (1.0 + np.exp(-(features @ weights)))
+    chosen = choose_threshold(probabilities, won)
+    if chosen is None:
+        report["status"] = "güvenli eşik yok"
+        return None, report
+
+    threshold, skip_rate, precision = chosen
+    report.update({
+        "status": "aktif",
+        "threshold": round(threshold, 4),
+        "skip_rate": round(skip_rate, 4),
+        "precision": round(precision, 4),
+    })
+    policy = {
+        "weights": [round(float(w), 6) for w in weights],
+        "threshold": threshold,
+        "winner_visual": float(np.median(vis[won == 1])),
+        "samples": len(samples),
+        "skip_rate": skip_rate,
+        "precision": precision,
+    }
+    return policy, report
+
+
+def main():
+    grouped = load_samples()
+    if not grouped:
+        print(f"❌ HATA: '{config.VISUAL_GATE_LOG_PATH}' boş veya yok. Önce birkaç test çalıştırın.")
+        return
+
+    policies = {}
+    reports = {}
+    for category, samples in sorted(grouped.items()):
+        policy, reports[category] = train_category(samples)
+        if policy is not None:
+            policies[category] = policy
+
+    folder = os.path.dirname(config.VISUAL_GATE_POLICY_PATH)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(config.VISUAL_GATE_POLICY_PATH, "w", encoding="utf-8") as f:
+        json.dump({
+            "trained_at": datetime.now().isoformat(),
+            "features": FEATURE_NAMES,
+            "precision_target": config.VISUAL_GATE_PRECISION,
+            "categories": policies,
+            "report": reports,
+        }, f, indent=2, ensure_ascii=False)
+
+    total = sum(r["samples"] for r in reports.values())
+    saved = sum(r["samples"] * r.get("skip_rate", 0.0) for r in reports.values())
+    print("\n" + "=" * 78)
+    print(f"{'Kategori':<16}{'Kayıt':>8}{'Kazanan':>9}{'Eşik':>8}{'Atlanan':>10}{'İsabet':>9}  Durum")
+    print("-" * 78)
+    for category, r in reports.items():
+        if r["status"] == "aktif":
+            print(f"{category:<16}{r['samples']:>8}{r['winners']:>9}{r['threshold']:>8.2f}"
+                  f"{r['skip_rate']:>10.1%}{r['precision']:>9.1%}  {r['status']}")
+        else:
+            print(f"{category:<16}{r['samples']:>8}{r['winners']:>9}{'-':>8}{'-':>10}{'-':>9}  {r['status']}")
+    print("-" * 78)
+    print(f"🚦 Tahmini tasarruf: {saved:.0f}/{total} görsel analiz ({saved / total:.1%})")
+    print(f"💾 Politika: {config.VISUAL_GATE_POLICY_PATH}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+🖼️ VIEWPORT CAPTURE
+Aday görsellerini element başına screenshot yerine sayfa başına birkaç ekran
+görüntüsünden NumPy dilimleme ile keser.
+
+- Önce mevcut kaydırma konumunda tek viewport görüntüsü alınır
+- Görünür alanın dışındaki adaylar yukarıdan aşağıya gruplanır: her ek görüntü,
+  kalan en üstteki adaya kaydırılıp alınır ve o ekrana sığan tüm adaylar kesilir
+- Koordinatlar CSS pikselidir; görüntü cihaz pikseli olduğu için devicePixelRatio ile çarpılır
+- Son görüntüler saklanır: log_action kanıt görüntüsünü yeni capture almadan bunlardan çizer.
+  Görüntüler alındıkları sayfaya (URL + dom_observer belge kimliği + epoch) bağlıdır;
+  navigasyon veya düğüm silen bir değişiklikten sonra kullanılmaz
+"""
+
+import time
+from io import BytesIO
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+import config
+import dom_observer
+from logger import get_bot_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_bot_logger()
+
+# Sayfa kimliği: görüntülerin hangi sayfa durumundan alındığı (kanıt için tazelik kontrolü)
+_PAGE_JS = dom_observer.INSTALL_JS + """
+function pageStamp() { var o = installObserver(); return [location.href, o.id, o.epoch]; }
+"""
+_STATE_JS = _PAGE_JS + """
+return [window.scrollX || 0, window.scrollY || 0, window.innerWidth, window.innerHeight,
+        window.devicePixelRatio || 1].concat(pageStamp());
+"""
+_STAMP_JS = _PAGE_JS + "return pageStamp();"
+_SCROLL_JS = "window.scrollTo(arguments[0], arguments[1]); return [window.scrollX || 0, window.scrollY || 0];"
+
+# Kaydırınca adayın üstünde bırakılan boşluk (yapışkan header'lar için, CSS px)
+_SCROLL_MARGIN = 80
+
+
+class ViewportCapture:
+    """
+    Snapshot düğümlerinin (x, y, width, height: sayfa koordinatı, CSS px) görsellerini keser.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.frames = []        # [(RGB görüntü, scroll_x, scroll_y)] son crop() çağrısından
+        self.frames_at = 0.0
+        self.frames_page = None  # [url, belge kimliği, epoch] görüntülerin alındığı sayfa
+        self.dpr = 1.0
+        self.captures = 0       # Toplam ekran görüntüsü sayısı (istatistik)
+
+    def reset(self):
+        """Saklı görüntüleri bırakır (yeni tarama başlarken)."""
+        self.frames = []
+        self.frames_page = None
+
+    def _grab(self):
+        png = self.driver.get_screenshot_as_png()
+        self.captures += 1
+        return np.asarray(Image.open(BytesIO(png)).convert("RGB"))
+
+    @staticmethod
+    def _horizontal(node, sx, vw):
+        return node["x"] + node["width"] > sx and node["x"] < sx + vw
+
+    @classmethod
+    def _fits(cls, node, sx, sy, vw, vh):
+        """Düğüm bu kaydırma konumundaki ekrana (dikeyde tamamen, yatayda kısmen) sığıyor mu?"""
+        top, bottom = node["y"], node["y"] + node["height"]
+        vertical = top >= sy and (bottom <= sy + vh or node["height"] > vh) and top < sy + vh
+        return vertical and cls._horizontal(node, sx, vw)
+
+    def _cut(self, frame, node, sx, sy):
+        """Görüntüden düğümün dikdörtgenini keser (cihaz pikseli, ekran sınırına kırpılır)."""
+        d = self.dpr
+        x0 = max(0, int(round((node["x"] - sx) * d)))
+        y0 = max(0, int(round((node["y"] - sy) * d)))
+        x1 = min(frame.shape[1], int(round((node["x"] + node["width"] - sx) * d)))
+        y1 = min(frame.shape[0], int(round((node["y"] + node["height"] - sy) * d)))
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return frame[y0:y1, x0:x1]
+
+    def crop(self, nodes, on_frame=None, reuse=False):
+        """
+        Düğümlerin görsellerini mümkün olan en az ekran görüntüsüyle keser.
+
+        Args:
+            on_frame: ⏩ Her ekran görüntüsünden sonra o görüntüden kesilen
+                      [(düğüm indeksi, görsel)] ile çağrılır (sonraki kaydırmadan önce)
+            reuse: 🌳 Aynı taramanın önceki crop() görüntülerine sığan düğümler
+                   yeni ekran görüntüsü alınmadan onlardan kesilir
+
+        Returns:
+            list: Düğüm başına (H, W, 3) uint8 RGB dizisi veya kesilemediyse None
+        """
+        if not reuse:
+            self.reset()
+        results = [None] * len(nodes)
+        if not nodes:
+            return results
+        try:
+            sx, sy, vw, vh, self.dpr, *page = self.driver.execute_script(_STATE_JS)
+            self.dpr = float(self.dpr)
+            if page != self.frames_page:
+                self.reset()  # Turlar arasında sayfa değiştiyse eski görüntülerden kesilmez
+                self.frames_page = page
+        except Exception as e:
+            log.warning(f"Viewport bilgisi alınamadı: {e}")
+            return results
+        origin = (sx, sy)
+        pending = list(range(len(nodes)))
+        if reuse and self.frames:
+            pending = self._cut_from_frames(nodes, pending, results, vw, vh, on_frame)
+            if not pending:
+                return results
+        extra = 0
+        try:
+            while pending:
+                frame = self._grab()
+                self.frames.append((frame, sx, sy))
+                remaining = []
+                cut = []
+                for k in pending:
+                    if self._fits(nodes[k], sx, sy, vw, vh):
+                        results[k] = self._cut(frame, nodes[k], sx, sy)
+                        cut.append((k, results[k]))
+                    elif self._horizontal(nodes[k], sx, vw):
+                        remaining.append(k)  # Dikey kaydırma yatayda dışarıdakileri getirmez
+                if on_frame is not None and cut:
+                    on_frame(cut)
+                if len(remaining) == len(pending) and extra:
+                    break  # Kaydırma ilerletmedi (sayfa sonu)
+                pending = remaining
+                if not pending or extra >= config.CAPTURE_MAX_EXTRA:
+                    break
+                # Kalan en üstteki adaya kaydır; o ekrana sığan tüm adaylar bir sonraki görüntüden
+                target = max(0, min(nodes[k]["y"] for k in pending) - _SCROLL_MARGIN)
+                sx, sy = self.driver.execute_script(_SCROLL_JS, origin[0], target)
+                extra += 1
+            self.frames_at = time.time()
+        except Exception as e:
+            log.warning(f"Viewport görüntüsü alınamadı: {e}")
+        finally:
+            if extra:
+                try:
+                    self.driver.execute_script(_SCROLL_JS, origin[0], origin[1])
+                except Exception:
+                    pass
+        return results
+
+    def _cut_from_frames(self, nodes, pending, results, vw, vh, on_frame):
+        """Saklı görüntülere sığan düğümleri keser; kalan indeksleri döner."""
+        remaining = []
+        cut = []
+        for k in pending:
+            for frame, fx, fy in self.frames:
+                if self._fits(nodes[k], fx, fy, vw, vh):
+                    results[k] = self._cut(frame, nodes[k], fx, fy)
+                    cut.append((k, results[k]))
+                    break
+            else:
+                remaining.append(k)
+        if on_frame is not None and cut:
+            on_frame(cut)
+        return remaining
+
+    def save_evidence(self, node, path):
+        """
+        Son görüntülerden düğümü kırmızı çerçeveyle işaretleyip kaydeder.
+
+        Returns:
+            bool: Kaydedildiyse True (görüntü eski, başka sayfaya ait veya düğüm hiçbirinde yoksa False)
+        """
+        if not self.frames or time.time() - self.frames_at > config.CAPTURE_EVIDENCE_MAX_AGE:
+            return False
+        try:
+            if self.driver.execute_script(_STAMP_JS) != self.frames_page:
+                return False  # Navigasyon veya düğüm silen değişiklik: görüntü artık bu sayfayı göstermiyor
+        except Exception:
+            return False
+        for frame, sx, sy in self.frames:
+            if self._fits(node, sx, sy, frame.shape[1] / self.dpr, frame.shape[0] / self.dpr):
+                d = self.dpr
+                img = Image.fromarray(frame)
+                box = [(node["x"] - sx) * d, (node["y"] - sy) * d,
+                       (node["x"] + node["width"] - sx) * d, (node["y"] + node["height"] - sy) * d]
+                ImageDraw.Draw(img).rectangle(box, outline=(255, 0, 0), width=max(1, int(5 * d)))
+                img.save(path)
+                return True
+        return False
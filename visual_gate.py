@@ -0,0 +1,138 @@
+"""
+🚦 LEARNED SKIP-VISUAL GATE
+Görsel analizin (crop + CNN) kazananı değiştirip değiştiremeyeceğini,
+görsel olmayan skorlardan (semantik, konum, tag) tahmin eden kalibre kapı.
+
+- Tarama sırasında görsel skoru hesaplanan adaylar (vis, sem, loc, tag, kazandı mı)
+  olarak JSONL'e yazılır
+- train_visual_gate.py kategori başına lojistik model eğitir ve bir eşik seçer:
+  eşiğin üstündeki adaylar görsel skor olmadan da (neredeyse her zaman) kazanmıştır
+- Politikası olan kategorilerde sabit "sem_score >= 2.0" kuralının yerini alır;
+  politikası olmayan kategorilerde eski kural geçerlidir
+"""
+
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+import config
+from logger import get_ai_logger  # 📝 LOGGING
+
+# Logger instance
+log = get_ai_logger()
+
+FEATURE_NAMES = ["bias", "semantic", "semantic_bonus", "semantic_negative", "location", "tag"]
+
+
+def gate_features(sem, loc, tag):
+    """
+    Görsel olmayan skorlardan kapı özellik vektörü(leri).
+    Semantik skor, calculate_final_score'daki gibi [0, 1] kısmı ve bonus kısmı olarak ayrılır.
+
+    Returns:
+        np.ndarray: (N, len(FEATURE_NAMES)) float32
+    """
+    sem = np.atleast_1d(np.asarray(sem, dtype=np.float32))
+    loc = np.atleast_1d(np.asarray(loc, dtype=np.float32))
+    tag = np.atleast_1d(np.asarray(tag, dtype=np.float32))
+    return np.stack([
+        np.ones_like(sem),
+        np.clip(sem, 0.0, 1.0),
+        np.maximum(sem - 1.0, 0.0),
+        (sem < 0).astype(np.float32),
+        loc,
+        tag,
+    ], axis=1)
+
+
+def log_samples(category, samples, path=None):
+    """
+    Bir taramanın görsel skoru hesaplanmış adaylarını eğitim günlüğüne ekler.
+
+    Args:
+        category: Element kategorisi
+        samples: [{"vis", "sem", "loc", "tag", "won"}] listesi
+        path: JSONL dosyası (varsayılan: config.VISUAL_GATE_LOG_PATH)
+    """
+    if not samples or not config.VISUAL_GATE_LOGGING:
+        return
+    path = path or config.VISUAL_GATE_LOG_PATH
+    now = time.time()
+    try:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            for sample in samples:
+                f.write(json.dumps({"category": category, "timestamp": now, **sample}) + "\n")
+    except OSError as e:
+        log.warning(f"Görsel kapı günlüğü yazılamadı: {e}")
+
+
+class VisualGate:
+    """
+    Kategori başına eğitilmiş politika (knowledge/visual_gate_policy.json).
+    Dosya değişirse bir sonraki sorguda yeniden okunur.
+    """
+
+    def __init__(self, policy_path=None):
+        self.policy_path = policy_path or config.VISUAL_GATE_POLICY_PATH
+        self.policies = {}
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def _reload_if_changed(self):
+        try:
+            stamp = os.stat(self.policy_path).st_mtime_ns
+        except OSError:
+            stamp = None
+        if stamp == self._stamp:
+            return
+        self._stamp = stamp
+        self.policies = {}
+        if stamp is None:
+            return
+        try:
+            with open(self.policy_path, "r", encoding="utf-8") as f:
+                self.policies = json.load(f).get("categories", {})
+            log.info(f"Görsel kapı politikası yüklendi: {len(self.policies)} kategori")
+        except (OSError, ValueError) as e:
+            log.warning(f"Görsel kapı politikası okunamadı: {e}")
+
+    def policy(self, category):
+        """Kategorinin politikası veya yoksa (kapı kapalı) None."""
+        if not config.VISUAL_GATE_ENABLED:
+            return None
+        with self._lock:
+            self._reload_if_changed()
+            return self.policies.get(category)
+
+    def covers(self, category):
+        """Bu kategoride kapı eski sem_score >= 2.0 kuralının yerini alıyor mu?"""
+        return self.policy(category) is not None
+
+    @staticmethod
+    def _probability(policy, sem, loc, tag):
+        logit = float(gate_features(sem, loc, tag)[0] @ np.asarray(policy["weights"], dtype=np.float32))
+        return 1.0 / (1.0 + np.exp(-logit))
+
+    def win_probability(self, category, sem, loc, tag):
+        """Görsel skor olmadan adayın kazanma olasılığı (politika yoksa None)."""
+        policy = self.policy(category)
+        return None if policy is None else self._probability(policy, sem, loc, tag)
+
+    def skip_visual(self, category, sem, loc, tag):
+        """
+        Görsel analiz atlanabilir mi?
+
+        Returns:
+            float: Atlanacaksa adaya verilecek görsel skor (kategorideki kazananların
+            medyan görsel skoru), görsel analiz gerekiyorsa None
+        """
+        policy = self.policy(category)
+        if policy is None or self._probability(policy, sem, loc, tag) < policy["threshold"]:
+            return None
+        return policy["winner_visual"]
@@ -0,0 +1,57 @@
+"""
+🧭 XPATH HIT TELEMETRY
+Her taramada dar scope XPath'lerin kaç düğüm döndürdüğü ve hangisinin seçildiği
+kategori bazında toplanır (knowledge/xpath_telemetry.json). Hiç isabet almayan
+veya geçersiz XPath'ler ve fallback'e düşme oranı buradan görülür.
+"""
+
+import threading
+from datetime import datetime
+
+import config
+from json_store import JsonStore  # 💾 DEBOUNCE'LU KAYIT
+
+
+class XPathTelemetry:
+    """
+    {kategori: {"scans", "fallbacks", "xpaths": {xpath: {evaluated, hits, nodes, chosen, invalid}}}}
+    """
+
+    def __init__(self, telemetry_file=None):
+        self._lock = threading.Lock()
+        self._store = JsonStore(telemetry_file or config.XPATH_TELEMETRY_PATH, "XPath telemetrisi", self._lock)
+        self.telemetry_file = self._store.path
+        self.stats = self._store.load()
+
+    def flush(self):
+        """Bekleyen değişiklikleri diske yazar."""
+        self._store.flush()
+
+    def record(self, category, plan, counts, chosen):
+        """
+        Bir taramanın XPath sonuçlarını ekler.
+
+        Args:
+            plan: [(xpath, scope_type)] (Heuristics.get_xpath_plan)
+            counts: XPath başına isabet sayısı (None: çalıştırılmadı, -1: geçersiz)
+            chosen: Seçilen XPath'in indeksi (-1: hiçbiri)
+        """
+        with self._lock:
+            entry = self.stats.setdefault(category, {"scans": 0, "fallbacks": 0, "xpaths": {}})
+            entry["scans"] += 1
+            entry["fallbacks"] += int(chosen >= 0 and plan[chosen][1] == "FALLBACK")
+            for i, ((xpath, _), count) in enumerate(zip(plan, counts)):
+                row = entry["xpaths"].setdefault(
+                    xpath, {"evaluated": 0, "hits": 0, "nodes": 0, "chosen": 0, "invalid": 0}
+                )
+                if count is None:
+                    continue
+                row["evaluated"] += 1
+                if count < 0:
+                    row["invalid"] += 1
+                    continue
+                row["hits"] += int(count > 0)
+                row["nodes"] += count
+                row["chosen"] += int(i == chosen)
+            entry["last_updated"] = datetime.now().isoformat()
+            self._store.changed(self.stats)